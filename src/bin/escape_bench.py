@@ -0,0 +1,147 @@
+"""Mini-Benchmark: Escape-Sequenzen direkt von blessed vs. aus der termlib-Tabelle.
+
+Gemessen wird der reine Aufbau der Ausgabe (ohne Schreiben ins Terminal) für
+- einen Tastendruck in pyvian (echo_line + set_cursor) und tippse (echo_word + set_cursor),
+- ein Frame von fps im Zeichenmodus (create_random_pattern, 80x24).
+
+Beide Varianten schreiben in denselben StringIO, die Tabelle enthält auch die
+bis zum nächsten SIGWINCH gemerkte Bildschirmgröße. Ergebnis (µs, Median):
+
+                           blessed   Tabelle   Faktor
+pyvian Tastendruck            25.5       5.0      5.1
+tippse Tastendruck            11.0       4.4      2.5
+fps Frame 80x24             8391.1    1435.5      5.8
+"""
+
+from __future__ import annotations
+
+import io
+import random
+from statistics import median
+from time import perf_counter_ns
+
+from blessed import Terminal
+
+from termlib import esc, set_term
+from fun.tput import ALL_CHARS, create_random_pattern
+from pyvilib.config import Config
+from pyvilib.editor import Editor
+from termlib import term
+from tipplib.worditor import Config as WordConfig, Worditor, echo
+
+
+class LegacyEditor(Editor):
+    """Editor rendering the way pyvilib did before the escape table."""
+
+    def echo_line(self, y: int = -1) -> None:
+        """Show the given line at the correct position."""
+        if y == -1:
+            y = self.y
+        y_eff = y + self.y_offset
+        self.echo(
+            f"{term.move_yx(y, 0)}{Config().dim}{y_eff + 1:3d} | {term.normal}" + self.lines[y_eff] + term.clear_eol(),
+        )
+
+    def set_cursor(self) -> None:
+        """Move the cursor to the current position, cleaning possible alert."""
+        self.revoke_alert()
+        self.echo(
+            term.move_yx(term.height - 1, 40),
+            Config().dim,
+            term.italic,
+            f"{self.y + self.y_offset + 1},{self.x} [{len(self.lines)}] ",
+            term.normal,
+        )
+        self._set_cursor()
+
+    def _set_cursor(self) -> None:
+        """Move cursor w/o cleaning alert."""
+        line = self.lines[self.y + self.y_offset]
+        self.x = min(self.x, len(line))
+        self.echo(term.move_yx(self.y, self.x + self.line_start))
+
+
+class LegacyWorditor(Worditor):
+    """Worditor rendering the way tipplib did before the escape table."""
+
+    def echo_word(self) -> None:
+        """Show the current word at the correct position (only the 'not done' branches)."""
+        use_color = WordConfig().success if self.target.startswith(self.current.strip()) else WordConfig().alert
+        echo(f"{term.move_yx(self.y0, self.x0)}{use_color}{self.current}{term.normal}" + term.clear_eol())
+
+    def _set_cursor(self) -> None:
+        """Move cursor w/o cleaning alert."""
+        echo(term.move_yx(self.y0, self.x))
+
+
+def legacy_random_pattern(height: int, width: int) -> str:
+    """Build one character frame the way fun.tput did before the escape table."""
+    pattern_lines = []
+    for i in range(height):
+        line = "".join(f"{term.color(random.randint(1, 255))}{random.choice(ALL_CHARS)}" for _ in range(width))
+        if i == 0:
+            line = term.move_yx(0, 0) + line
+        if i == height - 1:
+            line += term.normal
+        pattern_lines.append(line)
+    return "\n".join(pattern_lines)
+
+
+def median_us(func: object, repeat: int) -> float:
+    """Return the median runtime of func() in µs."""
+    samples = []
+    for _ in range(repeat):
+        t0 = perf_counter_ns()
+        func()  # type: ignore[operator]
+        samples.append(perf_counter_ns() - t0)
+    return median(samples) / 1_000
+
+
+def keystroke(e: Editor | Worditor) -> None:
+    """Render what typing one character renders."""
+    if isinstance(e, Editor):
+        e.echo_line()
+    else:
+        e.echo_word()
+    e.set_cursor()
+
+
+def main() -> None:
+    """Compare both variants and print a small table."""
+    sink = io.StringIO()
+    set_term(Terminal(kind="xterm-256color", stream=sink, force_styling=True))
+
+    def sink_echo(*args: object) -> None:
+        sink.write("".join(str(arg) for arg in args))
+
+    editors = []
+    for cls in (LegacyEditor, Editor):
+        e = cls()
+        e.echo = sink_echo  # type: ignore[method-assign]
+        e.lines = ["Die Leiden des jungen Werther, erstes Buch, am 4. Mai 1771."] * 100
+        e.y, e.x = 12, 30
+        editors.append(e)
+
+    worditors = []
+    for cls in (LegacyWorditor, Worditor):
+        w = cls(12, 4, "Zinnober", 5, 4)
+        w.current, w.x = "Zinn", 8
+        worditors.append(w)
+
+    rows = [
+        ("pyvian Tastendruck", lambda: keystroke(editors[0]), lambda: keystroke(editors[1]), 20_000),
+        ("tippse Tastendruck", lambda: keystroke(worditors[0]), lambda: keystroke(worditors[1]), 20_000),
+        ("fps Frame 80x24", lambda: legacy_random_pattern(24, 80), lambda: create_random_pattern(24, 80), 200),
+    ]
+    esc.color_table()  # warm up, not measured
+    print(f"{'':<25}{'blessed':>9}{'Tabelle':>10}{'Faktor':>9}")
+    for label, legacy, cached, repeat in rows:
+        before = median_us(legacy, repeat)
+        after = median_us(cached, repeat)
+        sink.seek(0)
+        sink.truncate()
+        print(f"{label:<25}{before:9.1f}{after:10.1f}{before / after:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 
 import argparse
+import sys
 from fun import iterate_pattern, create_word_pattern, create_random_pattern, set_recalc_function
+from termlib.profiling import run_profiled, split_profile_flag
 
 
 def main():
-    parser = argparse.ArgumentParser(description="FPS Terminal Pattern Display")
+    # --profile[=cpu|mem] goes anywhere, like for pyvian and tippse, argparse would take the mode for its value
+    argv, profile = split_profile_flag(sys.argv[1:])
+    parser = argparse.ArgumentParser(
+        description="FPS Terminal Pattern Display",
+        epilog="--profile[=cpu|mem]: write a collapsed-stack profile on exit, with 'mem' also the top allocations",
+    )
     parser.add_argument(
         "mode",
         choices=["w", "c"],
@@ -21,7 +28,7 @@ def main():
         help="Color percentage for word mode (default: 20.0)"
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.mode == "w":
         # Word pattern with specified color percentage
@@ -34,7 +41,10 @@ def main():
             lambda height, width: [create_random_pattern(height, width) for _ in range(10)]
         )
 
-    iterate_pattern()
+    if profile:
+        run_profiled(iterate_pattern, "fps", profile)
+    else:
+        iterate_pattern()
 
 
 if __name__ == "__main__":
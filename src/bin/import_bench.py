@@ -0,0 +1,76 @@
+"""Mini-Benchmark: Import-Zeit der Einstiegspunkte mit `python -X importtime` messen.
+
+Jeder Einstiegspunkt wird mehrfach in einem frischen Interpreter importiert, gemessen wird
+die kumulierte Zeit des obersten Moduls (Median). Liegt sie über dem Budget, oder wird
+blessed schon beim Import geladen, endet das Skript mit Exit-Code 1.
+
+Einstiegspunkt            Median     Budget   blessed
+bin.fps                   17.3 ms    60.0 ms   nein
+bin.like_vi_but           28.3 ms    80.0 ms   nein
+bin.maschinenschreiben    20.3 ms    80.0 ms   nein
+
+Vorher (je ein eigenes Terminal() beim Import) lag tippse bei knapp 100 ms.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+
+SRC = Path(__file__).resolve().parent.parent
+
+# module -> budget in milliseconds
+BUDGETS_MS: dict[str, float] = {
+    "bin.fps": 60.0,
+    "bin.like_vi_but": 80.0,
+    "bin.maschinenschreiben": 80.0,
+}
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Parse `-X importtime` output into a mapping module -> cumulative time in µs."""
+    cumulative: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum_us, name = line.removeprefix("import time:").split("|")
+        cumulative[name.strip()] = int(cum_us)
+    return cumulative
+
+
+def measure_import(module: str) -> dict[str, int]:
+    """Import the module in a fresh interpreter and return its `-X importtime` figures."""
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def main() -> None:
+    """Measure all entry points and compare them with their budget."""
+    runs = 7
+    failed = False
+    print(f"{'Einstiegspunkt':<24}{'Median':>8}{'Budget':>11}   blessed")
+    for module, budget_ms in BUDGETS_MS.items():
+        samples = [measure_import(module) for _ in range(runs)]
+        elapsed_ms = median(sample[module] for sample in samples) / 1_000
+        with_blessed = any("blessed" in sample for sample in samples)
+        ok = elapsed_ms <= budget_ms and not with_blessed
+        failed |= not ok
+        print(
+            f"{module:<24}{elapsed_ms:6.1f} ms{budget_ms:8.1f} ms   {'ja' if with_blessed else 'nein'}"
+            f"{'' if ok else '  <-- Budget gerissen'}",
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark: was das Mitschreiben der Tasten in tippse kostet, und die Auswertung.
+
+1. Ein Bot tippt ohne TTY in tippse (wie in replay_bench.py), ohne und mit Tasten-Log,
+   abwechselnd, der beste von 5 Läufen zählt.
+2. KeyLog.record() allein.
+3. Ein Log mit Millionen von Tasten auswerten (WPM, Treffer, Latenz je Taste): das erste
+   Mal, dann mit den gezählten Tasten aus dem Cache, und nach einem neuen Block.
+
+Ergebnis auf dem Entwicklungsrechner:
+
+bot ohne Log         155.7 µs/Taste
+bot mit Log          163.0 µs/Taste
+record()               0.79 µs/Taste
+
+Tasten      Log MB  erstes Mal s  mit Cache s  + Block s
+1000000        8.0          0.48        0.144      0.149
+5000000       40.1          1.52        0.138      0.147
+
+Der Unterschied im Bot liegt im Rauschen (mal ist der Lauf mit Log schneller, mal der
+ohne): eine Taste kostet vor allem Ausgabe, record() ist weniger als 1 % davon. Mit den
+gezählten Tasten im Cache hängt ein Bericht nur noch von den verschiedenen Zahlen im Log
+ab (hier 85.000), nicht von der Zahl der Tasten.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from bin.maschinenschreiben import Trainer
+from bin.replay_bench import bot_typist, synthetic_lines
+from termlib.replay import ReplayStats, replay
+from tipplib import keylog, text
+from tipplib.keylog import EDIT, MISS, NAMED, WORD, KeyLog, KeyReport
+from tipplib.text import TextSource
+
+KEYS = [ord(c) for c in "abcdefghijklmnopqrstuvwxyzäöüß ,."] + [NAMED + 263]
+
+
+def bot(words: int, *, log: bool) -> ReplayStats:
+    """Let a bot type the given number of words into the trainer, with or without a key log."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bot.md"
+        path.write_text("\n".join(synthetic_lines(500)), encoding="utf-8")
+        text.DATAFILE, TextSource._instance = path, None  # noqa: SLF001
+        try:
+            kl = KeyLog(Path(tmp) / "bot.keys") if log else None
+            return replay(lambda: Trainer(keylog=kl), bot_typist(words))
+        finally:
+            text.DATAFILE, TextSource._instance = None, None  # noqa: SLF001
+
+
+def record_us(n: int = 1_000_000) -> float:
+    """Return the µs per KeyLog.record(), in memory."""
+    kl = KeyLog()
+    start = perf_counter()
+    for _ in range(n):
+        kl.record(97, 0)
+    return (perf_counter() - start) / n * 1e6
+
+
+def synthetic_log(path: Path, keys: int, seed: int = 4711) -> None:
+    """Write a log of the given number of keys, typed at about 300 characters per minute with breaks."""
+    rnd = random.Random(seed)
+    kl = KeyLog(path)
+    while keys > 0:
+        n = min(keylog.BATCH, keys)
+        gaps = rnd.choices(range(80, 900), k=n - 1) + rnd.choices((9000, keylog.NO_GAP), k=1)
+        codes = rnd.choices(KEYS, k=n)
+        flags = rnd.choices((0, MISS, WORD, EDIT), weights=(80, 4, 15, 1), k=n)
+        kl.keys.extend(map(lambda key, f, gap: key << 40 | f << 32 | gap, codes, flags, gaps))
+        kl.flush()
+        keys -= n
+
+
+def main() -> None:
+    """Measure the cost of logging in the trainer, and the reports over big logs."""
+    parser = argparse.ArgumentParser(description="Measure the keystroke log of tippse")
+    parser.add_argument("sizes", nargs="*", type=int, default=[1_000_000, 5_000_000], help="keys in the log")
+    parser.add_argument("--words", type=int, default=3000, help="words the bot types (default: 3000)")
+    args = parser.parse_args()
+
+    best = {False: float("inf"), True: float("inf")}
+    for _ in range(5):
+        for log in (False, True):
+            best[log] = min(best[log], bot(args.words, log=log).us_per_key)
+    print(f"{'bot ohne Log':<16}{best[False]:10.1f} µs/Taste")
+    print(f"{'bot mit Log':<16}{best[True]:10.1f} µs/Taste")
+    print(f"{'record()':<16}{record_us():11.2f} µs/Taste")
+    print()
+    print(f"{'Tasten':<10}{'Log MB':>8}{'erstes Mal s':>14}{'mit Cache s':>13}{'+ Block s':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = Path(tmp) / f"{size}.keys"
+            synthetic_log(path, size)
+            times = []
+            for more in (0, 0, keylog.BATCH):
+                synthetic_log(path, more)
+                start = perf_counter()
+                report = KeyReport.from_log(path)
+                times.append(perf_counter() - start)
+            assert report.keys == size + keylog.BATCH, report.keys
+            print(f"{size:<10}{path.stat().st_size / 1e6:8.1f}{times[0]:14.2f}{times[1]:13.3f}{times[2]:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
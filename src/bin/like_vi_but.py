@@ -1,11 +1,41 @@
 """A simple Vi-like text editor using the Blessed library for terminal handling."""
 
+import argparse
+import sys
+from pathlib import Path
+
 from pyvilib import mini_vi
+from termlib.profiling import run_profiled, split_profile_flag
+
+
+def batch(args: list[str]) -> None:
+    """Run a keystroke script over files without a screen: pyvian -s SCRIPT [-j JOBS] FILE..."""
+    from pyvilib.batch import run_batch  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(prog="pyvian", description="Apply a keystroke script to files")
+    parser.add_argument("-s", "--script", required=True, type=Path, help="keys in vim notation, e.g. /foo<CR>bar<Esc>")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument("files", nargs="+")
+    ns = parser.parse_args(args)
+    stats = run_batch(ns.script.read_text(encoding="utf-8"), ns.files, ns.jobs)
+    print(
+        f"{stats.files} files ({stats.changed} changed, {stats.failed} failed), {stats.bytes / 1e6:.1f} MB"
+        f" in {stats.seconds:.2f} s: {stats.files_per_sec:.0f} files/s, {stats.mb_per_sec:.1f} MB/s",
+        file=sys.stderr,
+    )
+    if stats.failed:
+        sys.exit(1)
 
 
 def main() -> None:
-    """Run the mini-vi editor."""
-    mini_vi()
+    """Run the mini-vi editor. With --profile[=mem], write a profile on exit. With -s, run a script on files."""
+    argv, profile = split_profile_flag(sys.argv)
+    script = len(argv) > 1 and argv[1] in ("-s", "--script")
+    run = (lambda: batch(argv[1:])) if script else (lambda: mini_vi(argv))
+    if profile:
+        run_profiled(run, "pyvian", profile)
+    else:
+        run()
 
 
 if __name__ == "__main__":
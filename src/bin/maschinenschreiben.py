@@ -2,39 +2,109 @@
 
 from __future__ import annotations
 
-from tipplib import term, Worditor, WorditorResult, Config, TextSource, beep
+import sys
+from pathlib import Path
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from termlib import esc, screen_size
+from termlib.profiling import run_profiled, split_profile_flag
+from tipplib import echo, term, Worditor, WorditorResult, Config, TextSource, beep, text
+from tipplib.keylog import KeyLog, KeyReport, logfile
+from tipplib.layout import layout
+
+if TYPE_CHECKING:
+    from blessed.keyboard import Keystroke
 
 
 class Trainer:
     """Main class for the typing tutor."""
 
 
-    def __init__(self) -> None:
-        """Initialize the trainer."""
+    def __init__(
+        self,
+        *,
+        adaptive: bool = False,
+        generated: bool = False,
+        keylog: KeyLog | None = None,
+        text: TextSource | None = None,
+        run: bool = True,
+    ) -> None:
+        """Initialize the trainer.
+
+        If adaptive, the words mistyped or typed slowly come up more often. If generated, the lines
+        are made up from the n-grams of the text. With a keylog, all keystrokes are logged. The text
+        is TextSource() unless given, e.g. a TextSource().session() for one of many sessions.
+        Unless run is False, read and handle keys until the user leaves, else see handle_key.
+        """
 
         # Vorgabe startet hier
         self.target_y0, self.target_x0  = 5, 4
         # Eingetipptes startet hier
         self.text_y0, self.text_x0 = 12, 4
+        # every line goes below the one before, back up here when there is no more room
+        self.top = self.target_y0, self.text_y0
 
-        self.words = [w for w in TextSource().get_line().split() if w]
+        self.text = text or TextSource()
+        self.adaptive = self.text.adaptive_words() if adaptive else None
+        self.generated = generated
+        self.keylog = keylog
+        self.words = self.new_words(first=True) or ["wtf?"]
         self.word_no = 0
-        self.next_word()
-        self.e = Worditor(self.text_y0, self.text_x0, self.word, self.target_y0, self.target_x0)
+        self.word = self.words[0]
+        self.show_line()
+        self.e = Worditor(*self.place(), shown=True)
+        self.e.keylog = keylog
         self.e.alert("Moin.", color=Config().dim)
         self.e.set_cursor()
-        while True:
-            wr = self.e.run()
-            if wr.leave:
-                break  # Exit on Ctrl+C or Escape
-            if self.next_word():
-                self.e.alert("new line!")
-                self.target_y0 += 1
-                self.text_y0 += 1
-                y0, x0, ty0, tx0 = self.text_y0, self.text_x0, self.target_y0, self.target_x0
-            else:
-                y0, x0, ty0, tx0 = self.e.y0, self.e.x, self.e.ty0, self.e.tx0 + len(self.e.target) + 1
-            self.e.reset(y0, x0, self.word, ty0, tx0)
+        self.start = monotonic()  # of the current word
+        if run:
+            while self.word_done(self.e.run()):
+                pass
+
+    def handle_key(self, key: Keystroke) -> bool:
+        """Process one keystroke. Return False when the user left."""
+        result = self.e.handle_key(key)
+        return result is None or self.word_done(result)
+
+    def word_done(self, wr: WorditorResult) -> bool:
+        """Go on to the next word after the result of the current one. Return False when the user left."""
+        if wr.leave:
+            if self.keylog is not None:
+                self.keylog.flush()
+            return False  # Exit on Ctrl+C or Escape
+        if self.adaptive:
+            self.adaptive.record(wr, monotonic() - self.start)
+        new_line = self.next_word()
+        if new_line:
+            self.e.alert("new line!")
+            self.target_y0 += len(self.layout.rows)
+            self.text_y0 += len(self.layout.rows)
+            self.show_line()
+        y0, x0, *target = self.place()
+        if not new_line and y0 == self.e.y0:
+            x0 = max(x0, self.e.x)  # behind a word typed longer than its target, instead of over it
+        self.e.reset(y0, x0, *target, shown=True)
+        self.start = monotonic()
+        return True
+
+    def show_line(self) -> None:
+        """Lay out the words of the new line below the one before, or at the top if there is no room, and show them."""
+        height, width = screen_size()
+        self.layout = layout(tuple(self.words), self.target_x0, width)
+        rows = len(self.layout.rows)
+        top_target, top_text = self.top
+        clear = ""
+        # keep a row between target and input, and the last row for alerts
+        if self.target_y0 + rows >= top_text or self.text_y0 + rows >= height - 1:
+            self.target_y0, self.text_y0 = self.top
+            clear = esc.move_yx(top_target, 0) + esc.clear_eos
+        echo(clear + self.layout.render(self.target_y0, Config().dim))
+
+    def place(self) -> tuple[int, int, str, int, int]:
+        """Return where the current word is typed, the word, and where its target is, for the Worditor."""
+        row, x = self.layout.places[self.word_no]
+        return self.text_y0 + row, x - self.target_x0 + self.text_x0, self.word, self.target_y0 + row, x
 
     def next_word(self) -> bool:
         """Move to the next word.
@@ -45,14 +115,47 @@ class Trainer:
         if self.word_no < len(self.words):
             self.word = self.words[self.word_no]
             return False
-        self.words = TextSource().get_next_words()
+        self.words = self.new_words() or ["wtf?"]  # No more words
         self.word_no = 0
-        self.word = self.words[self.word_no] if self.words else "wtf?"  # No more words
+        self.word = self.words[self.word_no]
         return True
 
+    def new_words(self, *, first: bool = False) -> list[str]:
+        """Return the words of a new line: a random one first, then the next one of the text."""
+        if self.adaptive:
+            return self.adaptive.line()
+        if self.generated:
+            return self.text.get_generated_line().split()
+        if first:
+            return [w for w in self.text.get_line().split() if w]
+        return self.text.get_next_words()
 
-def main() -> None:
-    """Run the typing tutor."""
 
+def session(*, adaptive: bool = False, generated: bool = False) -> None:
+    """Run the typing tutor in fullscreen."""
     with term.fullscreen(), term.raw():
-        Trainer()
+        Trainer(adaptive=adaptive, generated=generated, keylog=KeyLog(logfile()))
+
+
+def main() -> None:
+    """Run the typing tutor: tippse [--adaptive|--generate] [FILE|CORPUS].
+
+    With --profile[=mem], write a profile on exit. tippse --stats shows speed, accuracy and
+    latency per key from the keystrokes of all sessions.
+    """
+    argv, profile = split_profile_flag(sys.argv)
+    if "--stats" in argv:
+        print(KeyReport.from_log(logfile()).format())
+        return
+    modes = {"adaptive": "--adaptive" in argv, "generated": "--generate" in argv}
+    argv = [arg for arg in argv if arg not in ("--adaptive", "--generate")]
+    if len(argv) > 1:
+        path = Path(argv[1])
+        if path.is_dir():
+            text.CORPUS = path
+        else:
+            text.DATAFILE = path
+    if profile:
+        run_profiled(lambda: session(**modes), "tippse", profile)
+    else:
+        session(**modes)
@@ -0,0 +1,101 @@
+"""Benchmark: n-gram-Modelle (Wörter und Zeichen) bauen, laden und Text erzeugen.
+
+Der Korpus ist synthetisch: Zeilen bis 70 Zeichen aus erfundenen Wörtern aus Silben,
+nach Zipf verteilt wie in echtem Text, so dass das Modell mit dem Korpus wächst. Oder
+eine echte Datei (--file). Gemessen werden Bauzeit, Größe des Caches, Laden aus dem
+Cache und wie viele Wörter pro Sekunde erzeugt werden. Ergebnis auf dem Entwicklungsrechner:
+
+Modell   Korpus MB   Kontexte     Kanten   bauen s   Cache MB   laden ms    Wörter/s
+w2             1.0      74935     109563      0.38        1.8       0.10      741405
+w2            10.0     535871    1011541      5.96       14.8       0.15      396735
+w2            30.0    1305544    2860498     15.87       40.1       3.38      505874
+c5             1.0      23465      57007      0.53        0.8       0.09       94840
+c5            10.0      31982      98554      5.03        1.3       0.09       98945
+c5            30.0      34184     117386     15.07        1.5       0.11       82805
+
+Das Erzeugen hängt nicht von der Größe des Korpus ab, nur beim kleinen Wortmodell
+liegen die Tabellen noch im CPU-Cache. Gebaut wird einmal, in Stücken von 1M Tokens:
+der ganze Lauf braucht höchstens 230 MB (alle n-Gramme auf einmal sortiert: 1,5 GB).
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+from itertools import islice
+from pathlib import Path
+from time import perf_counter
+
+from tipplib.mapped import MappedLines
+from tipplib.ngram import CHAR_ORDER, WORD_ORDER, NgramModel, model_path
+
+SYLLABLES = ["ge", "be", "ver", "zer", "an", "ab", "ein", "aus", "lieb", "herz", "wald", "mut", "froh", "schön",
+             "lich", "keit", "ung", "en", "er", "te", "st", "ß", "ä", "ü", "sch", "ich", "dem", "und"]  # fmt: skip
+VOCABULARY = 100_000
+GENERATED = 200_000
+
+
+def corpus(megabytes: float, seed: int = 1774) -> str:
+    """Return about the given number of MB of lines of words with a Zipf distribution."""
+    rnd = random.Random(seed)
+    words = ["".join(rnd.choices(SYLLABLES, k=rnd.randint(1, 4))) for _ in range(VOCABULARY)]
+    weights = [1 / rank for rank in range(1, VOCABULARY + 1)]
+    lines, line, size = [], "", 0
+    while size < megabytes * 1e6:
+        for word in rnd.choices(words, weights=weights, k=1000):
+            if len(line) + 1 + len(word) > 70:  # noqa: PLR2004
+                lines.append(line)
+                size += len(line.encode()) + 1
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+    return "\n".join(lines) + "\n"
+
+
+def measure(path: Path, label: str, order: int, *, chars: bool) -> None:
+    """Build, load and use one model of the file, print a row."""
+    lines = MappedLines(path)
+    cache = model_path(path, order, chars=chars)
+    cache.unlink(missing_ok=True)
+    start = perf_counter()
+    model = NgramModel.for_lines(lines, order, chars=chars)
+    build = perf_counter() - start
+    st = path.stat()
+    start = perf_counter()
+    model = NgramModel.load(cache, st.st_size, st.st_mtime_ns) or model
+    load = perf_counter() - start
+    start = perf_counter()
+    for _ in islice(model.words(random.Random(4711)), GENERATED):
+        pass
+    rate = GENERATED / (perf_counter() - start)
+    print(
+        f"{label:<8}{st.st_size / 1e6:10.1f}{model.contexts:11d}{len(model.tokens):11d}"
+        f"{build:10.2f}{cache.stat().st_size / 1e6:11.1f}{load * 1000:11.2f}{rate:12.0f}",
+    )
+
+
+def main() -> None:
+    """Measure word and character models of synthetic corpora of some sizes, or of a file."""
+    parser = argparse.ArgumentParser(description="Build n-gram models and generate text from them")
+    parser.add_argument("sizes", nargs="*", type=float, default=[1, 10, 30], help="corpus sizes in MB")
+    parser.add_argument("--file", type=Path, help="use this text (a copy of it) instead of synthetic corpora")
+    args = parser.parse_args()
+
+    print(f"{'Modell':<8}{'Korpus MB':>10}{'Kontexte':>11}{'Kanten':>11}{'bauen s':>10}{'Cache MB':>11}"
+          f"{'laden ms':>11}{'Wörter/s':>12}")  # fmt: skip
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        if args.file:
+            paths.append(Path(tmp) / args.file.name)
+            paths[0].write_bytes(args.file.read_bytes())
+        for size in [] if args.file else args.sizes:
+            paths.append(Path(tmp) / f"{size:g}.md")
+            paths[-1].write_text(corpus(size), encoding="utf-8")
+        for chars, order in ((False, WORD_ORDER), (True, CHAR_ORDER)):
+            for path in paths:
+                measure(path, f"{'c' if chars else 'w'}{order}", order, chars=chars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Durchsatz-Benchmark: Tastendrücke ohne TTY in pyvian und tippse abspielen.
+
+Szenarien:
+  vi-type   eine Datei mit 10.000 Zeilen in pyvian eintippen
+  vi-down   in einer Datei mit 100.000 Zeilen Pfeil-runter gedrückt halten
+  bot       ein Bot tippt in tippse 2000 Wörter pro Minute (das Budget pro Taste ist 5 ms)
+  FILE      ein aufgezeichnetes Skript (siehe `record`) in pyvian abspielen
+
+Aufzeichnen: `replay_bench.py record FILE` liest Tasten aus dem echten Terminal bis Ctrl+C.
+
+Ergebnis auf dem Entwicklungsrechner (80x24):
+
+Szenario        Tasten     Tasten/s     µs/Taste   Bytes/Taste  Flushes/Taste
+vi-type         587561        68181         14.7         145.2            3.4
+vi-down         100000        14603         68.5        2125.0           25.0
+bot              50559        69513         14.4          16.5            1.2
+
+Im bot schreibt der Worditor je Taste nur das Zeichen, in einem Flush (vorher das ganze
+Wort und die Cursorposition: 56,2 Bytes und 2,8 Flushes pro Taste, 147 µs). Bis der
+Trainer eine Zeile mit ihrem ersten Wort begann, lag der Bot ab der ersten Zeile ein Wort
+daneben und tippte jedes Wort falsch, das kostete 48,1 µs pro Taste.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from termlib import term
+from termlib.replay import ReplayStats, pressed, load_script, replay, save_script, typed
+from pyvilib.minivi import mini_vi
+from tipplib import text
+from tipplib.text import TextSource
+from bin.maschinenschreiben import Trainer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# at 2000 WPM, with 5 characters and a space per word
+BOT_WPM = 2000
+BOT_BUDGET_US = 60 / (BOT_WPM * 6) * 1e6
+
+WORDS = [
+    "Humbug", "Quatsch", "Schnickschnack", "Kram", "Zeugs", "Krimskrams", "Firlefanz", "Blödsinn",
+    "Käse", "Mumpitz", "Kokolores", "Larifari", "Pipifax", "Tinnef", "Gedöns", "Klimbim", "Zinnober",
+]  # fmt: skip
+
+
+def synthetic_lines(n: int, seed: int = 4711) -> list[str]:
+    """Return n lines of 4 to 10 random words."""
+    rnd = random.Random(seed)
+    return [" ".join(rnd.choices(WORDS, k=rnd.randint(4, 10))) for _ in range(n)]
+
+
+def scenario_vi_type(lines: int) -> ReplayStats:
+    """Type a file of the given number of lines into an empty buffer."""
+    keys = typed("\n".join(synthetic_lines(lines)))
+    return replay(lambda: mini_vi(["pyvian"]), keys)
+
+
+def scenario_vi_down(lines: int) -> ReplayStats:
+    """Hold down arrow through a file of the given number of lines."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "down.txt"
+        path.write_text("\n".join(synthetic_lines(lines)) + "\n", encoding="utf-8")
+        return replay(lambda: mini_vi(["pyvian", str(path)]), pressed("KEY_DOWN", lines))
+
+
+def bot_typist(words: int) -> Iterator[str]:
+    """Type the words the trainer shows, without mistakes.
+
+    The trainer has picked the next line by the time the bot asks for it, so reading
+    the current line lazily keeps the bot in sync.
+    """
+    done = 0
+    while done < words:
+        for word in TextSource().current_line.split():
+            yield from word
+            yield " "
+            done += 1
+            if done == words:
+                return
+
+
+def scenario_bot(words: int) -> ReplayStats:
+    """Let a bot type the given number of words into the trainer."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bot.md"
+        path.write_text("\n".join(synthetic_lines(500)), encoding="utf-8")
+        text.DATAFILE, TextSource._instance = path, None  # noqa: SLF001
+        try:
+            return replay(Trainer, bot_typist(words))
+        finally:
+            text.DATAFILE, TextSource._instance = None, None  # noqa: SLF001
+
+
+def record(path: Path) -> None:
+    """Record keystrokes from the real terminal until Ctrl+C."""
+    keys: list[str] = []
+    print("Aufnahme läuft, Ende mit Ctrl+C.")
+    with term.raw():
+        while (key := term.inkey()) != "\x03":
+            keys.append(str(key))
+    save_script(path, keys)
+    print(f"{len(keys)} Tasten nach {path} geschrieben.")
+
+
+def print_stats(label: str, stats: ReplayStats) -> None:
+    """Print one row of the result table."""
+    print(
+        f"{label:<14}{stats.keys:8d}{stats.keys_per_sec:13.0f}{stats.us_per_key:13.1f}"
+        f"{stats.bytes_per_key:14.1f}{stats.flushes / stats.keys:15.1f}",
+    )
+
+
+def main() -> None:
+    """Run the given scenarios (default: all) and print a table."""
+    parser = argparse.ArgumentParser(description="Replay keystrokes headless and measure throughput")
+    parser.add_argument("scenarios", nargs="*", default=["vi-type", "vi-down", "bot"])
+    parser.add_argument("--scale", type=float, default=1.0, help="scale the size of the scenarios (default: 1.0)")
+    args = parser.parse_args()
+
+    if args.scenarios[:1] == ["record"]:
+        record(Path(args.scenarios[1]))
+        return
+
+    print(f"{'Szenario':<14}{'Tasten':>8}{'Tasten/s':>13}{'µs/Taste':>13}{'Bytes/Taste':>14}{'Flushes/Taste':>15}")
+    for name in args.scenarios:
+        if name == "vi-type":
+            print_stats(name, scenario_vi_type(int(10_000 * args.scale)))
+        elif name == "vi-down":
+            print_stats(name, scenario_vi_down(int(100_000 * args.scale)))
+        elif name == "bot":
+            stats = scenario_bot(int(6_000 * args.scale))
+            print_stats(name, stats)
+            if stats.us_per_key > BOT_BUDGET_US:
+                print(f"  zu langsam für {BOT_WPM} WPM: Budget {BOT_BUDGET_US:.0f} µs/Taste")
+        else:
+            print_stats(Path(name).name, replay(lambda: mini_vi(["pyvian"]), load_script(Path(name))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Lasttest: viele Tipper gleichzeitig am tippse-Server (bin/tippse_server.py), über einen Unix-Socket.
+
+Der Server läuft in einem eigenen Prozess. Jeder simulierte Tipper öffnet eine Verbindung,
+liest die Vorgabe aus der Ausgabe und tippt sie fehlerfrei mit der gegebenen Geschwindigkeit
+(6 Tasten pro Wort, mit Zufall im Takt). Gemessen werden die Latenz jeder Taste (senden bis
+zur ersten Antwort) und die CPU-Zeit des Servers. Daraus: wie viele solche Tipper ein Kern
+bedienen kann.
+
+Ergebnis auf dem Entwicklungsrechner (ein Kern, 60 WPM, 20 Wörter je Tipper):
+
+Tipper    Tasten   Tasten/s   CPU µs/Taste   Sitzungen/Kern   p50 ms   p99 ms   max ms
+100        16936        525          242.6              687     0.42     1.67     9.42
+1000      169225       3833          149.7             1114    54.03   107.04   138.11
+
+Server und Tipper teilen sich hier den einen Kern: bei 1000 Tippern ist er voll, sie
+schaffen nur 3833 statt 6000 Tasten/s, und die Latenz ist vor allem Warten auf den Kern.
+Unter Last kostet eine Taste den Server weniger, weil ein Aufwachen mehrere Verbindungen
+bedient. Die CPU-Zeit enthält auch das Aufbauen der Sitzungen. Zum Vergleich: ohne Sockets
+und asyncio (replay_bench.py bot) kostet eine Taste etwa 50 µs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter
+
+from bin.replay_bench import synthetic_lines
+from bin.tippse_server import raise_open_files
+
+# a new word: normal, the target at its place, then the cursor where it is to be typed
+TARGET = re.compile(rb"\x1b\[m\x1b\[\d+;\d+H([^\x1b]*)(?:\x1b\[K)?\x1b\[\d+;\d+H\x1b\[K")
+REPORT = re.compile(r"(\d+) sessions, (\d+) keys, ([\d.]+) s CPU")
+KEYS_PER_WORD = 6
+
+
+async def typist(path: Path, words: int, wpm: float, rnd: random.Random, latencies: list[float]) -> None:
+    """Connect, then type the given number of words the server shows, recording the latency of each key."""
+    reader, writer = await asyncio.open_unix_connection(path)
+    interval = 60 / (wpm * KEYS_PER_WORD)
+    seen = b""
+    while not TARGET.search(seen):
+        seen += await reader.read(65536)
+    await asyncio.sleep(rnd.uniform(0, interval))  # don't all start at once
+    for _ in range(words):
+        target = TARGET.findall(seen)[-1].decode()
+        seen = b""
+        for char in target + " ":
+            await asyncio.sleep(interval * rnd.uniform(0.5, 1.5))
+            writer.write(char.encode())
+            start = perf_counter()
+            seen += await reader.read(65536)
+            latencies.append(perf_counter() - start)
+        while not TARGET.search(seen):
+            seen += await reader.read(65536)
+    writer.write(b"\x03")
+    await writer.drain()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load(path: Path, typists: int, words: int, wpm: float) -> tuple[list[float], float]:
+    """Let the typists type at once, return the latencies and the seconds it took."""
+    latencies: list[float] = []
+    rnd = random.Random(1774)
+    start = perf_counter()
+    await asyncio.gather(
+        *(typist(path, words, wpm, random.Random(rnd.random()), latencies) for _ in range(typists)),
+    )
+    return latencies, perf_counter() - start
+
+
+def measure(typists: int, words: int, wpm: float) -> None:
+    """Start a server, let the typists type and print a row."""
+    with tempfile.TemporaryDirectory() as tmp:
+        text = Path(tmp) / "bench.md"
+        text.write_text("\n".join(synthetic_lines(500)), encoding="utf-8")
+        sock = Path(tmp) / "tippse.sock"
+        paths = [str(Path(__file__).parents[1]), os.environ.get("PYTHONPATH", "")]
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(paths))
+        server = subprocess.Popen(  # noqa: S603
+            [sys.executable, "-m", "bin.tippse_server", "--unix", str(sock), str(text)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env,
+        )  # fmt: skip
+        try:
+            server.stdout.readline()  # listening
+            latencies, seconds = asyncio.run(load(sock, typists, words, wpm))
+        finally:
+            server.send_signal(signal.SIGINT)
+            _, err = server.communicate()
+    if (m := REPORT.search(err)) is None:
+        print(f"{typists:<8}kein Bericht vom Server: {err.strip()}")
+        return
+    keys, cpu = int(m[2]), float(m[3])
+    us_per_key = cpu / keys * 1e6
+    sessions_per_core = 1e6 / (us_per_key * wpm * KEYS_PER_WORD / 60)
+    ms = [latency * 1000 for latency in latencies]
+    percentiles = quantiles(ms, n=100)
+    p50, p99 = percentiles[49], percentiles[98]
+    print(
+        f"{typists:<8}{keys:8d}{keys / seconds:11.0f}{us_per_key:15.1f}{sessions_per_core:17.0f}"
+        f"{p50:9.2f}{p99:9.2f}{max(ms):9.2f}",
+    )
+
+
+def main() -> None:
+    """Run the load test for the given numbers of typists."""
+    parser = argparse.ArgumentParser(description="Load test of the tippse server with simulated typists")
+    parser.add_argument("typists", nargs="*", type=int, default=[100, 1000], help="typists at once")
+    parser.add_argument("--wpm", type=float, default=60, help="words per minute of each typist (default: 60)")
+    parser.add_argument("--words", type=int, default=20, help="words each typist types (default: 20)")
+    args = parser.parse_args()
+
+    raise_open_files()
+    print(f"{'Tipper':<8}{'Tasten':>8}{'Tasten/s':>11}{'CPU µs/Taste':>15}{'Sitzungen/Kern':>17}"
+          f"{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")  # fmt: skip
+    for typists in args.typists:
+        measure(typists, args.words, args.wpm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Serve tippse to many users at once, over telnet or a Unix socket.
+
+Every connection gets a Trainer of its own, on a view of the shared text (see
+TextSource.session). All of them run in one asyncio loop: what a connection sends is
+split into keys, each is handled by the Trainer of the connection while the shared
+SessionTerminal writes to the output of the connection, and what the keys produced is
+sent in one go.
+
+Telnet clients are asked to send every key at once and not to echo. On a Unix socket,
+the client has to do that itself, e.g. `socat -,raw,echo=0 UNIX-CONNECT:PATH`. Every
+session is 80x24 characters, and there is no key log. An alert goes away with the next
+key, not after its timeout.
+
+    python -m bin.tippse_server [--host HOST] [--port PORT | --unix PATH] [--generate] [FILE]
+
+On SIGINT or SIGTERM the server stops and prints sessions, keys and CPU time to stderr.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import re
+import signal
+import sys
+from pathlib import Path
+from time import process_time
+
+from termlib.escapes import esc
+from termlib.sessions import SessionKeys, SessionOutput, SessionTerminal
+from termlib.terminal import echo, set_term
+from tipplib import TextSource, text
+from bin.maschinenschreiben import Trainer
+
+PORT = 2323
+# connections waiting to be accepted, a load test opens hundreds at once
+BACKLOG = 1024
+# the server echoes and suppresses go-ahead, so telnet clients send every key at once
+TELNET_HELLO = bytes([255, 251, 1, 255, 251, 3])
+# commands (IAC ...) and what telnet makes of Enter
+TELNET_NOISE = re.compile(rb"\xff(?:[\xfb-\xfe].|\xfa.*?\xff\xf0|.)|(?<=\r)[\n\0]", re.DOTALL)
+# a command cut off at the end of a read, after any escaped 255 bytes (IAC IAC)
+TELNET_UNFINISHED = re.compile(rb"(?<!\xff)(?:\xff\xff)*(\xff(?:[\xfb-\xfe]?|\xfa(?:(?!\xff\xf0).)*))\Z", re.DOTALL)
+# bytes read at once
+READ = 4096
+
+
+class TelnetInput:
+    """Drop telnet commands from what a client sends, across reads."""
+
+    def __init__(self) -> None:
+        """Initialize with nothing read yet."""
+        self.pending = b""  # a command cut off at the end of the last read
+        self.after_cr = False  # the last read ended with Enter, a \n or \0 may follow
+
+    def feed(self, data: bytes) -> bytes:
+        """Return data without telnet commands, a command cut off at the end is kept for the next read."""
+        data = self.pending + data
+        end = len(data)
+        if b"\xff" in data and (m := TELNET_UNFINISHED.search(data)):
+            end = m.start(1)
+        data, self.pending = data[:end], data[end:]
+        if len(self.pending) > READ:
+            self.pending = self.pending[:2] + self.pending[-1:]  # a long subnegotiation, only its end matters
+        if self.after_cr and data[:1] in (b"\n", b"\0"):
+            data = data[1:]
+        if data:
+            self.after_cr = data.endswith(b"\r")
+        return TELNET_NOISE.sub(b"", data)
+
+
+class TippseServer:
+    """Trainers for many connections, on one terminal and one text."""
+
+    def __init__(self, *, generated: bool = False) -> None:
+        """Install the shared SessionTerminal and load the text."""
+        self.terminal = SessionTerminal()
+        set_term(self.terminal)
+        self.text = TextSource()
+        self.generated = generated
+        if generated:
+            self.text.get_generated_line()  # build the model once, for all sessions
+        self.sessions = 0
+        self.keys = 0
+        self.cpu_start: float | None = None  # CPU time at the first connection
+
+    async def serve_telnet(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Run a Trainer for one telnet connection, see serve."""
+        await self.serve(reader, writer, telnet=True)
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, *, telnet: bool = False) -> None:
+        """Run a Trainer for one connection until the user leaves or the connection is closed."""
+        if self.cpu_start is None:
+            self.cpu_start = process_time()
+        self.sessions += 1
+        out, keys, telnet_input = SessionOutput(), SessionKeys(self.terminal), TelnetInput()
+        with self.terminal.session(out):
+            echo(esc.enter_fullscreen, esc.home, esc.clear_eos)
+            trainer = Trainer(generated=self.generated, text=self.text.session(), run=False)
+        writer.write((TELNET_HELLO if telnet else b"") + out.take())
+        alive = True
+        with contextlib.suppress(ConnectionError):
+            while alive and (data := await reader.read(READ)):
+                with self.terminal.session(out):
+                    for key in keys.feed(telnet_input.feed(data) if telnet else data):
+                        self.keys += 1
+                        if not (alive := trainer.handle_key(key)):
+                            echo(esc.normal, esc.exit_fullscreen)
+                            break
+                writer.write(out.take())
+                await writer.drain()
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+    async def run(self, *, host: str = "127.0.0.1", port: int = PORT, unix: Path | None = None) -> None:
+        """Serve until SIGINT or SIGTERM."""
+        if unix is None:
+            server = await asyncio.start_server(self.serve_telnet, host, port, backlog=BACKLOG)
+            where = f"telnet {host} {port}"
+        else:
+            server = await asyncio.start_unix_server(self.serve, unix, backlog=BACKLOG)
+            where = f"unix {unix}"
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(signum, stop.set)
+        async with server:
+            print(f"tippse server: {where}", flush=True)
+            await stop.wait()
+        print(self.report(), file=sys.stderr, flush=True)
+
+    def report(self) -> str:
+        """Return sessions, keys and CPU time since the first connection."""
+        cpu = process_time() - self.cpu_start if self.cpu_start is not None else 0.0
+        return f"{self.sessions} sessions, {self.keys} keys, {cpu:.3f} s CPU"
+
+
+def raise_open_files() -> None:
+    """Allow as many open files as possible, every session is a socket."""
+    try:
+        import resource  # noqa: PLC0415  # not on Windows
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY:
+        hard = 1 << 16
+    if soft < hard:
+        with contextlib.suppress(ValueError, OSError):
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main() -> None:
+    """Run the server."""
+    parser = argparse.ArgumentParser(description="Serve tippse to many users over telnet or a Unix socket")
+    parser.add_argument("file", nargs="?", type=Path, help="the text to type (default: local/werther.md)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=PORT, help=f"telnet port (default: {PORT})")
+    parser.add_argument("--unix", type=Path, help="listen on this Unix socket instead")
+    parser.add_argument("--generate", action="store_true", help="make up the lines from the n-grams of the text")
+    args = parser.parse_args()
+
+    if args.file:
+        text.DATAFILE = args.file
+    raise_open_files()
+    server = TippseServer(generated=args.generate)
+    asyncio.run(server.run(host=args.host, port=args.port, unix=args.unix))
+
+
+if __name__ == "__main__":
+    main()
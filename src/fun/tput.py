@@ -3,9 +3,11 @@
 import random
 from collections.abc import Callable
 from time import perf_counter
-import blessed
 
-term = blessed.Terminal()
+from termlib import esc, screen_size, term
+from termlib.trace import traced
+from termlib.width import width as text_width
+
 ALL_CHARS = "".join([chr(i) for i in range(32, 127)])
 patterns: list[str] = None  # pyright: ignore[reportAssignmentType] # initialized in recalc_patterns
 last_size: tuple[int, int] = None # pyright: ignore[reportAssignmentType]
@@ -15,7 +17,7 @@ recalc_time = 0.0
 
 def read_terminal_dimensions() -> tuple[int, int]:
     """Return height and width of current terminal window."""
-    return term.height, term.width
+    return screen_size()
 
 
 def clear_terminal() -> None:
@@ -29,13 +31,14 @@ def create_random_pattern(height: int, width: int, chars: str = ALL_CHARS) -> st
     Each character should have a random color, set using ANSI escape codes.
     """
     height, width = read_terminal_dimensions()
+    colors = esc.color_table()
     pattern_lines = []
     for i in range(height):
-        line = "".join(f"{term.color(random.randint(1, 255))}{random.choice(chars)}" for _ in range(width)) # pyright: ignore[reportArgumentType]
+        line = "".join(f"{colors[random.randint(1, 255)]}{random.choice(chars)}" for _ in range(width))
         if i == 0:
-            line = term.move_yx(0, 0) + line
+            line = esc.move_yx(0, 0) + line
         if i == height - 1:
-            line += term.normal
+            line += esc.normal
         pattern_lines.append(line)
     return "\n".join(pattern_lines)
 
@@ -60,6 +63,8 @@ def create_word_pattern(height: int, width: int, color_percent: float = 20.0) ->
     Returns:
         The pattern as a string with ANSI escape codes
     """
+    colors = esc.color_table()
+    normal = esc.normal
     pattern_lines = []
 
     for i in range(height):
@@ -72,7 +77,7 @@ def create_word_pattern(height: int, width: int, color_percent: float = 20.0) ->
             word_with_space = word + " "
 
             # Check if word fits
-            if current_width + len(word_with_space) > width:
+            if current_width + text_width(word_with_space) > width:
                 # Fill remaining space with spaces
                 remaining = width - current_width
                 line_parts.append(" " * remaining)
@@ -83,17 +88,17 @@ def create_word_pattern(height: int, width: int, color_percent: float = 20.0) ->
             should_color = (random.random() * 100) < color_percent
 
             if should_color:
-                colored_word = f"{term.color(random.randint(1, 255))}{word_with_space}{term.normal}"  # pyright: ignore[reportArgumentType]
+                colored_word = f"{colors[random.randint(1, 255)]}{word_with_space}{normal}"
                 line_parts.append(colored_word)
             else:
                 line_parts.append(word_with_space)
 
-            current_width += len(word_with_space)
+            current_width += text_width(word_with_space)
 
         line = "".join(line_parts)
 
         if i == 0:
-            line = term.move_yx(0, 0) + line
+            line = esc.move_yx(0, 0) + line
 
         pattern_lines.append(line)
 
@@ -111,6 +116,7 @@ def set_recalc_function(func: Callable[[int, int], list[str]]) -> None:
     _recalc_patterns = func
 
 
+@traced()
 def recalc_patterns() -> None:
     """Recalculate patterns based on current terminal size."""
     global patterns, last_size, recalculated, recalc_time  # noqa: PLW0603
@@ -124,6 +130,7 @@ def recalc_patterns() -> None:
     recalc_time += dt
 
 
+@traced()
 def print_random_pattern() -> None:
     """Print the given pattern to the terminal."""
     print(patterns[random.randint(0, len(patterns) - 1)])
@@ -0,0 +1,239 @@
+"""Run mini-vi keystroke scripts over files without a screen, for bulk edits.
+
+A script is written in vim's key notation: characters are typed as they are, special
+keys are written like <Esc>, <CR>, <BS>, <Del>, <Up>, <Down>, <Left>, <Right>, <C-z>,
+<C-r> or <lt> for "<", and line breaks in the script are ignored. Every file starts
+in insert mode at line 1, column 0, like an interactive session; the keys go through
+the same handlers, and the buffer is written back if it changed. Like a vim macro, the
+script stops at the first error, i.e. where the interactive editor would beep (a
+search without match, moving beyond the text).
+
+Files are processed in parallel in a process pool. Each worker resolves the script
+once and uses an editor that skips all rendering.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from termlib import set_term
+from termlib.replay import KEYS, ReplayTerminal
+
+from .command import scan
+from .config import Mode
+from .editor import Editor
+from .minivi import dispatch
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from blessed.keyboard import Keystroke
+
+NOTATION = {
+    "esc": KEYS["KEY_ESCAPE"],
+    "cr": KEYS["KEY_ENTER"],
+    "enter": KEYS["KEY_ENTER"],
+    "bs": KEYS["KEY_BACKSPACE"],
+    "del": KEYS["KEY_DELETE"],
+    "up": KEYS["KEY_UP"],
+    "down": KEYS["KEY_DOWN"],
+    "left": KEYS["KEY_LEFT"],
+    "right": KEYS["KEY_RIGHT"],
+    "c-z": KEYS["KEY_CTRL_Z"],
+    "c-r": KEYS["KEY_CTRL_R"],
+    "lt": "<",
+}
+NOTATION_RE = re.compile(r"<([A-Za-z-]+)>|(.)", re.DOTALL)
+
+
+def parse_script(text: str) -> list[str]:
+    """Return the raw keystrokes of a script in key notation. Raises ValueError for unknown keys."""
+    keys = []
+    for m in NOTATION_RE.finditer(text):
+        if m.group(1) is None:
+            if m.group(2) != "\n":
+                keys.append(m.group(2))
+        elif (seq := NOTATION.get(m.group(1).lower())) is not None:
+            keys.append(seq)
+        else:
+            raise ValueError(f"unknown key <{m.group(1)}>")
+    return keys
+
+
+class BatchEditor(Editor):
+    """Editor without a screen: rendering is skipped, alerts are collected, a beep stops the script."""
+
+    def __init__(self) -> None:
+        """Initialize the editor state and an empty list of messages."""
+        super().__init__()
+        self.messages: list[str] = []
+        self.stopped = False
+
+    def beep(self) -> None:  # type: ignore[override]
+        """Stop the script."""
+        self.stopped = True
+
+    @staticmethod
+    def echo(*args) -> None:  # noqa: ANN002
+        """Write nothing."""
+
+    def echo_line(self, y: int = -1) -> None:
+        """Paint nothing."""
+
+    def echo_lines_from(self, y: int) -> None:
+        """Paint nothing."""
+
+    def set_cursor(self) -> None:
+        """Only keep the cursor inside the line."""
+        self.x = min(self.x, len(self.lines[self.y + self.y_offset]))
+
+    _set_cursor = set_cursor
+
+    def alert(self, message: str | None, color: str | None = None) -> None:  # noqa: ARG002
+        """Collect the message."""
+        if message is not None:
+            self.messages.append(message)
+
+
+def edit(lines: list[str], keys: Iterable[Keystroke]) -> BatchEditor:
+    """Apply the keys to lines (in place) and return the editor."""
+    e = BatchEditor()
+    e.lines = lines
+    e.set_mode(Mode.insert)
+    for key in keys:
+        try:
+            dispatch(e, key)
+        except KeyboardInterrupt:
+            break
+        # no idle time to search in, so finish right away
+        while e.search is not None and not e.search.done:
+            scan(e)
+        if e.stopped:
+            break
+    return e
+
+
+@dataclass
+class FileResult:
+    """Outcome for one file."""
+
+    path: str
+    bytes: int
+    changed: bool = False
+    error: str = ""
+    messages: list[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchStats:
+    """Outcome for all files."""
+
+    files: int = 0
+    bytes: int = 0
+    changed: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files_per_sec(self) -> float:
+        """Return the number of files processed per second."""
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        """Return the MB (10^6 bytes) read per second."""
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+
+# resolved once per process by _init_worker
+_keys: list[Keystroke] = []
+
+
+def _init_worker(raw_keys: list[str]) -> None:
+    """Resolve the keystrokes. The terminal is a replay terminal, so nothing reaches the real one."""
+    global _keys  # noqa: PLW0603
+    terminal = ReplayTerminal(raw_keys)
+    set_term(terminal)
+    _keys = [terminal.inkey() for _ in raw_keys]
+
+
+def split_file(text: str) -> tuple[list[str], str, bool]:
+    """Return the lines of a file, its line ending and whether its last line has one.
+
+    Lines are split only at newlines, as the editor loads files. Like vim, a file is taken
+    as CRLF only if all its lines end with CRLF, otherwise a carriage return stays part of
+    its line. Either way, joining the lines gives back the text.
+    """
+    lines = text.split("\n")
+    final = len(lines) > 1 and not lines[-1]
+    if final:
+        lines.pop()
+    ended = lines if final else lines[:-1]
+    if ended and all(line.endswith("\r") for line in ended):
+        lines[: len(ended)] = [line[:-1] for line in ended]
+        return lines, "\r\n", final
+    return lines, "\n", final
+
+
+def process_file(path: str) -> FileResult:
+    """Run the script on one file and write it back if it changed."""
+    file_path = Path(path)
+    try:
+        text = file_path.read_text(encoding="utf-8", newline="")
+    except (OSError, UnicodeDecodeError) as ex:
+        return FileResult(path, 0, error=str(ex))
+    lines, newline, final = split_file(text)
+    original = list(lines)
+    e = edit(lines, _keys)
+    result = FileResult(path, len(text.encode()), messages=e.messages)
+    if e.lines != original:
+        new_text = newline.join(e.lines) + (newline if final else "")
+        try:
+            file_path.write_text(new_text, encoding="utf-8", newline="")
+        except OSError as ex:
+            result.error = str(ex)
+        else:
+            result.changed = True
+    return result
+
+
+def run_batch(script: str, files: list[str], jobs: int | None = None) -> BatchStats:
+    """Run the script (in key notation) on all files, with jobs processes (default: all CPUs).
+
+    With jobs=1 everything runs in this process.
+    """
+    raw_keys = parse_script(script)
+    jobs = jobs or os.cpu_count() or 1
+    stats = BatchStats()
+    t0 = perf_counter()
+    if jobs == 1 or len(files) == 1:
+        _init_worker(raw_keys)
+        try:
+            results: Iterable[FileResult] = [process_file(path) for path in files]
+        finally:
+            set_term(None)
+        _report(results, stats)
+    else:
+        chunksize = max(1, len(files) // (jobs * 4))
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(raw_keys,)) as pool:
+            _report(pool.map(process_file, files, chunksize=chunksize), stats)
+    stats.seconds = perf_counter() - t0
+    return stats
+
+
+def _report(results: Iterable[FileResult], stats: BatchStats) -> None:
+    """Count the results and print errors to stderr as they come in."""
+    for result in results:
+        stats.files += 1
+        stats.bytes += result.bytes
+        stats.changed += result.changed
+        if result.error:
+            stats.failed += 1
+            print(f"{result.path}: {result.error}", file=sys.stderr)
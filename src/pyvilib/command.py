@@ -0,0 +1,291 @@
+"""Handle key events in command mode: counts and motions, undo/redo, search and :line."""
+
+from __future__ import annotations
+import re
+from typing import TYPE_CHECKING
+
+from termlib import esc, screen_size
+
+from .config import Mode
+from .editor import Editor, key_handler
+from .insert import delete_chars, move_columns, move_lines, move_to_line
+from .search import Search
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from blessed.keyboard import Keystroke
+
+    from .undo import Op
+
+# command mode: command name (mostly one character) -> handler, the count is in e.count
+COMMANDS: dict[str, Callable[[Editor], None]] = {}
+
+# an optional count (not starting with 0, which is a command) and the command name
+COUNT_RE = re.compile(r"([1-9]\d*)?(.*)", re.DOTALL)
+
+
+def command(name: str) -> Callable[[Callable[[Editor], None]], Callable[[Editor], None]]:
+    """Register a handler for a command typed in command mode, like "x" or "gg"."""
+
+    def register(func: Callable[[Editor], None]) -> Callable[[Editor], None]:
+        COMMANDS[name] = func
+        return func
+
+    return register
+
+
+def char__command(e: Editor, key: Keystroke) -> None:
+    """Handle normal character input in command mode: collect count and command, then run it."""
+    pending = e.command + str(key)
+    count, name = COUNT_RE.fullmatch(pending).groups()  # type: ignore[union-attr]
+    if not name:
+        e.command = pending  # count so far
+    elif func := COMMANDS.get(name):
+        e.command = ""
+        e.count = int(count) if count else None
+        try:
+            func(e)
+        finally:
+            e.count = None
+    elif any(known.startswith(name) for known in COMMANDS):
+        e.command = pending  # e.g. the first g of gg
+    else:
+        e.command = ""
+        e.alert(f"'{name}'")  # Show the unknown command as a quick message
+
+
+@key_handler
+def key_escape__command(e: Editor) -> None:
+    """Forget a count or command typed so far."""
+    e.command = ""
+
+
+@command("i")
+def insert_mode(e: Editor) -> None:
+    """Switch to insert mode."""
+    e.set_mode(Mode.insert)
+
+
+#
+#       Motions and deletion, with counts: one jump or change, one repaint
+#
+
+
+@command("j")
+def down(e: Editor) -> None:
+    """Move count lines down."""
+    move_lines(e, e.count or 1)
+
+
+@command("k")
+def up(e: Editor) -> None:
+    """Move count lines up."""
+    move_lines(e, -(e.count or 1))
+
+
+@command("l")
+def right(e: Editor) -> None:
+    """Move count columns right."""
+    move_columns(e, e.count or 1)
+
+
+@command("h")
+def left(e: Editor) -> None:
+    """Move count columns left."""
+    move_columns(e, -(e.count or 1))
+
+
+@command("0")
+def line_start(e: Editor) -> None:
+    """Move to the start of the line."""
+    move_columns(e, -e.x)
+
+
+@command("$")
+def line_end(e: Editor) -> None:
+    """Move to the end of the line."""
+    move_columns(e, len(e.lines[e.y + e.y_offset]) - e.x)
+
+
+@command("G")
+def last_line(e: Editor) -> None:
+    """Go to line count, or the last line."""
+    move_to_line(e, e.count or e.line_base + len(e.lines))
+
+
+@command("gg")
+def first_line(e: Editor) -> None:
+    """Go to line count, or the first line."""
+    move_to_line(e, e.count or 1)
+
+
+@command("x")
+def delete(e: Editor) -> None:
+    """Delete count characters from the cursor on."""
+    delete_chars(e, e.count or 1)
+
+
+#
+#       Undo and redo in all modes
+#
+
+
+def replay(e: Editor, op: Op | None, nothing: str) -> None:
+    """Apply an operation from the journal without recording it, and show the result."""
+    if op is None:
+        e.beep()
+        e.alert(nothing)
+        return
+    e.journal.replaying = True
+    try:
+        e.apply(op)
+    finally:
+        e.journal.replaying = False
+    # the cursor goes where the change happened
+    y_index, x = (op.y + 1, 0) if op.kind == "split" else (op.y, op.x)
+    y_offset = e.y_offset
+    e.goto(y_index, x)
+    if e.y_offset == y_offset:  # not repainted by scrolling
+        if op.kind in ("insert", "delete"):
+            e.echo_line(op.y - e.y_offset)
+        else:
+            e.echo_lines_from(max(0, op.y - e.y_offset))
+    e.set_cursor()
+
+
+@command("u")
+@key_handler
+def key_ctrl_z(e: Editor) -> None:
+    """Undo the last change."""
+    replay(e, e.journal.pop_undo(), "nothing to undo")
+
+
+@key_handler
+def key_ctrl_r(e: Editor) -> None:
+    """Redo the last undone change."""
+    replay(e, e.journal.pop_redo(), "nothing to redo")
+
+
+#
+#       Prompt mode: /pattern and :line
+#
+
+
+@command("/")
+def search_prompt(e: Editor) -> None:
+    """Start typing a search pattern."""
+    start_prompt(e, "/")
+
+
+@command(":")
+def line_prompt(e: Editor) -> None:
+    """Start typing a command line, so far only a line number or $."""
+    start_prompt(e, ":")
+
+
+def start_prompt(e: Editor, char: str) -> None:
+    """Switch to prompt mode, with char as the first character of the line."""
+    e.command = char
+    e.set_mode(Mode.prompt)
+    echo_prompt(e)
+
+
+def echo_prompt(e: Editor) -> None:
+    """Show the line typed so far bottom left."""
+    e.echo(esc.move_yx(screen_size()[0] - 1, 0) + e.command[-19:].ljust(19))
+    e.set_cursor()
+
+
+def char__prompt(e: Editor, key: Keystroke) -> None:
+    """Handle normal character input in prompt mode."""
+    e.command += str(key)
+    echo_prompt(e)
+
+
+@key_handler
+def key_backspace__prompt(e: Editor) -> None:
+    """Remove the last character typed, or leave prompt mode if there is none."""
+    if len(e.command) <= 1:
+        key_escape__prompt(e)
+        return
+    e.command = e.command[:-1]
+    echo_prompt(e)
+
+
+@key_handler
+def key_escape__prompt(e: Editor) -> None:
+    """Leave prompt mode without doing anything."""
+    e.command = ""
+    e.set_mode(Mode.command)
+
+
+@key_handler
+def key_enter__prompt(e: Editor) -> None:
+    """Run the line typed."""
+    char, text = e.command[0], e.command[1:]
+    e.command = ""
+    e.set_mode(Mode.command)
+    if char == "/":
+        start_search(e, text)
+    elif text.isdigit() or text == "$":
+        move_to_line(e, e.line_base + len(e.lines) if text == "$" else int(text))
+    elif text:
+        e.beep()
+        e.alert(f"not a command: {text}")
+
+
+def start_search(e: Editor, pattern: str) -> None:
+    """Start searching for the pattern, or the last one if it is empty."""
+    pattern = pattern or (e.search.pattern if e.search else "")
+    if not pattern:
+        return
+    try:
+        e.search = Search(pattern, e.lines, e.y + e.y_offset + 1)
+    except re.error as ex:
+        e.beep()
+        e.alert(f"bad pattern: {ex.msg}")
+        return
+    e.search_jump_pending = True
+    e.echo_lines_from(0)  # highlight the visible lines
+    scan(e)
+
+
+def scan(e: Editor) -> None:
+    """Scan the next chunk of lines for the current search. Called while no key is pending."""
+    search = e.search
+    if search is None or search.done:
+        return
+    found = search.step()
+    if found is not None and e.search_jump_pending:
+        # jump as soon as the first match is known, the rest is scanned later
+        e.search_jump_pending = False
+        e.goto(found, search.column(found))
+        e.set_cursor()
+    if search.done:
+        e.search_jump_pending = False
+        if not search.matches:
+            e.beep()
+        e.alert(search.report(), color=e.cfg.success if search.matches else None)
+
+
+def jump(e: Editor, y_index: int | None) -> None:
+    """Move the cursor to a match, or beep if there is none."""
+    if y_index is None:
+        e.beep()
+        e.alert("no match" if e.search else "no search")
+        return
+    e.goto(y_index, e.search.column(y_index) if e.search else 0)
+    e.set_cursor()
+
+
+@command("n")
+def next_match(e: Editor) -> None:
+    """Jump to the next match."""
+    jump(e, e.search.next_match(e.y + e.y_offset) if e.search else None)
+
+
+@command("N")
+def previous_match(e: Editor) -> None:
+    """Jump to the previous match."""
+    jump(e, e.search.previous_match(e.y + e.y_offset) if e.search else None)
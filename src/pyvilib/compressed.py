@@ -0,0 +1,219 @@
+"""Load .gz, .xz and .bz2 files into mini-vi while decompressing them on the fly.
+
+The compression is detected by the magic bytes at the start of the file, not by its
+name. A StreamReader hands out the lines chunk by chunk, like a Follower does with a
+growing file, so the editor shows the first screen right away and loads the rest
+between keys. Each chunk becomes a Page of PagedLines, so only the pages in use are
+kept and a multi-GB file doesn't eat all memory.
+
+A page that was dropped is decompressed again from the nearest checkpoint before it.
+While reading, a checkpoint is taken every CHECKPOINT decompressed bytes: a copy of the
+zlib state for gzip (its 32 KiB window and a little), so jumping deep into the file
+costs at most that much decompression. The lzma and bz2 decompressors can't be copied, there are
+checkpoints only where a new stream starts (concatenated files, pbzip2), otherwise
+a page is decompressed again from the start. Reading on from the page before is free
+for all of them, so scrolling and searching don't start over for every page.
+"""
+
+from __future__ import annotations
+
+import bz2
+import lzma
+import zlib
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import partial
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from .follow import split_lines
+from .paged import Page
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+# decompressed bytes per poll and page, a few ms of work
+CHUNK = 1024 * 1024
+# decompressed bytes between checkpoints
+CHECKPOINT = 16 * 1024 * 1024
+# compressed bytes given to the decompressor at once
+INPUT = 64 * 1024
+
+# magic bytes -> new decompressor for a stream
+DECOMPRESSORS: dict[bytes, Callable[[], Any]] = {
+    b"\x1f\x8b": partial(zlib.decompressobj, wbits=zlib.MAX_WBITS | 16),
+    b"\xfd7zXZ\x00": lzma.LZMADecompressor,
+    b"BZh": bz2.BZ2Decompressor,
+}
+ERRORS = (OSError, EOFError, lzma.LZMAError, zlib.error)
+
+
+def opener_for(path: Path) -> Callable[[], Any] | None:
+    """Return the decompressor factory for a compressed file, or None if it isn't compressed (in a known way)."""
+    with path.open("rb") as f:
+        head = f.read(6)
+    for magic, decompressor in DECOMPRESSORS.items():
+        if head.startswith(magic):
+            return decompressor
+    return None
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """Where decompressing can start again."""
+
+    raw: int  # offset in the file of the input not given to the decompressor yet
+    out: int  # decompressed bytes before
+    state: Any = None  # a copy of the decompressor, None to start a new stream at raw
+
+
+class Decompressing:
+    """Decompress a file from a checkpoint on."""
+
+    def __init__(self, path: Path, new: Callable[[], Any], at: Checkpoint) -> None:
+        """Open the file at the checkpoint. Raises OSError if it can't be opened."""
+        self.new = new
+        self.file = path.open("rb")
+        self.file.seek(at.raw)
+        self.out = at.out  # decompressed bytes before what read() returns next
+        self.d = new() if at.state is None else at.state.copy()
+        self.fresh = at.state is None  # at the start of a stream
+        self.first = at.raw == 0  # the first stream, garbage after a later one is ignored like gzip does
+        self.unused = b""  # input after the end of a stream
+
+    def close(self) -> None:
+        """Close the file."""
+        self.file.close()
+
+    def read(self, n: int) -> bytes:
+        """Return up to n (> 0) decompressed bytes, b"" at the end. Raises one of ERRORS if the file is broken."""
+        while True:
+            d = self.d
+            if tail := getattr(d, "unconsumed_tail", b""):  # zlib keeps the input it didn't get to
+                data = tail
+            elif not getattr(d, "needs_input", True):  # lzma and bz2 keep the output
+                data = b""
+            else:
+                data = self.unused or self.file.read(INPUT)
+                self.unused = b""
+                if not data:
+                    if not self.fresh:
+                        raise EOFError("compressed file ended before the end-of-stream marker was reached")
+                    return b""
+            try:
+                out = d.decompress(data, n)
+            except ERRORS:
+                if self.fresh and not self.first:
+                    return b""  # trailing garbage
+                raise
+            self.fresh = False
+            if d.eof:
+                self.unused = d.unused_data
+                self.d = self.new()
+                self.fresh, self.first = True, False
+            if out:
+                self.out += len(out)
+                return out
+
+    def take(self, n: int, *, keep: bool = True) -> bytes:
+        """Return the next n decompressed bytes (fewer at the end), or skip them if not keep."""
+        chunks = []
+        end = self.out + n
+        while self.out < end and (data := self.read(min(end - self.out, CHUNK))):
+            if keep:
+                chunks.append(data)
+        return b"".join(chunks)
+
+    def checkpoint(self) -> Checkpoint | None:
+        """Return a checkpoint to continue from here, or None if the decompressor can't be copied."""
+        raw = self.file.tell() - len(self.unused)
+        if self.fresh:
+            return Checkpoint(raw, self.out)
+        if hasattr(self.d, "copy"):
+            return Checkpoint(raw, self.out, self.d.copy())  # with the input it didn't get to
+        return None
+
+
+class StreamReader:
+    """Read the lines of a compressed file in chunks, which can be read again later."""
+
+    # loading a file, the cursor stays where it is
+    follow_end = False
+    # how long the editor waits for keys once everything is read
+    interval = 0.35
+
+    def __init__(self, path: Path, new: Callable[[], Any]) -> None:
+        """Open the file. Raises OSError if it can't be opened."""
+        self.path = path
+        self.new = new
+        self.stream = Decompressing(path, new, Checkpoint(0, 0))
+        self.checkpoints = [Checkpoint(0, 0)]
+        self.pending = b""
+        self.start = 0  # decompressed offset of pending
+        self.behind = True  # not everything read yet
+        self.t0 = perf_counter()
+        # set once when done, for the editor to show
+        self.event = ""
+        # a stream of a page read again, kept to read the next page
+        self.again: Decompressing | None = None
+
+    def close(self) -> None:
+        """Close the files."""
+        self.stream.close()
+        if self.again is not None:
+            self.again.close()
+
+    def due(self) -> bool:
+        """Return True while there is more to read."""
+        return self.behind
+
+    def poll(self) -> list[str]:
+        """Return the next chunk of lines, as a Page."""
+        self.event = ""
+        if not self.behind:
+            return []
+        stream = self.stream
+        chunks = [self.pending]
+        size = 0
+        try:
+            while size < CHUNK and (data := stream.read(CHUNK - size)):
+                chunks.append(data)
+                size += len(data)
+                if stream.out - self.checkpoints[-1].out >= CHECKPOINT and (cp := stream.checkpoint()):
+                    self.checkpoints.append(cp)
+        except ERRORS as ex:
+            self._done(f"broken after {stream.out / 1e6:.1f} MB: {ex}")
+        else:
+            if size < CHUNK:
+                self._done(f"loaded {stream.out / 1e6:.1f} MB in {perf_counter() - self.t0:.1f} s")
+        data = b"".join(chunks)
+        end = len(data) if not self.behind else data.rfind(b"\n") + 1
+        page, self.pending = data[:end], data[end:]
+        start, self.start = self.start, self.start + end
+        lines = split_lines(b"", page, final=True)[0]
+        return Page(lines, partial(self.fetch, start, end))
+
+    def fetch(self, start: int, size: int) -> list[str]:
+        """Return the lines of the size decompressed bytes from offset start on, decompressing them again."""
+        cp = self.checkpoints[bisect_right(self.checkpoints, start, key=lambda cp: cp.out) - 1]
+        stream = self.again
+        # go on from the page read before if there is no checkpoint in between
+        if stream is None or not cp.out <= stream.out <= start:
+            if stream is not None:
+                stream.close()
+            stream = self.again = Decompressing(self.path, self.new, cp)
+        try:
+            stream.take(start - stream.out, keep=False)
+            data = stream.take(size)
+        except ERRORS:
+            stream.close()
+            self.again = None
+            return []  # changed on disk since, the lines are shown empty
+        return split_lines(b"", data, final=True)[0]
+
+    def _done(self, event: str) -> None:
+        """Stop reading."""
+        self.behind = False
+        self.event = event
+        self.stream.close()
@@ -4,9 +4,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import Self
 
-from blessed import Terminal
-
-term = Terminal()
+from termlib import esc, on_reset
 
 # make it an enum for modes
 
@@ -16,6 +14,7 @@ class Mode(Enum):
 
     insert = "INSERT"
     command = "COMMAND"
+    prompt = "PROMPT"
 
 
 class Config:
@@ -31,9 +30,26 @@ class Config:
 
     def __init__(self) -> None:
         """Initialize the configuration with default values."""
+        if getattr(self, "_initialized", False):
+            return
+        self._initialized = True
 
         # consider moving these to a separate theme or style class later
-        self.dim = term.color_hex("#888888")
-        self.bold = term.bright_cyan
-        self.alert = term.color_hex("#880000")
-        self.success = term.color_hex("#008800")
+        self.dim: str = esc.color_hex("#888888")
+        self.bold: str = esc.bright_cyan
+        self.alert: str = esc.color_hex("#880000")
+        self.success: str = esc.color_hex("#008800")
+
+        # styles of the syntax highlighting, by token kind
+        self.syntax: dict[str, str] = {
+            "keyword": esc.color_hex("#5f87d7"),
+            "string": esc.color_hex("#87af5f"),
+            "comment": self.dim,
+            "number": esc.color_hex("#d7875f"),
+        }
+
+
+@on_reset
+def _reset_config() -> None:
+    """Resolve the colors again for a new terminal."""
+    Config._instance = None  # noqa: SLF001
@@ -4,14 +4,18 @@ from __future__ import annotations
 from time import time
 from typing import Self, TYPE_CHECKING
 
-from blessed import Terminal
+import termlib
+from termlib import esc, screen_size, term, trace
+from termlib.width import column, fit, index_at, width
 
 from .config import Config, Mode
+from .undo import Op, UndoJournal
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, MutableSequence
 
-term = Terminal()
+    from .search import Search
+    from .syntax import Highlighter
 
 
 class Editor:
@@ -21,7 +25,10 @@ class Editor:
         """Initialize the editor state."""
 
         self.mode: Mode = Mode.insert
+        # typed so far: a count and command prefix in command mode, the line in prompt mode
         self.command: str = ""
+        # the count typed before the command being executed, e.g. 10 for 10j
+        self.count: int | None = None
 
         # position relative to the visible area
         self.y: int = 0
@@ -29,21 +36,37 @@ class Editor:
 
         # line number will need some room
         self.line_start: int = 6
+        # first visible column, the same for all lines
+        self.x_offset: int = 0
 
         # approach: edit each line individually and track edits in the line
-        self.lines: list[str] = [""]
+        self.lines: MutableSequence[str] = [""]
         self.y_offset: int = 0  # y + offset = lines index
+        # lines of the file above lines[0] that were not loaded (following the last lines of a log, -n)
+        self.line_base: int = 0
 
         # dirty message in last,20
         self.alert_since: float = -1.0
         self.alert_length: int = 0
         self.alert_timeout: float = 2.0
 
+        # resolved once, not on every render
+        self.cfg: Config = Config()
+
+        # all changes to lines go through apply(), which records them here
+        self.journal: UndoJournal = UndoJournal()
+
+        # the last search, possibly still scanning
+        self.search: Search | None = None
+        self.search_jump_pending: bool = False
+
+        # syntax highlighting, if there is a lexer for the file
+        self.syntax: Highlighter | None = None
+
     @staticmethod
     def echo(*args) -> None:  # noqa: ANN002
         """Print all arguments with no separator and flush the result."""
-        output = "".join(str(arg) for arg in args)
-        print(output, end="", flush=True)
+        termlib.echo(*args)
 
     @staticmethod
     def beep() -> None:
@@ -53,7 +76,12 @@ class Editor:
     @property
     def max_y(self) -> int:
         """Return the maximum y valid for cursor position."""
-        return term.height - 2
+        return screen_size()[0] - 2
+
+    @property
+    def text_width(self) -> int:
+        """Return the number of columns for text, right of the line numbers."""
+        return screen_size()[1] - self.line_start
 
     @property
     def in_last_line(self) -> bool:
@@ -65,10 +93,95 @@ class Editor:
         """Return True if there are more lines below the current cursor."""
         return self.y + self.y_offset < len(self.lines) - 1
 
+    def apply(self, op: Op) -> None:
+        """Apply an edit operation to the lines, and record it in the journal."""
+        line = self.lines[op.y]
+        if op.kind == "insert":
+            self.lines[op.y] = line[: op.x] + op.text + line[op.x :]
+        elif op.kind == "delete":
+            self.lines[op.y] = line[: op.x] + line[op.x + len(op.text) :]
+        elif op.kind == "split":
+            self.lines[op.y] = line[: op.x]
+            self.lines.insert(op.y + 1, line[op.x :])
+        else:  # join
+            self.lines[op.y] = line + self.lines.pop(op.y + 1)
+        self.journal.record(op)
+        if self.search is not None:
+            self.search.edited(op)
+        if self.syntax is not None:
+            self.syntax.edited(op)
+
+    def insert_text(self, y_index: int, x: int, text: str) -> None:
+        """Insert text into line y_index at x."""
+        self.apply(Op("insert", y_index, x, text))
+
+    def delete_text(self, y_index: int, x: int, n: int = 1) -> None:
+        """Delete n characters from line y_index at x."""
+        self.apply(Op("delete", y_index, x, self.lines[y_index][x : x + n]))
+
+    def split_line(self, y_index: int, x: int) -> None:
+        """Break line y_index at x."""
+        self.apply(Op("split", y_index, x))
+
+    def join_lines(self, y_index: int) -> None:
+        """Append line y_index + 1 to line y_index."""
+        self.apply(Op("join", y_index, len(self.lines[y_index])))
+
+    def append_lines(self, new: list[str], *, follow: bool = True) -> None:
+        """Append lines from outside, e.g. a followed file. Repaint only what is visible of them.
+
+        With follow, a cursor in the last line moves on to the new last line.
+        """
+        if not new:
+            return
+        if len(self.lines) == 1 and not self.lines[0]:  # nothing but the empty line of a new buffer
+            self.lines[:] = new  # same list, the search and highlighter keep theirs
+            first = 0
+        else:
+            first = len(self.lines)
+            self.lines.extend(new)
+        if self.search is not None:
+            self.search.appended(first)
+        y_offset = self.y_offset
+        if follow and self.y + self.y_offset >= first - 1:
+            self.goto(len(self.lines) - 1, 0)
+        if self.y_offset == y_offset and first <= self.y_offset + self.max_y:
+            self.echo_lines_from(max(0, first - self.y_offset))
+        self.set_cursor()
+
+    def clear_lines(self) -> None:
+        """Start over with the empty line of a new buffer, e.g. when a followed file was truncated."""
+        self.lines[:] = [""]  # same list, the highlighter keeps it
+        self.line_base = 0
+        self.journal = UndoJournal()  # the edits were made to lines that are gone
+        self.search = None
+        if self.syntax is not None:
+            del self.syntax.states[1:]
+        self.y = self.y_offset = self.x = self.x_offset = 0
+        self.echo_lines_from(0)
+        self.set_cursor()
+
+    def goto(self, y_index: int, x: int) -> None:
+        """Move the cursor to line y_index, column x. Scroll and repaint once if it's not visible.
+
+        Lines up to half a screen away are scrolled into view at the edge, farther ones to the middle.
+        """
+        half = self.max_y // 2
+        if y_index < self.y_offset:
+            self.y_offset = y_index if self.y_offset - y_index <= half else max(0, y_index - half)
+            self.echo_lines_from(0)
+        elif y_index > self.y_offset + self.max_y:
+            near = y_index - self.y_offset - self.max_y <= half
+            self.y_offset = y_index - self.max_y if near else y_index - half
+            self.echo_lines_from(0)
+        self.y = y_index - self.y_offset
+        self.x = x
+
     def set_mode(self, mode: Mode) -> None:
-        """Set the current mode, and show it bottom left."""
+        """Set the current mode, and show it bottom left. Edits in the new mode are a new undo step."""
         self.mode = mode
-        self.echo(term.move_yx(term.height - 1, 0) + f"{Config().dim}-- {mode.value} --    {term.normal}")
+        self.journal.break_run()
+        self.echo(esc.move_yx(screen_size()[0] - 1, 0) + f"{self.cfg.dim}-- {mode.value} --    {esc.normal}")
         self.set_cursor()
 
     def echo_line(self, y: int = -1) -> None:
@@ -76,27 +189,37 @@ class Editor:
         if y == -1:
             y = self.y
         y_eff = y + self.y_offset
-        self.echo(
-            f"{term.move_yx(y, 0)}{Config().dim}{y_eff + 1:3d} | {term.normal}" + self.lines[y_eff] + term.clear_eol(),
-        )
-
+        # only the visible columns, however long the line is
+        full = self.lines[y_eff]
+        x0 = self.x_offset
+        x1 = fit(full, x0, self.text_width)
+        line = visible = full[x0:x1]
+        if self.search is not None:
+            line = self.search.highlight(visible, esc.reverse, esc.normal)
+        if line is visible and self.syntax is not None:  # search matches win over syntax
+            line = self.syntax.render(y_eff, self.cfg.syntax, esc.normal, x0, x1)
+        number = self.line_base + y_eff + 1
+        self.echo(f"{esc.move_yx(y, 0)}{self.cfg.dim}{number:3d} | {esc.normal}" + line + esc.clear_eol)
+
+    @trace.traced()
     def echo_lines_from(self, y: int) -> None:
         """Show all lines from the given y to the end of the edit area."""
         for y_ in range(y, self.max_y + 1):
             if y_ + self.y_offset >= len(self.lines):
-                self.echo(term.move_yx(y_, 0) + term.clear_eol())
+                self.echo(esc.move_yx(y_, 0) + esc.clear_eol)
             else:
                 self.echo_line(y_)
 
     def set_cursor(self) -> None:
         """Move the cursor to the current position, cleaning possible alert."""
         self.revoke_alert()  # clear any dirty message before moving the cursor
+        base = self.line_base
         self.echo(
-            term.move_yx(term.height - 1, 40),
-            Config().dim,
-            term.italic,
-            f"{self.y + self.y_offset + 1},{self.x} [{len(self.lines)}] ",
-            term.normal,
+            esc.move_yx(screen_size()[0] - 1, 40),
+            self.cfg.dim,
+            esc.italic,
+            f"{base + self.y + self.y_offset + 1},{self.x} [{base + len(self.lines)}] ",
+            esc.normal,
         )
         self._set_cursor()
 
@@ -104,25 +227,40 @@ class Editor:
         """Move cursor w/o cleaning alert. ONLY for set_cursor & alert/revoke_alert."""
         line = self.lines[self.y + self.y_offset]
         self.x = min(self.x, len(line))
-        self.echo(term.move_yx(self.y, self.x + self.line_start))
-
-    def alert(self, message: str | None, color: str = Config().alert) -> None:
-        """Show a quick message at the bottom of the terminal, col 20."""
+        self._scroll_x(line)
+        # in columns, wide characters take two
+        self.echo(esc.move_yx(self.y, column(line, self.x) - column(line, self.x_offset) + self.line_start))
+
+    def _scroll_x(self, line: str) -> None:
+        """Scroll horizontally by half a screen width or more if the cursor left the visible columns."""
+        width = self.text_width
+        if self.x_offset <= self.x and column(line, self.x) - column(line, self.x_offset) < width:
+            return
+        half = max(1, width // 2)
+        # multiples of half the width, so scrolling back and forth doesn't repaint on every key
+        col = column(line, self.x)
+        self.x_offset = 0 if col < width else index_at(line, (col - half // 2) // half * half)
+        self.echo_lines_from(0)
+
+    def alert(self, message: str | None, color: str | None = None) -> None:
+        """Show a quick message at the bottom of the terminal, col 20. Default color is Config().alert."""
         if message is None:
             return
+        if color is None:
+            color = self.cfg.alert
         if self.alert_length > 0:
             # right pad with spaces to overwrite previous message
             message = message.ljust(self.alert_length)
-        self.echo(term.move_yx(term.height - 1, 20))
-        self.echo(color + message + term.normal)
+        self.echo(esc.move_yx(screen_size()[0] - 1, 20))
+        self.echo(color + message + esc.normal)
         self._set_cursor()  # move back to the current position
         self.alert_since = time()
-        self.alert_length = len(message)
+        self.alert_length = width(message)
 
     def revoke_alert(self) -> None:
         """Clear the quick message if it has been more than 2 seconds since it was shown."""
         if self.alert_since > 0 and time() - self.alert_since > self.alert_timeout:
-            self.echo(term.move_yx(term.height - 1, 20) + " " * self.alert_length)
+            self.echo(esc.move_yx(screen_size()[0] - 1, 20) + " " * self.alert_length)
             self._set_cursor()  # move back to the current position
             self.alert_since = -1.0
             self.alert_length = 0
@@ -156,7 +294,15 @@ class KeyHandlerRegistry:
 
         if key_name not in self.handlers:
             self.handlers[key_name] = {}
-        self.handlers[key_name][mode] = func
+        # tracing: one span per handled key, the registered function is returned unwrapped
+        self.handlers[key_name][mode] = trace.wrap(
+            func,
+            "execute_handler",
+            "keys",
+            lambda e: {"mode": e.mode.value},
+            key=key_name,
+            handler=func.__name__,
+        )
         return func
 
     def execute_handler(self, key_name: str, editor: Editor) -> bool:
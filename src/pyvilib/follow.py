@@ -0,0 +1,112 @@
+"""Follow a growing file like tail -F, reading only the bytes appended since the last look.
+
+The file is watched by polling os.stat, which costs about a microsecond. When its inode
+changes (log rotation) the new file is read from the start, when it shrinks (truncation)
+it is read again from the start. An unfinished last line is held back until its newline
+arrives. One poll reads at most MAX_READ bytes, so the editor stays responsive when the
+file grows faster than it can be shown; the rest follows with the next poll. That goes for
+the rest of a rotated file too, the new one is opened with the poll after the old one was
+read to its end. The poll reading the start of a file again sets event, and returns only
+lines of the new start.
+"""
+
+from __future__ import annotations
+
+import os
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+POLL_INTERVAL = 0.1
+MAX_READ = 8 * 1024 * 1024
+
+
+class Follower:
+    """Read the lines appended to a file."""
+
+    # the cursor in the last line moves on with new lines
+    follow_end = True
+
+    def __init__(self, path: Path, interval: float = POLL_INTERVAL, start: int = 0) -> None:
+        """Open the file, reading starts at byte offset start. Raises OSError if it can't be opened."""
+        self.path = path
+        self.interval = interval
+        self.file = path.open("rb")
+        st = os.fstat(self.file.fileno())
+        self.inode = st.st_dev, st.st_ino
+        self.file.seek(start)
+        self.offset = start
+        self.pending = b""  # the unfinished last line
+        self.behind = True  # more to read than the last poll could take
+        self.last_poll = -1.0
+        self.drained = False  # the rotated file is read to its end
+        # what happened to the file, for the editor to show: "", "truncated" or "rotated"
+        self.event = ""
+
+    def close(self) -> None:
+        """Close the file."""
+        self.file.close()
+
+    def due(self) -> bool:
+        """Return True if it's time to poll again."""
+        return self.behind or monotonic() - self.last_poll >= self.interval
+
+    def poll(self) -> list[str]:
+        """Return the complete lines appended since the last poll."""
+        self.last_poll = monotonic()
+        self.event = ""
+        try:
+            st = self.path.stat()
+        except OSError:
+            return []  # rotated away, the new file isn't there yet
+        if (st.st_dev, st.st_ino) != self.inode:
+            if not self.drained:
+                # what was written to the old file before it was moved, the new one with the next poll
+                data = self.file.read(MAX_READ)
+                self.behind = True
+                self.drained = len(data) < MAX_READ
+                return self._split(data, final=self.drained)
+            self._reopen("rotated")
+        elif st.st_size < self.offset:
+            self.file.seek(0)
+            self._restart("truncated")
+        elif st.st_size == self.offset:
+            self.behind = False
+            return []
+        data = self.file.read(MAX_READ)
+        self.offset += len(data)
+        self.behind = len(data) == MAX_READ
+        return self._split(data)
+
+    def _split(self, data: bytes, *, final: bool = False) -> list[str]:
+        """Return the complete lines of the pending bytes and data, keep the rest pending."""
+        lines, self.pending = split_lines(self.pending, data, final=final)
+        return lines
+
+    def _reopen(self, event: str) -> None:
+        """Switch to the file now at path."""
+        self.file.close()
+        self.file = self.path.open("rb")
+        st = os.fstat(self.file.fileno())
+        self.inode = st.st_dev, st.st_ino
+        self._restart(event)
+
+    def _restart(self, event: str) -> None:
+        """Read from the start again."""
+        self.offset = 0
+        self.pending = b""
+        self.drained = False
+        self.event = event
+
+
+def split_lines(pending: bytes, data: bytes, *, final: bool = False) -> tuple[list[str], bytes]:
+    """Return the complete lines in pending + data, and the unfinished rest (none if final)."""
+    if not data and not (final and pending):
+        return [], pending
+    *lines, pending = (pending + data).split(b"\n")
+    if final and pending:
+        lines.append(pending)
+        pending = b""
+    return [line.decode("utf-8", errors="replace").rstrip("\r") for line in lines], pending
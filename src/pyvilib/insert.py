@@ -1,18 +1,20 @@
 """Handle key events in insert mode."""
 
-from blessed.keyboard import Keystroke
+from __future__ import annotations
+from typing import TYPE_CHECKING
 
 from .config import Mode
 from .editor import Editor, key_handler
 
+if TYPE_CHECKING:
+    from blessed.keyboard import Keystroke
+
 
 def char__insert(e: Editor, key: Keystroke) -> None:
     """Handle normal character input."""
-    y_index = e.y + e.y_offset
-    line = e.lines[y_index]
     if e.mode == Mode.insert:
         # insert the character at the current position
-        e.lines[y_index] = line[: e.x] + key + line[e.x :]
+        e.insert_text(e.y + e.y_offset, e.x, str(key))
         e.x += 1
         e.echo_line()
         e.set_cursor()
@@ -92,6 +94,52 @@ def key_right(e: Editor) -> None:
     e.set_cursor()
 
 
+#
+#       Moving and deleting by more than one step, for counts in command mode
+#
+
+
+def move_lines(e: Editor, n: int) -> None:
+    """Move the cursor n lines down (up for negative n) in one jump."""
+    y_index = e.y + e.y_offset
+    target = max(0, min(y_index + n, len(e.lines) - 1))
+    if target == y_index:
+        e.beep()  # Can't move, bell sound
+        return
+    e.goto(target, e.x)
+    e.set_cursor()
+
+
+def move_to_line(e: Editor, number: int) -> None:
+    """Move the cursor to the start of line number (1 based, clamped to the text) in one jump."""
+    e.goto(max(0, min(number - 1 - e.line_base, len(e.lines) - 1)), 0)
+    e.set_cursor()
+
+
+def move_columns(e: Editor, n: int) -> None:
+    """Move the cursor n columns right (left for negative n) in one jump."""
+    target = max(0, min(e.x + n, len(e.lines[e.y + e.y_offset])))
+    if target == e.x and n:
+        e.beep()  # Can't move, bell sound
+        return
+    e.x = target
+    e.set_cursor()
+
+
+def delete_chars(e: Editor, n: int) -> None:
+    """Delete n characters from the cursor on (as far as there are) as one change."""
+    y_index = e.y + e.y_offset
+    n = min(n, len(e.lines[y_index]) - e.x)
+    if n <= 0:
+        e.beep()  # Nothing to delete, bell sound
+        return
+    e.journal.break_run()  # one undo step per command, not merged with edits before or after it
+    e.delete_text(y_index, e.x, n)
+    e.journal.break_run()
+    e.echo_line()
+    e.set_cursor()
+
+
 #
 #       Delete forward and backward in INSERT mode
 #
@@ -101,10 +149,8 @@ def key_right(e: Editor) -> None:
 def key_backspace__insert(e: Editor) -> None:
     """Handle backspace key press in INSERT mode."""
     if e.x > 0:
-        y_index = e.y + e.y_offset
-        line = e.lines[y_index]
-        # remove the character at the current position
-        e.lines[y_index] = line[: e.x - 1] + line[e.x :]
+        # remove the character before the current position
+        e.delete_text(e.y + e.y_offset, e.x - 1)
         e.x -= 1
         e.echo_line()
         e.set_cursor()
@@ -112,7 +158,7 @@ def key_backspace__insert(e: Editor) -> None:
         e.y -= 1  # move up
         y_above = e.y + e.y_offset
         e.x = len(e.lines[y_above])  # end of line above
-        e.lines[y_above] += e.lines.pop(y_above + 1)
+        e.join_lines(y_above)
         if e.y < 0:  # scrolled up beyond visible area before
             e.y += 1
             e.y_offset -= 1
@@ -129,12 +175,12 @@ def key_delete__insert(e: Editor) -> None:
     line = e.lines[y_index]
     if e.x < len(line):
         # remove the character at the current position
-        e.lines[y_index] = line[: e.x] + line[e.x + 1 :]
+        e.delete_text(y_index, e.x)
         e.echo_line()
         e.set_cursor()
     elif e.y + e.y_offset < len(e.lines) - 1:
         # join with next line
-        e.lines[y_index] += e.lines.pop(y_index + 1)
+        e.join_lines(y_index)
         e.echo_lines_from(e.y)
         e.set_cursor()  # just where it is, now in the middle of the joinde line
     else:
@@ -144,12 +190,8 @@ def key_delete__insert(e: Editor) -> None:
 @key_handler
 def key_enter__insert(e: Editor) -> None:
     """Enter in insert mode: Break line here."""
-    y_index = e.y + e.y_offset
-    line = e.lines[y_index]
     # split the line at the current position
-    new_line = line[e.x :]
-    e.lines[y_index] = line[: e.x]
-    e.lines.insert(y_index + 1, new_line)
+    e.split_line(e.y + e.y_offset, e.x)
     if e.in_last_line:  # try to scroll
         e.y_offset += 1
         e.echo_lines_from(0)
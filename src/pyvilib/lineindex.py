@@ -0,0 +1,151 @@
+"""A sparse index of line offsets for big files, cached on disk between sessions.
+
+The index holds the byte offset of every STRIDE-th line, so finding line n means one
+lookup and skipping at most STRIDE - 1 lines. It is stored with the inode, size and
+mtime of the file. Reopening an unchanged file reads the index instead of the file;
+if the file only grew (an appended log), just the new bytes are scanned.
+
+Index files live in $XDG_CACHE_HOME/pyvian/lineindex (default ~/.cache/...), one per
+path, as a small header plus the raw array. When they take more than MAX_CACHE bytes
+together, the least recently written ones are removed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+from array import array
+from itertools import accumulate
+from pathlib import Path
+from typing import BinaryIO
+
+STRIDE = 256
+CHUNK = 8 * 1024 * 1024
+MAX_CACHE = 64 * 1024 * 1024
+
+# magic, inode, size, mtime_ns, lines, indexed bytes (up to the end of the last complete line)
+HEADER = struct.Struct("<4sQQqQQ")
+MAGIC = b"PVL1"
+
+
+def cache_dir() -> Path:
+    """Return the directory of the index files."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pyvian" / "lineindex"
+
+
+class LineIndex:
+    """Offsets of every STRIDE-th line of a file, and the number of complete lines."""
+
+    def __init__(self) -> None:
+        """Initialize an index of nothing."""
+        self.offsets = array("Q", [0])  # line 0 starts at 0
+        self.lines = 0
+        self.indexed = 0  # bytes up to the end of the last complete line
+        self.scanned = 0  # bytes actually read to build or extend this index
+
+    def extend(self, f: BinaryIO) -> None:
+        """Scan the file f (binary, any position) from self.indexed to its end."""
+        f.seek(self.indexed)
+        pending = 0  # bytes of an unfinished line at the end of the previous chunk
+        while data := f.read(CHUNK):
+            self.scanned += len(data)
+            # offsets in data of the newlines ending the complete lines
+            ends = list(accumulate(map(len, data.split(b"\n")), lambda a, b: a + b + 1, initial=-1))[1:-1]
+            if not ends:
+                pending += len(data)
+                continue
+            start = self.indexed + pending  # file offset of data[0]
+            # checkpoint lines m (multiples of STRIDE) start after the newline ending line m - 1
+            first = -(self.lines + 1) % STRIDE
+            self.offsets.extend(start + end + 1 for end in ends[first::STRIDE])
+            self.lines += len(ends)
+            self.indexed = start + ends[-1] + 1
+            pending = len(data) - ends[-1] - 1
+
+    def offset(self, n: int, f: BinaryIO) -> int:
+        """Return the byte offset of line n (0 based), reading at most STRIDE lines of f."""
+        n = min(n, self.lines)
+        offset = self.offsets[n // STRIDE]
+        skip = n % STRIDE
+        if skip:
+            f.seek(offset)
+            for _ in range(skip):
+                offset += len(f.readline())
+        return offset
+
+    def to_bytes(self, st: os.stat_result) -> bytes:
+        """Return the index with the identity of the file as stored on disk."""
+        header = HEADER.pack(MAGIC, st.st_ino, st.st_size, st.st_mtime_ns, self.lines, self.indexed)
+        return header + self.offsets.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> tuple[LineIndex, tuple[int, int, int]] | None:
+        """Return the index and (inode, size, mtime_ns) of the file it was built for, or None if not valid."""
+        if len(data) < HEADER.size:
+            return None
+        magic, inode, size, mtime_ns, lines, indexed = HEADER.unpack_from(data)
+        if magic != MAGIC or (len(data) - HEADER.size) % 8:
+            return None
+        index = cls()
+        index.offsets = array("Q")
+        index.offsets.frombytes(data[HEADER.size :])
+        index.lines, index.indexed = lines, indexed
+        if len(index.offsets) != lines // STRIDE + 1:
+            return None
+        return index, (inode, size, mtime_ns)
+
+
+def cache_path(path: Path) -> Path:
+    """Return the index file for path."""
+    return cache_dir() / (hashlib.sha1(str(path.resolve()).encode()).hexdigest() + ".idx")  # noqa: S324
+
+
+def line_index(path: Path) -> LineIndex:
+    """Return the index of path, from the cache if possible, and update the cache."""
+    with path.open("rb") as f:
+        st = os.fstat(f.fileno())
+        index = None
+        try:
+            cached = LineIndex.from_bytes(cache_path(path).read_bytes())
+        except OSError:
+            cached = None
+        if cached is not None:
+            index, (inode, size, mtime_ns) = cached
+            if (inode, size, mtime_ns) == (st.st_ino, st.st_size, st.st_mtime_ns):
+                return index
+            if inode != st.st_ino or size >= st.st_size:
+                index = None  # replaced, truncated or rewritten, not appended to
+        if index is None:
+            index = LineIndex()
+        index.extend(f)
+    save(path, index, st)
+    return index
+
+
+def save(path: Path, index: LineIndex, st: os.stat_result) -> None:
+    """Write the index to the cache and evict old index files. Failing to write is no problem."""
+    target = cache_path(path)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(index.to_bytes(st))
+        tmp.replace(target)
+        evict(target.parent)
+    except OSError:
+        pass
+
+
+def evict(directory: Path, max_bytes: int = MAX_CACHE) -> None:
+    """Remove the oldest index files until all together take at most max_bytes."""
+    files = []
+    for p in directory.glob("*.idx"):
+        st = p.stat()
+        files.append((st.st_mtime_ns, st.st_size, p))
+    total = sum(size for _, size, _ in files)
+    for _, size, p in sorted(files):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
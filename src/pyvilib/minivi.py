@@ -1,12 +1,28 @@
 """Main entry point for the mini-vi editor."""
 
+from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 import sys
+from typing import TYPE_CHECKING
 
 from .config import Config, Mode
 from .editor import Editor, KeyHandlerRegistry, term
+from .compressed import StreamReader, opener_for
+from .follow import Follower
+from .lineindex import line_index
+from .paged import PagedLines, file_pages
+from .command import char__command, char__prompt, scan
 from .insert import char__insert  # also loads the file and registers the handlers
+from .syntax import Highlighter, lexer_for
+
+if TYPE_CHECKING:
+    from collections.abc import MutableSequence
+
+    from blessed.keyboard import Keystroke
+
+# files from this size on are read page by page
+BIG_FILE = 16 * 1024 * 1024
 
 
 @dataclass
@@ -15,60 +31,141 @@ class LoadResult:
 
     success: bool
     message: str
-    content: list[str]
+    content: MutableSequence[str]
+    filename: str = ""
+    # lines still to come, from a followed or compressed file
+    source: Follower | StreamReader | None = None
+    # lines of the file not loaded, above the first line of content
+    line_base: int = 0
 
 
-def load() -> LoadResult:
+def load(argv: list[str] | None = None) -> LoadResult:
     """Load file content if a filename is given as a command line argument, otherwise return empty content."""
-    if len(sys.argv) > 1:
-        if sys.argv[1].startswith("--"):
-            if sys.argv[1] == "--debug":
+    if argv is None:
+        argv = sys.argv
+    if argv[1:2] in (["-f"], ["--follow"]) and argv[2:]:
+        return load_follow(argv[2:])
+    if len(argv) > 1:
+        if argv[1].startswith("--"):
+            if argv[1] == "--debug":
                 print(KeyHandlerRegistry().handlers)
                 input("Press Enter to start the editor...")
         else:
-            filename = sys.argv[1]
+            filename = argv[1]
             here = Path.cwd()
             file_path = here / filename
             try:
+                if opener := opener_for(file_path):
+                    # the first page now, the rest decompressed while the editor runs
+                    reader = StreamReader(file_path, opener)
+                    content = PagedLines()
+                    content.extend(reader.poll() or [""])
+                    return LoadResult(
+                        success=True,
+                        message=filename,
+                        content=content,
+                        filename=filename,
+                        source=reader,
+                    )
+                if file_path.stat().st_size >= BIG_FILE:
+                    # through the cached line index, the lines are read when they are shown
+                    content = file_pages(file_path, line_index(file_path), rest=True)
+                    return LoadResult(success=True, message=filename, content=content or [""], filename=filename)
                 with file_path.open("r") as f:
                     content = [line.rstrip("\n") for line in f]
-                return LoadResult(success=True, message=filename, content=content)
+                return LoadResult(success=True, message=filename, content=content, filename=filename)
             except Exception as ex:
                 return LoadResult(success=False, message=f"Error opening file: {ex}", content=[])
     return LoadResult(success=True, message="new file", content=[""])
 
 
-def mini_vi() -> None:
-    """Run main editor loop."""
+def load_follow(args: list[str]) -> LoadResult:
+    """Load the lines of a file to follow, all or the last n with -n N (--lines N) before the file name."""
+    tail = None
+    if args[0] in ("-n", "--lines") and args[2:] and args[1].isdigit():
+        tail, args = int(args[1]), args[2:]
+    filename = args[0]
+    path = Path.cwd() / filename
+    try:
+        index = line_index(path)
+        skipped = 0 if tail is None else max(0, index.lines - tail)
+        content = file_pages(path, index, skipped)
+        follower = Follower(path, start=index.indexed)
+    except OSError as ex:
+        return LoadResult(success=False, message=f"Error opening file: {ex}", content=[""])
+    return LoadResult(
+        success=True,
+        message=f"following {filename}" + (f" from line {skipped + 1}" if skipped else ""),
+        content=content or [""],
+        filename=filename,
+        source=follower,
+        line_base=skipped,
+    )
+
+
+def dispatch(e: Editor, key: Keystroke) -> None:
+    """Handle one keystroke. Raises KeyboardInterrupt when the editor shall be left."""
+
+    # all thinggs KEY_...
+    if key.name and KeyHandlerRegistry().execute_handler(key.name, e):
+        return
+
+    if key.is_sequence:
+        e.alert(key.name)  # Show the key name as a quick message
+    else:  # noqa: PLR5501
+        if e.mode == Mode.insert:
+            char__insert(e, key)
+        elif e.mode == Mode.prompt:
+            char__prompt(e, key)
+        else:
+            char__command(e, key)
+
+
+def idle_timeout(source: Follower | StreamReader | None) -> float:
+    """Return how long to wait for a key, shorter when following or still loading a file."""
+    if source is None:
+        return 0.35
+    return 0 if source.behind else source.interval
+
+
+def mini_vi(argv: list[str] | None = None) -> None:
+    """Run main editor loop. argv defaults to sys.argv."""
 
     # KeyHandlerRegistry().show_keybindings()
 
-    lr = load()
+    lr = load(argv)
 
     with term.fullscreen(), term.raw():
         e = Editor()
         e.alert(lr.message, color=Config().success if lr.success else Config().alert)
         e.lines = lr.content
+        e.line_base = lr.line_base
+        if lexer := lexer_for(lr.filename):
+            e.syntax = Highlighter(lexer, e.lines)
 
         e.set_mode(Mode.insert)
         e.echo_lines_from(0)
         e.set_cursor()
+        source = lr.source
         while True:
-            key = term.inkey(timeout=0.35)
+            if source is not None and source.due():
+                # new lines: the bytes appended since the last poll, or the next decompressed chunk
+                new = source.poll()
+                if source.event in ("truncated", "rotated"):
+                    e.clear_lines()  # the lines shown aren't in the file anymore
+                e.append_lines(new, follow=source.follow_end)
+                if source.event:
+                    e.alert(f"{lr.filename} {source.event}")
+            scanning = e.search is not None and not e.search.done
+            key = term.inkey(timeout=0 if scanning else idle_timeout(source))
             if key is None or key == "":
+                if scanning:
+                    scan(e)  # search in the background while no key is pressed
                 continue  # No key pressed, continue the loop
 
-            # all thinggs KEY_...
             try:
-                if key.name and KeyHandlerRegistry().execute_handler(key.name, e):
-                    continue
+                dispatch(e, key)
             except KeyboardInterrupt:
                 break  # Exit on Ctrl+C
-
-            if key.is_sequence:
-                e.alert(key.name)  # Show the key name as a quick message
-            else:  # noqa: PLR5501
-                if e.mode == Mode.insert:
-                    char__insert(e, key)
-                else:
-                    e.alert(f"'{key}'")  # Show the character as a quick message
+    if source is not None:
+        source.close()
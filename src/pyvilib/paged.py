@@ -0,0 +1,229 @@
+"""The lines of a file too big to hold at once, read page by page when they are used.
+
+PagedLines is a list of lines to the editor, but keeps them in pages: runs of lines of
+the file, PAGE_LINES of a plain file found through its line index, or a chunk of a
+compressed one. A page that isn't loaded is just its number of lines and how to read it again,
+using one of its lines loads it. When more than MAX_PAGES pages are loaded, the one used
+longest ago is dropped. Pages with edits and lines added from outside (a followed file,
+the lines of a new buffer) are never dropped, there is no file to read them from.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, MutableSequence
+from functools import partial
+from typing import TYPE_CHECKING, overload
+
+from .follow import split_lines
+from .lineindex import STRIDE
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from .lineindex import LineIndex
+
+# about 50 MB of lines in pages of 1 MiB
+MAX_PAGES = 32
+# lines of a page of a plain file, a multiple of the STRIDE of the line index
+PAGE_LINES = 16 * STRIDE
+
+
+class Page(list[str]):
+    """Lines read from a file, and how to read them again."""
+
+    __slots__ = ("fetch",)
+
+    def __init__(self, lines: Iterable[str], fetch: Callable[[], list[str]]) -> None:
+        """Initialize with the lines and a function returning them again."""
+        super().__init__(lines)
+        self.fetch = fetch
+
+
+class _Part:
+    """A page of PagedLines: its lines if loaded, how many there are and how to read them again."""
+
+    __slots__ = ("count", "fetch", "lines")
+
+    def __init__(self, count: int, fetch: Callable[[], list[str]] | None, lines: list[str] | None) -> None:
+        self.count = count
+        self.fetch = fetch  # None once the lines are kept for good
+        self.lines = lines
+
+
+class PagedLines(MutableSequence[str]):
+    """Lines kept in pages, which are read when used and dropped when not used for long."""
+
+    def __init__(self, max_pages: int = MAX_PAGES) -> None:
+        """Initialize no lines, keeping at most max_pages pages that can be read again."""
+        self.max_pages = max_pages
+        self.parts: list[_Part] = []
+        self.starts: list[int] = [0]  # index of the first line of each part, and the number of lines
+        self.loaded: OrderedDict[_Part, None] = OrderedDict()  # droppable parts, used longest ago first
+        self.fetches = 0  # pages read so far
+        self._hit: tuple[int, int, list[str]] = (0, 0, [])  # the part used last, for reading line by line
+
+    def add_page(self, count: int, fetch: Callable[[], list[str]]) -> None:
+        """Append a page of count lines that isn't loaded, fetch() returns them."""
+        if count:
+            self.parts.append(_Part(count, fetch, None))
+            self.starts.append(self.starts[-1] + count)
+
+    def __len__(self) -> int:
+        """Return the number of lines."""
+        return self.starts[-1]
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+    @overload
+    def __getitem__(self, i: slice) -> list[str]: ...
+    def __getitem__(self, i: int | slice) -> str | list[str]:
+        """Return line i, or a list of the lines of a slice."""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start, end, lines = self._hit
+        if start <= i < end:
+            return lines[i - start]
+        p = self._part_at(i)
+        return self._lines_of(p)[i - self.starts[p]]
+
+    @overload
+    def __setitem__(self, i: int, value: str) -> None: ...
+    @overload
+    def __setitem__(self, i: slice, value: Iterable[str]) -> None: ...
+    def __setitem__(self, i: int | slice, value: str | Iterable[str]) -> None:
+        """Replace line i, or all lines with [:]."""
+        if isinstance(i, slice):
+            if i != slice(None):
+                raise TypeError("PagedLines only supports replacing all lines at once ([:] =)")
+            self.clear()
+            self.extend(value)
+            return
+        if i < 0:
+            i += len(self)
+        p = self._part_at(i)
+        self._keep(p)[i - self.starts[p]] = value  # type: ignore[assignment]
+
+    def __delitem__(self, i: int | slice) -> None:
+        """Remove line i."""
+        if isinstance(i, slice):
+            raise TypeError("PagedLines doesn't support deleting slices, lines are removed one by one")
+        if i < 0:
+            i += len(self)
+        p = self._part_at(i)
+        del self._keep(p)[i - self.starts[p]]
+        self._resized(p, -1)
+
+    def insert(self, i: int, value: str) -> None:
+        """Insert a line before index i, at the end if i is the number of lines."""
+        i = max(0, min(i + len(self) if i < 0 else i, len(self)))
+        if not self.parts:
+            self.extend([value])
+            return
+        p = len(self.parts) - 1 if i == len(self) else self._part_at(i)
+        self._keep(p).insert(i - self.starts[p], value)
+        self._resized(p, 1)
+
+    def extend(self, values: Iterable[str]) -> None:
+        """Append lines. A Page can be dropped and read again, other lines are kept."""
+        if isinstance(values, Page):
+            if values:
+                part = _Part(len(values), values.fetch, list(values))
+                self.parts.append(part)
+                self.starts.append(self.starts[-1] + part.count)
+                self._used(part)
+            return
+        lines = list(values)
+        if lines:
+            self.parts.append(_Part(len(lines), None, lines))
+            self.starts.append(self.starts[-1] + len(lines))
+
+    def clear(self) -> None:
+        """Remove all lines."""
+        self.parts.clear()
+        self.starts[:] = [0]
+        self.loaded.clear()
+        self._hit = (0, 0, [])
+
+    def _part_at(self, i: int) -> int:
+        """Return the index of the part holding line i."""
+        if not 0 <= i < len(self):
+            raise IndexError("line index out of range")
+        return bisect_right(self.starts, i) - 1
+
+    def _lines_of(self, p: int) -> list[str]:
+        """Return the lines of part p, reading them if they aren't loaded."""
+        part = self.parts[p]
+        if part.lines is None:
+            assert part.fetch is not None
+            lines = part.fetch()
+            self.fetches += 1
+            # the file changed under us, keep the line numbers anyway
+            del lines[part.count :]
+            lines.extend([""] * (part.count - len(lines)))
+            part.lines = lines
+        if part.fetch is not None:
+            self._used(part)
+        self._hit = (self.starts[p], self.starts[p + 1], part.lines)
+        return part.lines
+
+    def _used(self, part: _Part) -> None:
+        """Mark a droppable part as just used, and drop the one used longest ago if too many are loaded."""
+        loaded = self.loaded
+        loaded[part] = None
+        loaded.move_to_end(part)
+        while len(loaded) > self.max_pages:
+            old, _ = loaded.popitem(last=False)
+            if old.lines is self._hit[2]:
+                self._hit = (0, 0, [])
+            old.lines = None
+
+    def _keep(self, p: int) -> list[str]:
+        """Return the lines of part p for an edit, they are never dropped from now on."""
+        lines = self._lines_of(p)
+        part = self.parts[p]
+        part.fetch = None
+        self.loaded.pop(part, None)
+        return lines
+
+    def _resized(self, p: int, delta: int) -> None:
+        """Account for a line more or less in part p."""
+        part = self.parts[p]
+        part.count += delta
+        starts = self.starts
+        for k in range(p + 1, len(starts)):
+            starts[k] += delta
+        if not part.count:
+            del self.parts[p]
+            del starts[p + 1]
+        self._hit = (0, 0, [])
+
+
+def file_pages(path: Path, index: LineIndex, first: int = 0, *, rest: bool = False) -> PagedLines:
+    """Return the lines of an indexed file from line first on, as pages read when used.
+
+    With rest, the bytes after the last complete line are the last line, otherwise they are left out.
+    """
+    lines = PagedLines()
+    with path.open("rb") as f:
+        start = index.offset(first, f)
+        size = f.seek(0, 2)
+    y = min(first, index.lines)
+    while y < index.lines:
+        y_next = min((y // PAGE_LINES + 1) * PAGE_LINES, index.lines)
+        end = index.offsets[y_next // STRIDE] if y_next % STRIDE == 0 else index.indexed
+        lines.add_page(y_next - y, partial(read_lines, path, start, end))
+        y, start = y_next, end
+    if rest and size > index.indexed:
+        lines.add_page(1, partial(read_lines, path, index.indexed, size))
+    return lines
+
+
+def read_lines(path: Path, start: int, end: int) -> list[str]:
+    """Return the lines in the bytes start to end of the file, the last one may be unfinished."""
+    with path.open("rb") as f:
+        f.seek(start)
+        return split_lines(b"", f.read(end - start), final=True)[0]
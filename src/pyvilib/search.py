@@ -0,0 +1,156 @@
+"""Incremental regex search for the mini-vi editor.
+
+The lines are scanned in chunks while the editor waits for keys, starting below the
+cursor and wrapping around at the end, so a search in a huge file never blocks typing.
+The sorted index of matching lines is kept up to date when lines are edited, split or
+joined, including the part of the file that is still to be scanned.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, bisect_right
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from .undo import Op
+
+# lines per scan step, a few ms for simple patterns
+CHUNK_LINES = 20_000
+
+
+class Search:
+    """The matching lines of one pattern, found incrementally."""
+
+    def __init__(self, pattern: str, lines: Sequence[str], start: int = 0) -> None:
+        """Prepare the search, beginning with line index start. Raises re.error for bad patterns."""
+        self.pattern = pattern
+        self.regex = re.compile(pattern)
+        self.lines = lines
+        # line indices with a match, sorted
+        self.matches: list[int] = []
+        # scan from start to the end, then from 0 to start
+        self.start = start % len(lines) if lines else 0
+        self.pos = self.start
+        self.wrapped = False
+        self.done = not lines
+        # for the report
+        self.t0 = perf_counter()
+        self.first_match_seconds: float | None = None
+        self.scanned = 0
+        self.scan_seconds = 0.0
+
+    def step(self, budget: int = CHUNK_LINES) -> int | None:
+        """Scan the next chunk of lines. Return the first match found in it, if any."""
+        if self.done:
+            return None
+        t0 = perf_counter()
+        end = self.start if self.wrapped else len(self.lines)
+        stop = min(self.pos + budget, end)
+        search, lines = self.regex.search, self.lines
+        found = [y for y in range(self.pos, stop) if search(lines[y])]
+        i = bisect_left(self.matches, self.pos)
+        self.matches[i:i] = found
+        self.scanned += stop - self.pos
+        self.pos = stop
+        if self.pos >= end:
+            if self.wrapped or self.start == 0:
+                self.done = True
+            else:
+                self.wrapped, self.pos = True, 0
+        t1 = perf_counter()
+        self.scan_seconds += t1 - t0
+        if found and self.first_match_seconds is None:
+            self.first_match_seconds = t1 - self.t0
+        return found[0] if found else None
+
+    def appended(self, first: int) -> None:
+        """Check the lines from index first on, which were appended to the end."""
+        if not (self.done or self.wrapped):
+            return  # the scan will get there
+        del self.matches[bisect_left(self.matches, first) :]  # lines replaced, not just appended
+        search, lines = self.regex.search, self.lines
+        self.matches.extend(y for y in range(first, len(lines)) if search(lines[y]))
+
+    def is_scanned(self, y: int) -> bool:
+        """Return True if line index y has been scanned already."""
+        if self.done:
+            return True
+        if self.wrapped:
+            return y >= self.start or y < self.pos
+        return self.start <= y < self.pos
+
+    def edited(self, op: Op) -> None:
+        """Update the index after an edit operation was applied to the lines."""
+        if op.kind == "split":
+            self._shift(op.y, 1)
+            self._update(op.y + 1)
+        elif op.kind == "join":
+            i = bisect_left(self.matches, op.y + 1)
+            if i < len(self.matches) and self.matches[i] == op.y + 1:
+                del self.matches[i]
+            self._shift(op.y + 1, -1)
+        self._update(op.y)
+
+    def _shift(self, y: int, delta: int) -> None:
+        """Move everything below line index y by delta lines."""
+        matches = self.matches
+        for i in range(bisect_right(matches, y), len(matches)):
+            matches[i] += delta
+        if self.pos > y:
+            self.pos += delta
+        if self.start > y:
+            self.start += delta
+
+    def _update(self, y: int) -> None:
+        """Add or remove line index y from the index, if it was scanned."""
+        if not self.is_scanned(y):
+            return
+        i = bisect_left(self.matches, y)
+        indexed = i < len(self.matches) and self.matches[i] == y
+        if self.regex.search(self.lines[y]):
+            if not indexed:
+                self.matches.insert(i, y)
+        elif indexed:
+            del self.matches[i]
+
+    def next_match(self, y: int) -> int | None:
+        """Return the first matching line index after y, wrapping around."""
+        if not self.matches:
+            return None
+        i = bisect_right(self.matches, y)
+        return self.matches[i % len(self.matches)]
+
+    def previous_match(self, y: int) -> int | None:
+        """Return the last matching line index before y, wrapping around."""
+        if not self.matches:
+            return None
+        i = bisect_left(self.matches, y)
+        return self.matches[i - 1]
+
+    def column(self, y: int) -> int:
+        """Return the column of the first match in line index y, or 0."""
+        m = self.regex.search(self.lines[y])
+        return m.start() if m else 0
+
+    def highlight(self, line: str, on: str, off: str) -> str:
+        """Return line with all non-empty matches wrapped in the on and off sequences."""
+        parts = []
+        last = 0
+        for m in self.regex.finditer(line):
+            if m.end() > m.start():
+                parts.extend((line[last : m.start()], on, m.group(), off))
+                last = m.end()
+        if not parts:
+            return line
+        parts.append(line[last:])
+        return "".join(parts)
+
+    def report(self) -> str:
+        """Return the number of matches, the time to the first one and the scan speed."""
+        first = "no match" if self.first_match_seconds is None else f"first in {self.first_match_seconds * 1e3:.1f} ms"
+        speed = self.scanned / self.scan_seconds if self.scan_seconds else 0.0
+        return f"/{self.pattern}: {len(self.matches)} lines, {first}, {speed:,.0f} lines/s"
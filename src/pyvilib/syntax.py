@@ -0,0 +1,185 @@
+"""Syntax highlighting for the mini-vi editor, with per-line lexer state.
+
+A lexer turns one line into tokens, given the state at the start of the line (e.g.
+"inside a triple quoted string"), and returns the state at its end. The highlighter
+keeps the start state of every line it has seen, and caches the tokens by line text
+and start state. After an edit only the edited line is lexed again, and the following
+lines only as long as their start state changes. Tokens are only computed for lines
+that are painted, so the cost of a keystroke doesn't depend on the length of the file.
+"""
+
+from __future__ import annotations
+
+import functools
+import keyword
+import re
+from bisect import bisect_right
+from operator import itemgetter
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Sequence
+
+    from .undo import Op
+
+# start, end, style name
+Token = tuple[int, int, str]
+
+# don't follow a changed state further than this after an edit, forget the rest
+MAX_RELEX = 500
+# longer lines (minified code, data) are shown without highlighting, like vim's synmaxcol
+MAX_COLUMNS = 3000
+TOKEN_CACHE = 4096
+
+
+class Lexer(Protocol):
+    """Split lines into tokens."""
+
+    initial: Hashable
+
+    def tokens(self, line: str, state: Hashable) -> tuple[tuple[Token, ...], Hashable]:
+        """Return the tokens of line and the state at its end."""
+        ...
+
+    def end_state(self, line: str, state: Hashable) -> Hashable:
+        """Return only the state at the end of line, as cheap as possible."""
+        ...
+
+
+class PythonLexer:
+    """Keywords, strings, comments and numbers of Python.
+
+    The state is the quote of an open triple quoted string, or "".
+    """
+
+    initial = ""
+
+    TOKEN_RE = re.compile(
+        r"""(?P<comment>\#.*)"""
+        r"""|(?P<triple>[rbfuRBFU]{0,2}(?:'''|\"\"\"))"""
+        r"""|(?P<string>[rbfuRBFU]{0,2}(?:'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*"))"""
+        r"""|(?P<number>\b\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?j?\b)"""
+        r"""|(?P<name>\b[A-Za-z_]\w*\b)""",
+    )
+    KEYWORDS = frozenset(keyword.kwlist + keyword.softkwlist)
+
+    def tokens(self, line: str, state: str) -> tuple[tuple[Token, ...], str]:
+        """Return the tokens of line and the state at its end."""
+        tokens: list[Token] = []
+        pos = 0
+        if state:
+            end = line.find(state)
+            if end < 0:
+                return ((0, len(line), "string"),), state
+            pos = end + 3
+            tokens.append((0, pos, "string"))
+        search = self.TOKEN_RE.search
+        while m := search(line, pos):
+            kind = m.lastgroup
+            pos = m.end()
+            if kind == "triple":
+                quote = m.group()[-3:]
+                end = line.find(quote, pos)
+                if end < 0:
+                    tokens.append((m.start(), len(line), "string"))
+                    return tuple(tokens), quote
+                pos = end + 3
+                tokens.append((m.start(), pos, "string"))
+            elif kind == "name":
+                if m.group() in self.KEYWORDS:
+                    tokens.append((m.start(), pos, "keyword"))
+            elif kind is not None:
+                tokens.append((m.start(), pos, kind))
+        return tuple(tokens), ""
+
+    def end_state(self, line: str, state: str) -> str:
+        """Return the state at the end of line, without tokenizing lines free of triple quotes."""
+        if state:
+            if state not in line:
+                return state
+        elif '"""' not in line and "'''" not in line:
+            return ""
+        return self.tokens(line, state)[1]
+
+
+# file suffix -> lexer, add more here
+LEXERS: dict[str, Lexer] = {".py": PythonLexer()}
+
+
+def lexer_for(filename: str) -> Lexer | None:
+    """Return the lexer for a file name, or None if there is none for its suffix."""
+    return LEXERS.get(Path(filename).suffix)
+
+
+class Highlighter:
+    """Start states of the lines seen so far, and a cache of their tokens."""
+
+    def __init__(self, lexer: Lexer, lines: Sequence[str]) -> None:
+        """Initialize for the given lines, which are edited in place later on."""
+        self.lexer = lexer
+        self.lines = lines
+        # states[i] is the state at the start of line i, for the first len(states) lines
+        self.states: list[Hashable] = [lexer.initial]
+        self.tokens = functools.lru_cache(maxsize=TOKEN_CACHE)(lexer.tokens)
+        self.relexed = 0  # lines lexed again after edits, for benchmarks
+
+    def state_of(self, y: int) -> Hashable:
+        """Return the state at the start of line index y, lexing the lines above if needed."""
+        states, lines, end_state = self.states, self.lines, self.lexer.end_state
+        while len(states) <= y:
+            i = len(states) - 1
+            states.append(end_state(lines[i], states[i]))
+        return states[y]
+
+    def line_tokens(self, y: int) -> tuple[Token, ...]:
+        """Return the tokens of line index y."""
+        return self.tokens(self.lines[y], self.state_of(y))[0]
+
+    def render(self, y: int, styles: dict[str, str], normal: str, x0: int = 0, x1: int | None = None) -> str:
+        """Return the columns x0 to x1 of line index y, with the style sequences for its tokens."""
+        line = self.lines[y]
+        if x1 is None:
+            x1 = len(line)
+        if len(line) > MAX_COLUMNS:
+            return line[x0:x1]
+        tokens = self.line_tokens(y)
+        parts = []
+        last = x0
+        # the first token ending right of x0, then on until x1
+        for i in range(bisect_right(tokens, x0, key=itemgetter(1)), len(tokens)):
+            start, end, kind = tokens[i]
+            if start >= x1:
+                break
+            start, end = max(start, x0), min(end, x1)
+            parts.extend((line[last:start], styles[kind], line[start:end], normal))
+            last = end
+        if not parts:
+            return line[x0:x1]
+        parts.append(line[last:x1])
+        return "".join(parts)
+
+    def edited(self, op: Op) -> None:
+        """Update the states after an edit operation was applied to the lines."""
+        states = self.states
+        y = op.y
+        if y >= len(states):
+            return  # not seen yet
+        if op.kind == "split":
+            states.insert(y + 1, None)  # never equal to a real state
+        elif op.kind == "join" and y + 1 < len(states):
+            del states[y + 1]
+        # lex again while the start state of the next line changes
+        lines, end_state = self.lines, self.lexer.end_state
+        i = y
+        while i + 1 < len(states) and i + 1 < len(lines):
+            state = end_state(lines[i], states[i])
+            self.relexed += 1
+            if states[i + 1] == state:
+                return
+            states[i + 1] = state
+            i += 1
+            if i - y >= MAX_RELEX:
+                del states[i + 1 :]
+                return
+        del states[len(lines) :]
@@ -0,0 +1,111 @@
+"""Undo and redo for the mini-vi editor, as a journal of small edit operations.
+
+Instead of snapshots of the buffer, every change is recorded as the operation that
+made it: text inserted or deleted at a position, a line split or two lines joined.
+Undo applies the inverse operation, so its cost depends on the size of the change,
+not on the size of the file. Typing (and deleting) character by character is
+coalesced into one operation, and the journal is capped by an estimate of its memory
+use, forgetting the oldest operations first.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import deque
+from typing import NamedTuple
+
+# per entry, on top of the text: the tuple, its ints and the deque slot
+ENTRY_OVERHEAD = 120
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class Op(NamedTuple):
+    """One edit operation on the buffer, in line index coordinates."""
+
+    # "insert", "delete", "split" or "join"
+    kind: str
+    y: int
+    x: int
+    # the text inserted or deleted, empty for split and join
+    text: str = ""
+
+    def inverse(self) -> Op:
+        """Return the operation undoing this one."""
+        return Op(INVERSE[self.kind], self.y, self.x, self.text)
+
+    def size(self) -> int:
+        """Return the estimated memory used by this operation in the journal."""
+        return ENTRY_OVERHEAD + (sys.getsizeof(self.text) if self.text else 0)
+
+
+INVERSE = {"insert": "delete", "delete": "insert", "split": "join", "join": "split"}
+
+
+class UndoJournal:
+    """Undo and redo stacks of operations, capped by memory."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Initialize empty stacks."""
+        self.max_bytes = max_bytes
+        self.undo_stack: deque[Op] = deque()
+        self.redo_stack: list[Op] = []
+        self.bytes = 0
+        # set while undo/redo apply operations, so they are not recorded again
+        self.replaying = False
+        # the last operation may be extended by the next one (typing, backspacing)
+        self.coalesce = True
+
+    def record(self, op: Op) -> None:
+        """Record an operation just applied to the buffer."""
+        if self.replaying:
+            return
+        if self.redo_stack:
+            self.bytes -= sum(done.size() for done in self.redo_stack)
+            self.redo_stack.clear()
+        if self.coalesce and self.undo_stack and (merged := self._merge(self.undo_stack[-1], op)):
+            self.bytes -= self.undo_stack[-1].size()
+            self.undo_stack[-1] = op = merged
+        else:
+            self.undo_stack.append(op)
+        self.coalesce = True
+        self.bytes += op.size()
+        while self.bytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.bytes -= self.undo_stack.popleft().size()
+
+    @staticmethod
+    def _merge(last: Op, op: Op) -> Op | None:
+        """Return one operation doing both last and op, or None if they can't be merged."""
+        if last.y != op.y or last.kind != op.kind:
+            return None
+        if op.kind == "insert" and op.x == last.x + len(last.text):
+            # typing on
+            return Op("insert", last.y, last.x, last.text + op.text)
+        if op.kind == "delete" and op.x + len(op.text) == last.x:
+            # backspace
+            return Op("delete", op.y, op.x, op.text + last.text)
+        if op.kind == "delete" and op.x == last.x:
+            # delete forward
+            return Op("delete", last.y, last.x, last.text + op.text)
+        return None
+
+    def break_run(self) -> None:
+        """Don't merge the next operation into the last one, e.g. after moving the cursor."""
+        self.coalesce = False
+
+    def pop_undo(self) -> Op | None:
+        """Return the inverse of the last operation and move it to the redo stack."""
+        if not self.undo_stack:
+            return None
+        op = self.undo_stack.pop()
+        self.redo_stack.append(op)
+        self.coalesce = False
+        return op.inverse()
+
+    def pop_redo(self) -> Op | None:
+        """Return the last undone operation and move it back to the undo stack."""
+        if not self.redo_stack:
+            return None
+        op = self.redo_stack.pop()
+        self.undo_stack.append(op)
+        self.coalesce = False
+        return op
@@ -0,0 +1,17 @@
+"""Gemeinsames Terminal-Zeug für fun, pyvilib und tipplib."""
+
+from .terminal import LazyTerminal, echo, get_term, is_created, on_reset, screen_size, set_term, term
+from .escapes import EscapeTable, esc
+
+__all__ = [
+    "EscapeTable",
+    "LazyTerminal",
+    "echo",
+    "esc",
+    "get_term",
+    "is_created",
+    "on_reset",
+    "screen_size",
+    "set_term",
+    "term",
+]
@@ -0,0 +1,78 @@
+"""Precomputed and memoized escape sequences for the render hot paths.
+
+Every capability lookup on a blessed Terminal goes through a few layers of
+attribute magic and formatter objects. The render paths ask for the same few
+sequences on every keystroke or frame, so they get them from here as plain strings.
+"""
+
+from __future__ import annotations
+
+import functools
+
+from .terminal import get_term, on_reset
+
+# bound for memoized cursor moves; a 200x80 screen fits twice
+MAX_MOVES = 1 << 15
+
+
+class EscapeTable:
+    """Escape sequences of the shared terminal as plain strings.
+
+    Capabilities without parameters are plain attributes, e.g. `esc.normal` or `esc.clear_eol`.
+    They are looked up once and then stored on the instance, so later accesses are ordinary
+    attribute reads.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty table, everything is filled on demand."""
+        self._moves: dict[tuple[int, int], str] = {}
+        self._colors: tuple[str, ...] = ()
+
+    def __getattr__(self, name: str) -> str:
+        # only called for names not yet in the instance dict
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = str(getattr(get_term(), name))
+        setattr(self, name, value)
+        return value
+
+    def clear(self) -> None:
+        """Forget everything, e.g. because the terminal was replaced."""
+        self.__dict__.clear()
+        self.__init__()
+        color_hex.cache_clear()
+
+    def move_yx(self, y: int, x: int) -> str:
+        """Return the sequence to move the cursor to (y, x)."""
+        moves = self._moves
+        if (seq := moves.get((y, x))) is None:
+            if len(moves) >= MAX_MOVES:
+                moves.clear()
+            seq = moves[y, x] = str(get_term().move_yx(y, x))
+        return seq
+
+    def color_table(self) -> tuple[str, ...]:
+        """Return the foreground color sequences for all 256 colors, indexed by color number."""
+        if not self._colors:
+            term = get_term()
+            self._colors = tuple(str(term.color(n)) for n in range(256))
+        return self._colors
+
+    def color(self, n: int) -> str:
+        """Return the foreground color sequence for color number n (0-255)."""
+        return self.color_table()[n]
+
+    @staticmethod
+    def color_hex(hex_color: str) -> str:
+        """Return the foreground color sequence for a '#rrggbb' color."""
+        return color_hex(hex_color)
+
+
+@functools.lru_cache(maxsize=256)
+def color_hex(hex_color: str) -> str:
+    """Return the foreground color sequence for a '#rrggbb' color."""
+    return str(get_term().color_hex(hex_color))
+
+
+esc = EscapeTable()
+on_reset(esc.clear)
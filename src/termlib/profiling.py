@@ -0,0 +1,140 @@
+"""Profile a whole terminal session, for the --profile switch of the entry points.
+
+A sampling thread records the main thread's stack every millisecond. Nothing is written
+while the session runs, so the fullscreen terminal stays intact. Afterwards the samples
+go to <name>-<time>.folded in collapsed-stack format (flamegraph.pl, speedscope), and with
+--profile=mem the top allocations seen by tracemalloc go to <name>-<time>.alloc.txt.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import CodeType, FrameType
+
+PROFILE_MODES = ("cpu", "mem")
+SAMPLE_INTERVAL = 0.001
+TOP_ALLOCATIONS = 30
+
+
+def split_profile_flag(argv: list[str]) -> tuple[list[str], str | None]:
+    """Remove --profile or --profile=<mode> from argv.
+
+    Return the remaining arguments and the mode ("cpu", "mem"), or None if not profiling.
+    """
+    rest: list[str] = []
+    mode = None
+    for arg in argv:
+        if arg == "--profile":
+            mode = "cpu"
+        elif arg.startswith("--profile="):
+            mode = arg.removeprefix("--profile=")
+            if mode not in PROFILE_MODES:
+                raise SystemExit(f"unknown profile mode {mode!r}, use one of {', '.join(PROFILE_MODES)}")
+        else:
+            rest.append(arg)
+    return rest, mode
+
+
+class StackSampler:
+    """Count the stacks of one thread, sampled from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL) -> None:
+        """Initialize the sampler for the given thread id."""
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter[str] = Counter()
+        self._labels: dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampling thread to end."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # noqa: SLF001
+            if frame is not None:
+                self.counts[self._stack_key(frame)] += 1
+
+    def _stack_key(self, frame: FrameType | None) -> str:
+        """Return the stack of frame in collapsed format, outermost call first."""
+        labels = self._labels
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            if (label := labels.get(code)) is None:
+                label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"  # noqa: PTH119
+            names.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        self.counts.clear()
+        self._labels.clear()
+
+    def collapsed(self) -> str:
+        """Return the samples in collapsed-stack format."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+def run_profiled[T](func: Callable[[], T], name: str, mode: str = "cpu", out_dir: Path | None = None) -> T:
+    """Run func while sampling its stacks (and allocations for mode "mem"), then write the reports."""
+    prefix = (out_dir or Path.cwd()) / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"  # noqa: DTZ005
+    if mode == "mem":
+        tracemalloc.start(25)
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    try:
+        return func()
+    finally:
+        sampler.stop()
+        samples = sum(sampler.counts.values())
+        written = [prefix.with_suffix(".folded")]
+        written[0].write_text(sampler.collapsed(), encoding="utf-8")
+        sampler.clear()  # not part of the allocations to report
+        if mode == "mem":
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            written.append(prefix.with_suffix(".alloc.txt"))
+            written[1].write_text(allocation_report(snapshot, peak), encoding="utf-8")
+        print(f"profile: {samples} samples -> {', '.join(map(str, written))}", file=sys.stderr)
+
+
+def allocation_report(snapshot: tracemalloc.Snapshot, peak: int, top: int = TOP_ALLOCATIONS) -> str:
+    """Return the top allocation sites of snapshot, with the call stack of the biggest ones."""
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+            tracemalloc.Filter(inclusive=False, filename_pattern=__file__),
+        ),
+    )
+    stats = snapshot.statistics("traceback")
+    total = sum(stat.size for stat in stats)
+    lines = [
+        f"peak: {peak / 1024:.1f} KiB",
+        f"{total / 1024:.1f} KiB in {sum(stat.count for stat in stats)} blocks still allocated at exit",
+        "",
+    ]
+    for i, stat in enumerate(stats[:top], 1):
+        frame = stat.traceback[-1]
+        lines.append(f"#{i}: {frame.filename}:{frame.lineno} {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+        lines.extend(f"    {line}" for line in stat.traceback.format(limit=5, most_recent_first=True))
+    return "\n".join(lines) + "\n"
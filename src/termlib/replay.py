@@ -0,0 +1,209 @@
+r"""Replay keystroke scripts into the terminal apps without a TTY.
+
+A script is a sequence of raw input strings, one per keystroke, exactly as the terminal
+would send them ("a", "\r", "\x1b[B", ...). ReplayTerminal hands them out through
+inkey() and sends all output into a CountingSink, so the real main loops of mini_vi
+and the typing trainer run unchanged, just headless.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from blessed import Terminal
+from blessed.keyboard import resolve_sequence
+
+from .terminal import set_term
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from pathlib import Path
+    from blessed.keyboard import Keystroke
+
+# what xterm sends for the keys the apps care about
+KEYS: dict[str, str] = {
+    "KEY_UP": "\x1b[A",
+    "KEY_DOWN": "\x1b[B",
+    "KEY_RIGHT": "\x1b[C",
+    "KEY_LEFT": "\x1b[D",
+    "KEY_DELETE": "\x1b[3~",
+    "KEY_ENTER": "\r",
+    "KEY_BACKSPACE": "\x7f",
+    "KEY_ESCAPE": "\x1b",
+    "KEY_CTRL_C": "\x03",
+    "KEY_CTRL_R": "\x12",
+    "KEY_CTRL_Z": "\x1a",
+}
+
+
+class CountingSink(io.TextIOBase):
+    """Output stream that only counts what is written to it.
+
+    With keep=True the text is kept as well, which is handy in tests.
+    """
+
+    def __init__(self, *, keep: bool = False) -> None:
+        """Initialize all counters with zero."""
+        super().__init__()
+        self.bytes = 0
+        self.writes = 0
+        self.flushes = 0
+        self.keep = keep
+        self.parts: list[str] = []
+
+    def writable(self) -> bool:
+        """Return True, it's a sink after all."""
+        return True
+
+    def write(self, s: str) -> int:
+        """Count the bytes (as UTF-8) of s."""
+        self.writes += 1
+        self.bytes += len(s) if s.isascii() else len(s.encode())
+        if self.keep:
+            self.parts.append(s)
+        return len(s)
+
+    def flush(self) -> None:
+        """Count the flush. Each one is a write syscall on a real terminal."""
+        self.flushes += 1
+
+    def getvalue(self) -> str:
+        """Return everything written so far (only with keep=True)."""
+        return "".join(self.parts)
+
+
+class ReplayTerminal(Terminal):
+    """A Terminal of fixed size that reads its keys from a script and writes into a CountingSink."""
+
+    def __init__(self, keys: Iterable[str], *, height: int = 24, width: int = 80, keep: bool = False) -> None:
+        """Initialize the terminal with the script to replay."""
+        self.sink = CountingSink(keep=keep)
+        super().__init__(kind="xterm-256color", stream=self.sink, force_styling=True)
+        self._keys: Iterator[str] = iter(keys)
+        self._size = height, width
+        self._exhausted = False
+        self._handed_out = -1.0
+        self.keys_read = 0
+        # time between handing out a key and being asked for the next one, i.e. handling it
+        self.busy_seconds = 0.0
+
+    @property
+    def height(self) -> int:
+        """Return the fixed height."""
+        return self._size[0]
+
+    @property
+    def width(self) -> int:
+        """Return the fixed width."""
+        return self._size[1]
+
+    def inkey(self, timeout: float | None = None, esc_delay: float = 0.0, capture_cpr: bool = False) -> Keystroke:  # noqa: ARG002, FBT001, FBT002
+        """Return the next key of the script. When it is used up, return Ctrl+C once to stop the app."""
+        now = perf_counter()
+        if self._handed_out >= 0:
+            self.busy_seconds += now - self._handed_out
+        try:
+            ucs = next(self._keys)
+            self.keys_read += 1
+        except StopIteration:
+            if self._exhausted:
+                raise EOFError("replay script used up, but the app did not stop on Ctrl+C") from None
+            self._exhausted = True
+            ucs = KEYS["KEY_CTRL_C"]
+        key = resolve_sequence(ucs, self._keymap, self._keycodes, self._keymap_prefixes, final=True)
+        self._handed_out = perf_counter()
+        return key
+
+
+@dataclass
+class ReplayStats:
+    """Numbers from one replay run."""
+
+    keys: int
+    # wall time of the whole run, including setup and teardown of the app
+    seconds: float
+    # time spent handling keys (logic and rendering)
+    busy_seconds: float
+    bytes: int
+    writes: int
+    flushes: int
+
+    @property
+    def keys_per_sec(self) -> float:
+        """Return the number of keys handled per second of busy time."""
+        return self.keys / self.busy_seconds if self.busy_seconds else 0.0
+
+    @property
+    def us_per_key(self) -> float:
+        """Return the average busy time per key in µs."""
+        return self.busy_seconds / self.keys * 1e6 if self.keys else 0.0
+
+    @property
+    def bytes_per_key(self) -> float:
+        """Return the average output per key in bytes."""
+        return self.bytes / self.keys if self.keys else 0.0
+
+
+def replay(
+    app: Callable[[], object],
+    keys: Iterable[str],
+    *,
+    height: int = 24,
+    width: int = 80,
+    sink: list[CountingSink] | None = None,
+) -> ReplayStats:
+    """Run app with the shared terminal replaced by a ReplayTerminal for the given keys.
+
+    Afterwards the shared terminal is created lazily again. Pass a list as sink to get
+    the (text keeping) CountingSink appended to it.
+    """
+    terminal = ReplayTerminal(keys, height=height, width=width, keep=sink is not None)
+    if sink is not None:
+        sink.append(terminal.sink)
+    set_term(terminal)
+    try:
+        t0 = perf_counter()
+        app()
+        seconds = perf_counter() - t0
+    finally:
+        set_term(None)
+    return ReplayStats(
+        keys=terminal.keys_read,
+        seconds=seconds,
+        busy_seconds=terminal.busy_seconds,
+        bytes=terminal.sink.bytes,
+        writes=terminal.sink.writes,
+        flushes=terminal.sink.flushes,
+    )
+
+
+def typed(text: str) -> Iterator[str]:
+    """Return the keystrokes for typing text, with newlines as Enter."""
+    enter = KEYS["KEY_ENTER"]
+    for char in text:
+        yield enter if char == "\n" else char
+
+
+def pressed(name: str, times: int = 1) -> Iterator[str]:
+    """Return the keystrokes for pressing the named key (e.g. KEY_DOWN) some times."""
+    seq = KEYS[name]
+    for _ in range(times):
+        yield seq
+
+
+def save_script(path: Path, keys: Iterable[str]) -> None:
+    """Save keystrokes as JSON lines, one raw input string per line."""
+    with path.open("w", encoding="utf-8") as f:
+        f.writelines(json.dumps(key) + "\n" for key in keys)
+
+
+def load_script(path: Path) -> Iterator[str]:
+    """Read keystrokes saved with save_script, lazily."""
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,129 @@
+"""One shared Terminal for many sessions in one process, e.g. of a server.
+
+The packages write to the shared terminal (see terminal.py), so a server doesn't give
+each connection a Terminal of its own. It installs one SessionTerminal instead and
+switches its output to the connection whose key is being handled:
+
+    terminal = SessionTerminal()
+    set_term(terminal)
+    ...
+    out = SessionOutput()
+    with terminal.session(out):
+        editor.handle_key(key)
+    writer.write(out.take())
+
+All sessions get the same kind of terminal and the same size, so the escape sequences
+cached in escapes.py and the screen size are the same for all of them. Flushing only
+counts, the server writes what a key produced in one go.
+"""
+
+from __future__ import annotations
+
+import codecs
+import io
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from blessed import Terminal
+from blessed.keyboard import resolve_sequence
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from blessed.keyboard import Keystroke
+
+
+class SessionOutput(io.TextIOBase):
+    """The output of one session, collected until the server sends it."""
+
+    def __init__(self) -> None:
+        """Initialize with nothing written."""
+        super().__init__()
+        self.parts: list[str] = []
+        self.flushes = 0
+
+    def writable(self) -> bool:
+        """Return True, it's an output after all."""
+        return True
+
+    def write(self, s: str) -> int:
+        """Collect s."""
+        self.parts.append(s)
+        return len(s)
+
+    def flush(self) -> None:
+        """Count the flush, nothing is sent before take()."""
+        self.flushes += 1
+
+    def take(self) -> bytes:
+        """Return everything written since the last take, as UTF-8, and forget it."""
+        data = "".join(self.parts).encode()
+        self.parts.clear()
+        return data
+
+
+class SessionKeys:
+    """Split what a session sends into keystrokes, across reads."""
+
+    def __init__(self, terminal: Terminal) -> None:
+        """Initialize for the key sequences of terminal."""
+        self.terminal = terminal
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, data: bytes) -> list[Keystroke]:
+        """Return the keys in data, a UTF-8 character cut off at the end is kept for the next read.
+
+        A key sequence cut off at the end is taken as the keys it starts with, as a terminal
+        does after the escape delay.
+        """
+        t = self.terminal
+        text = self._decoder.decode(data)
+        keys = []
+        while text:
+            key = resolve_sequence(text, t._keymap, t._keycodes, t._keymap_prefixes, final=True)  # noqa: SLF001
+            keys.append(key)
+            text = text[max(1, len(key)) :]
+        return keys
+
+
+class NoOutput(SessionOutput):
+    """Output that is thrown away, for what is written outside of any session."""
+
+    def write(self, s: str) -> int:
+        """Drop s."""
+        return len(s)
+
+
+class SessionTerminal(Terminal):
+    """A Terminal of fixed kind and size that writes to the output of the current session."""
+
+    def __init__(self, *, height: int = 24, width: int = 80) -> None:
+        """Initialize the terminal, for sessions of the given size."""
+        self._idle = NoOutput()  # output outside of any session
+        self.current = self._idle
+        super().__init__(kind="xterm-256color", stream=self._idle, force_styling=True)
+        self._size = height, width
+
+    @property
+    def stream(self) -> SessionOutput:
+        """Return the output of the current session."""
+        return self.current
+
+    @property
+    def height(self) -> int:
+        """Return the fixed height."""
+        return self._size[0]
+
+    @property
+    def width(self) -> int:
+        """Return the fixed width."""
+        return self._size[1]
+
+    @contextmanager
+    def session(self, out: SessionOutput) -> Iterator[SessionOutput]:
+        """Write to out in the with block."""
+        previous, self.current = self.current, out
+        try:
+            yield out
+        finally:
+            self.current = previous
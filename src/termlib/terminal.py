@@ -0,0 +1,107 @@
+"""One lazily created blessed Terminal, shared by all packages.
+
+Importing blessed and setting up terminfo is the most expensive part of starting
+tippse or pyvian, so neither happens before the terminal is actually used.
+"""
+
+from __future__ import annotations
+import signal
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from blessed import Terminal
+
+_terminal: Terminal | None = None
+_reset_hooks: list[Callable[[], None]] = []
+_screen_size: tuple[int, int] | None = None
+_winch_installed = False
+
+
+def get_term() -> Terminal:
+    """Return the shared terminal, creating it on first use."""
+    global _terminal  # noqa: PLW0603
+    if _terminal is None:
+        from blessed import Terminal  # noqa: PLC0415  # deferred on purpose, see module docstring
+
+        _terminal = Terminal()
+    return _terminal
+
+
+def echo(*args: object) -> None:
+    """Write all arguments with no separator to the terminal's stream and flush it."""
+    stream = get_term().stream
+    stream.write("".join(str(arg) for arg in args))
+    stream.flush()
+
+
+def set_term(terminal: Terminal | None) -> None:
+    """Replace the shared terminal, e.g. for headless runs. None means: create it lazily again."""
+    global _terminal, _screen_size  # noqa: PLW0603
+    _terminal = terminal
+    _screen_size = None
+    for hook in _reset_hooks:
+        hook()
+
+
+def screen_size() -> tuple[int, int]:
+    """Return height and width of the terminal.
+
+    Asking the terminal costs an ioctl (or worse) every time, so the size is kept
+    until the terminal reports a resize with SIGWINCH.
+    """
+    global _screen_size  # noqa: PLW0603
+    if _screen_size is None:
+        _install_winch_handler()
+        t = get_term()
+        _screen_size = t.height, t.width
+    return _screen_size
+
+
+def _install_winch_handler() -> None:
+    """Forget the screen size on SIGWINCH, keeping any handler installed before."""
+    global _winch_installed  # noqa: PLW0603
+    if _winch_installed or not hasattr(signal, "SIGWINCH"):
+        return
+    previous = signal.getsignal(signal.SIGWINCH)
+
+    def on_winch(signum: int, frame: object) -> None:
+        global _screen_size  # noqa: PLW0603
+        _screen_size = None
+        if callable(previous):
+            previous(signum, frame)
+
+    try:
+        signal.signal(signal.SIGWINCH, on_winch)
+    except ValueError:
+        return  # not in the main thread, size is then cached until set_term()
+    _winch_installed = True
+
+
+def is_created() -> bool:
+    """Return True if the shared terminal has been created already."""
+    return _terminal is not None
+
+
+def on_reset(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register a function to be called whenever the shared terminal is replaced.
+
+    Use this to drop anything derived from the terminal, like cached escape sequences.
+    """
+    _reset_hooks.append(hook)
+    return hook
+
+
+class LazyTerminal:
+    """Stand-in for the shared Terminal, forwarding every attribute access to it."""
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(get_term(), name)
+
+    def __repr__(self) -> str:
+        return f"<LazyTerminal {'created' if is_created() else 'pending'}>"
+
+
+term = LazyTerminal()
@@ -0,0 +1,163 @@
+"""Opt-in tracing with output in Chrome's trace-event format (opens in Perfetto).
+
+Tracing is switched on by starting the process with FPS_TRACE=<file.json>. Without it,
+`traced` hands back the undecorated function and `span` a shared no-op context, so the
+instrumented code runs as if it wasn't there.
+
+At exit the trace is written to the given file, and a summary of the slowest spans
+to the same path with suffix .txt (and to stderr).
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from contextlib import AbstractContextManager
+
+TRACE_FILE = os.environ.get("FPS_TRACE", "")
+enabled = bool(TRACE_FILE)
+
+# don't let a forgotten trace eat all memory
+MAX_EVENTS = 2_000_000
+
+# name, category, start ns, duration ns, thread id, args
+Event = tuple[str, str, int, int, int, dict[str, Any] | None]
+events: list[Event] = []
+dropped = 0
+
+_NULL = nullcontext()
+
+
+def _record(name: str, cat: str, t0: int, args: dict[str, Any] | None) -> None:
+    """Append one complete event that started at t0 and ends now."""
+    global dropped  # noqa: PLW0603
+    t1 = perf_counter_ns()
+    if len(events) < MAX_EVENTS:
+        events.append((name, cat, t0, t1 - t0, threading.get_ident(), args))
+    else:
+        dropped += 1
+
+
+def traced[F: Callable[..., Any]](name: str | None = None, cat: str = "app") -> Callable[[F], F]:
+    """Decorate a function to emit a span per call, named like the function unless given."""
+
+    def decorate(func: F) -> F:
+        if not enabled:
+            return func
+        return wrap(func, name or func.__qualname__, cat)
+
+    return decorate
+
+
+def wrap[**P, R](
+    func: Callable[P, R],
+    name: str,
+    cat: str = "app",
+    args_of: Callable[P, dict[str, Any]] | None = None,
+    **args: Any,  # noqa: ANN401
+) -> Callable[P, R]:
+    """Return func emitting a span with the given args per call, or func itself if tracing is off.
+
+    args_of is called with the arguments of each call, for args known only then.
+    """
+    if not enabled:
+        return func
+    span_args = args or None
+
+    @functools.wraps(func)
+    def wrapper(*a: P.args, **kw: P.kwargs) -> R:
+        t0 = perf_counter_ns()
+        try:
+            return func(*a, **kw)
+        finally:
+            _record(name, cat, t0, span_args if args_of is None else {**args, **args_of(*a, **kw)})
+
+    return wrapper
+
+
+def span(name: str, cat: str = "app", **args: Any) -> AbstractContextManager[None]:  # noqa: ANN401
+    """Return a context manager emitting a span for the enclosed block."""
+    if not enabled:
+        return _NULL
+    return _span(name, cat, args or None)
+
+
+@contextmanager
+def _span(name: str, cat: str, args: dict[str, Any] | None) -> Iterator[None]:
+    t0 = perf_counter_ns()
+    try:
+        yield
+    finally:
+        _record(name, cat, t0, args)
+
+
+def chrome_trace() -> dict[str, Any]:
+    """Return the recorded events as a Chrome trace-event document."""
+    pid = os.getpid()
+    trace_events = []
+    for name, cat, t0, dur, tid, args in events:
+        event: dict[str, Any] = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": t0 / 1_000,
+            "dur": dur / 1_000,
+            "pid": pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        trace_events.append(event)
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms", "otherData": {"dropped": dropped}}
+
+
+def summary(top: int = 15) -> list[str]:
+    """Return a table of the spans with the highest maximum duration, grouped by name and handler."""
+    durations: dict[str, list[int]] = defaultdict(list)
+    for name, _cat, _t0, dur, _tid, args in events:
+        label = f"{name} {args['handler']}" if args and "handler" in args else name
+        durations[label].append(dur)
+    rows = sorted(durations.items(), key=lambda item: max(item[1]), reverse=True)[:top]
+    lines = [f"{'span':<48}{'calls':>8}{'mean µs':>10}{'max µs':>10}{'total ms':>10}"]
+    for label, durs in rows:
+        total = sum(durs)
+        lines.append(
+            f"{label:<48}{len(durs):8d}{total / len(durs) / 1_000:10.1f}{max(durs) / 1_000:10.1f}"
+            f"{total / 1_000_000:10.1f}",
+        )
+    if dropped:
+        lines.append(f"({dropped} events dropped, MAX_EVENTS={MAX_EVENTS})")
+    return lines
+
+
+def write(path: Path) -> None:
+    """Write the trace to path and the summary next to it."""
+    path.write_text(json.dumps(chrome_trace()), encoding="utf-8")
+    path.with_suffix(".txt").write_text("\n".join(summary()) + "\n", encoding="utf-8")
+
+
+def _write_at_exit() -> None:
+    """Write the trace file given in FPS_TRACE and show the summary."""
+    if not events:
+        return
+    path = Path(TRACE_FILE)
+    write(path)
+    print(f"trace: {len(events)} events -> {path}", file=sys.stderr)
+    print("\n".join(summary()), file=sys.stderr)
+
+
+if enabled:
+    atexit.register(_write_at_exit)
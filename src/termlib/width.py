@@ -0,0 +1,85 @@
+"""Display width of text in terminal columns, for the render paths.
+
+len() counts code points, a terminal counts columns: CJK characters and most emoji take
+two, combining marks none. Asking wcwidth about every character on every keystroke is
+slow, so:
+
+- an ASCII string is as wide as it is long, and str.isascii() doesn't even scan it
+- other strings, and single characters, are looked up in bounded LRU caches
+- for a line, the column where each character starts is kept in an array (for the last
+  MAX_LINES lines that weren't ASCII), so the column of the cursor, or the part of the
+  line that fits on the screen, is a lookup or a bisect
+
+Control characters count as wide as they are long in ASCII, and as 0 otherwise.
+"""
+
+from __future__ import annotations
+
+import functools
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+# strings and characters whose width is kept
+MAX_STRINGS = 4096
+# lines whose columns are kept, about a few screens of an editor
+MAX_LINES = 256
+
+
+def width(s: str) -> int:
+    """Return how many columns s takes on the terminal."""
+    return len(s) if s.isascii() else _width(s)
+
+
+@functools.lru_cache(maxsize=MAX_STRINGS)
+def char_width(char: str) -> int:
+    """Return how many columns the character takes, 0 for one that isn't printable."""
+    from wcwidth import wcwidth  # noqa: PLC0415  # deferred, ASCII doesn't need it
+
+    return max(0, wcwidth(char))
+
+
+def column(line: str, x: int) -> int:
+    """Return the column where the character at index x of line starts (the end of the line beyond it)."""
+    if line.isascii():
+        return min(x, len(line))
+    return _columns(line)[min(x, len(line))]
+
+
+def fit(line: str, start: int, columns: int) -> int:
+    """Return the end of the longest part of line from index start that fits in the given columns."""
+    if line.isascii():
+        return min(start + columns, len(line))
+    cols = _columns(line)
+    start = min(start, len(line))
+    return max(start, bisect_right(cols, cols[start] + columns) - 1)
+
+
+def index_at(line: str, col: int) -> int:
+    """Return the index of the first character of line that starts at column col or after it."""
+    if line.isascii():
+        return min(col, len(line))
+    cols = _columns(line)
+    return bisect_left(cols, col, 0, len(line))
+
+
+@functools.lru_cache(maxsize=MAX_STRINGS)
+def _width(s: str) -> int:
+    """Return the width of a string that isn't ASCII."""
+    from wcwidth import wcswidth  # noqa: PLC0415  # deferred, ASCII doesn't need it
+
+    if (n := wcswidth(s)) < 0:  # something not printable in it
+        return sum(map(char_width, s))
+    return n
+
+
+@functools.lru_cache(maxsize=MAX_LINES)
+def _columns(line: str) -> array:
+    """Return the column where each character of line starts, and its end."""
+    return array("I", accumulate(map(char_width, line), initial=0))
+
+
+def cache_clear() -> None:
+    """Forget the widths of strings and the columns of lines, e.g. to measure. The characters are kept."""
+    _width.cache_clear()
+    _columns.cache_clear()
@@ -0,0 +1,102 @@
+"""Adaptive practice: the words the user gets wrong or types slowly come up more often.
+
+Every word of the text is in the vocabulary with a weight. It starts at 1, and each
+WorditorResult moves it towards 1 + ERROR_WEIGHT * (recent error rate) + SLOW_WEIGHT *
+(how much slower than usual, per character). The lines to type are made of words drawn
+by weight from an AliasTable, which takes two lookups per word, and an update per result
+of about 2 * sqrt(vocabulary) steps, so hundreds of thousands of words are no problem.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .alias import AliasTable
+
+if TYPE_CHECKING:
+    import random
+    from collections.abc import Iterable
+
+    from .worditor import WorditorResult
+
+# weight of a word that was always wrong, on top of 1
+ERROR_WEIGHT = 8.0
+# weight of a word typed twice as slow per character as usual, on top of 1
+SLOW_WEIGHT = 4.0
+# slowness counts up to this, so a coffee break doesn't make a word come up forever
+MAX_SLOWNESS = 3.0
+# how much the last result counts in the running averages
+DECAY = 0.3
+# the length of the lines made up of the drawn words
+WIDTH = 70
+
+
+@dataclass
+class WordStats:
+    """Running averages of the results for a word."""
+
+    errors: float = 0.0  # 0 always right, 1 always wrong
+    slowness: float = 0.0  # 0 as fast as usual or faster, 1 twice as slow per character
+
+
+class AdaptiveWords:
+    """A vocabulary with weights from the results of typing the words."""
+
+    def __init__(self, words: Iterable[str]) -> None:
+        """Start with all words equally likely."""
+        self.words = list(dict.fromkeys(words))
+        self.ids = {word: i for i, word in enumerate(self.words)}
+        self.table = AliasTable([1.0] * len(self.words))
+        self.stats: dict[str, WordStats] = {}
+        self.seconds_per_char: float | None = None  # usual speed, running average
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> AdaptiveWords:
+        """Return the vocabulary of the words of the lines."""
+        return cls(word for line in lines for word in line.split())
+
+    def weight(self, word: str) -> float:
+        """Return the weight a word has from its results."""
+        if (stats := self.stats.get(word)) is None:
+            return 1.0
+        return 1.0 + ERROR_WEIGHT * stats.errors + SLOW_WEIGHT * stats.slowness
+
+    def record(self, result: WorditorResult, seconds: float) -> None:
+        """Learn from typing result.target, which took the given time."""
+        word = result.target
+        if result.leave or not word:
+            return
+        per_char = seconds / (len(word) + 1)  # with the space
+        usual = self.seconds_per_char = (
+            per_char if self.seconds_per_char is None else _average(self.seconds_per_char, per_char)
+        )
+        stats = self.stats.setdefault(word, WordStats())
+        stats.errors = _average(stats.errors, 0.0 if result.success else 1.0)
+        slowness = min(MAX_SLOWNESS, max(0.0, per_char / usual - 1)) if usual > 0 else 0.0
+        stats.slowness = _average(stats.slowness, slowness)
+        if (i := self.ids.get(word)) is None:
+            self.ids[word] = self.table.append(self.weight(word))
+            self.words.append(word)
+        else:
+            self.table[i] = self.weight(word)
+
+    def pick(self, rnd: random.Random | None = None) -> str:
+        """Return a random word, by weight."""
+        return self.words[self.table.pick(rnd)]
+
+    def line(self, width: int = WIDTH, rnd: random.Random | None = None) -> list[str]:
+        """Return random words, by weight, as many as fit in a line of width (at least one)."""
+        if not self.words:
+            return []
+        words = [self.pick(rnd)]
+        length = len(words[0])
+        while length + 1 + len(word := self.pick(rnd)) <= width:
+            words.append(word)
+            length += 1 + len(word)
+        return words
+
+
+def _average(old: float, new: float) -> float:
+    """Return the running average with the new value."""
+    return old + DECAY * (new - old)
@@ -0,0 +1,160 @@
+"""Which lines of a text contain which special characters and bigrams, for drills.
+
+Only what a drill is about is indexed: the characters other than ASCII letters, digits
+and the space (Umlaute, ß, punctuation, quotes), and the bigrams with one of them in
+it ("ß ", ", ", "äu"). For each of these keys the index holds the sorted ids of the
+lines containing it. It is built once and cached next to the text file (werther.md ->
+werther.md.chars), where it is memory-mapped, with the lists of line ids used in place.
+
+A random line containing any of some keys takes a few µs however big the corpus is:
+a key is picked weighted by its number of lines, then one of its lines, which is taken
+with probability 1 / (number of the keys it contains). So every line containing any of
+the keys is equally likely. Plain letters are in most lines anyway, lines with those
+are found by trying random lines.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import random
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+from .mapped import MappedLines
+from .util import write_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from pathlib import Path
+
+DRILL_CHAR_RE = re.compile(r"[^A-Za-z0-9 ]")
+# overlapping: at every position, the bigram starting there if it has a drill character
+DRILL_BIGRAM_RE = re.compile(r"(?=([^A-Za-z0-9 ].|.[^A-Za-z0-9 ]))")
+# random lines tried for keys that aren't indexed, or for a pick
+MAX_TRIES = 1000
+
+# magic, length of the JSON directory; 16 bytes, the directory is padded to 4
+HEADER = struct.Struct("<8sQ")
+MAGIC = b"TIPPCHR1"
+SUFFIX = ".chars"
+
+
+def drill_keys(line: str) -> set[str]:
+    """Return the characters and bigrams of line that are indexed."""
+    return {*DRILL_CHAR_RE.findall(line), *DRILL_BIGRAM_RE.findall(line)}
+
+
+def is_indexed(key: str) -> bool:
+    """Return True if key is a character or bigram that is indexed."""
+    return 1 <= len(key) <= 2 and DRILL_CHAR_RE.search(key) is not None  # noqa: PLR2004
+
+
+def index_path(path: Path) -> Path:
+    """Return the cached index of the text file path."""
+    return path.with_name(path.name + SUFFIX)
+
+
+class CharIndex:
+    """Sorted line ids by character and bigram."""
+
+    def __init__(self, postings: dict[str, Sequence[int]]) -> None:
+        """Initialize with the line ids by key."""
+        self.postings = postings
+        self.mapped = False
+
+    @classmethod
+    def build(cls, lines: Sequence[str]) -> CharIndex:
+        """Index the lines."""
+        postings: dict[str, array] = {}
+        for y in range(len(lines)):
+            for key in drill_keys(lines[y]):
+                if (ids := postings.get(key)) is None:
+                    ids = postings[key] = array("I")
+                ids.append(y)
+        return cls(postings)  # type: ignore[arg-type]
+
+    @classmethod
+    def for_lines(cls, lines: Sequence[str]) -> CharIndex:
+        """Return the index of lines, from the cache next to their file if possible."""
+        if not isinstance(lines, MappedLines):
+            return cls.build(lines)
+        st = lines.path.stat()
+        identity = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "lines": len(lines)}
+        index = cls.load(index_path(lines.path), identity)
+        if index is None:
+            index = cls.build(lines)
+            index.save(index_path(lines.path), identity)
+        return index
+
+    @classmethod
+    def load(cls, path: Path, identity: dict[str, int]) -> CharIndex | None:
+        """Return the index cached in path, if it was built for the file with the given identity."""
+        try:
+            with path.open("rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, length = HEADER.unpack_from(data)
+            directory = json.loads(data[HEADER.size : HEADER.size + length])
+            valid = magic == MAGIC and directory["identity"] == identity
+        except (struct.error, ValueError, KeyError, TypeError):
+            valid = False
+        if not valid:
+            data.close()
+            return None
+        ids = memoryview(data)[HEADER.size + length + -length % 4 :].cast("I")
+        postings = {key: ids[start : start + count] for key, (start, count) in directory["keys"].items()}
+        index = cls(postings)
+        index.mapped = True
+        return index
+
+    def save(self, path: Path, identity: dict[str, int]) -> None:
+        """Write the index to path."""
+        keys = {}
+        start = 0
+        for key, ids in sorted(self.postings.items()):
+            keys[key] = (start, len(ids))
+            start += len(ids)
+        directory = json.dumps({"identity": identity, "keys": keys}, ensure_ascii=False).encode()
+        header = HEADER.pack(MAGIC, len(directory)) + directory + bytes(-len(directory) % 4)
+        write_cache(path, header, *(ids for _, ids in sorted(self.postings.items())))
+
+    def count(self, key: str) -> int:
+        """Return the number of lines containing key (only for indexed keys)."""
+        return len(self.postings.get(key, ()))
+
+    def random_line(self, lines: Sequence[str], keys: Iterable[str], rnd: random.Random | None = None) -> int | None:
+        """Return the id of a random line containing any of the keys, or None if there is none."""
+        r = rnd or random
+        keys = set(keys)
+        if not lines:
+            return None
+        if not all(is_indexed(key) for key in keys):
+            for _ in range(MAX_TRIES):
+                y = r.randrange(len(lines))
+                if any(key in lines[y] for key in keys):
+                    return y
+            return None
+        postings = [ids for key in keys if (ids := self.postings.get(key))]
+        if not postings:
+            return None
+        sizes = [len(ids) for ids in postings]
+        for _ in range(MAX_TRIES):
+            ids = r.choices(postings, weights=sizes)[0]
+            y = ids[r.randrange(len(ids))]
+            # a line with m of the keys is m times as likely to be picked here
+            m = sum(_contains(other, y) for other in postings)
+            if m == 1 or r.random() * m < 1:
+                return y
+        return y
+
+
+def _contains(ids: Sequence[int], y: int) -> bool:
+    """Return True if the sorted ids contain y."""
+    i = bisect_left(ids, y)
+    return i < len(ids) and ids[i] == y
@@ -0,0 +1,66 @@
+"""A corpus of many books for Tippse, as built by bin/brush.py --corpus.
+
+The corpus directory holds one shard per book, the brushed text (normalized, wrapped to
+70 chars) named by the hash of the book's content, and a manifest with the source file,
+size, mtime, hash and number of non-empty lines of every book. Tippse picks a shard at
+random, weighted by its lines, and loads just that one, so the size of the corpus
+doesn't matter for startup.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+MANIFEST = "manifest.json"
+# bump when brushing changes, so all shards are built again
+FORMAT = 1
+
+
+@dataclass
+class Book:
+    """A source text and its shard."""
+
+    size: int
+    mtime_ns: int
+    digest: str
+    shard: str  # file name in the corpus directory
+    lines: int  # non-empty lines of the shard
+
+
+def load_manifest(directory: Path) -> dict[str, Book]:
+    """Return the books of the corpus by source path (relative, with /), or nothing if there is no valid manifest."""
+    try:
+        data = json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+        if data.get("format") != FORMAT:
+            return {}
+        return {source: Book(**book) for source, book in data["books"].items()}
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return {}
+
+
+def save_manifest(directory: Path, books: dict[str, Book]) -> None:
+    """Write the manifest, replacing the old one in one go."""
+    data = {"format": FORMAT, "books": {source: asdict(book) for source, book in sorted(books.items())}}
+    tmp = directory / (MANIFEST + ".tmp")
+    tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+    tmp.replace(directory / MANIFEST)
+
+
+def shard_lines(books: dict[str, Book]) -> dict[str, int]:
+    """Return the non-empty lines by shard. Books with the same content share a shard."""
+    return {book.shard: book.lines for book in books.values()}
+
+
+def pick_shard(directory: Path, rnd: random.Random | None = None) -> Path | None:
+    """Return a random shard of the corpus, weighted by lines, or None if it is empty."""
+    shards = {shard: lines for shard, lines in shard_lines(load_manifest(directory)).items() if lines}
+    if not shards:
+        return None
+    shard = (rnd or random).choices(list(shards), weights=list(shards.values()))[0]
+    return directory / shard
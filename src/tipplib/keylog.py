@@ -0,0 +1,321 @@
+"""Keystroke timings of tippse, kept in an array and appended in blocks to a binary log.
+
+Every key the Worditor handles becomes one 64 bit number in an array, no objects:
+
+  bits 40..63   the key: its code point, or NAMED + the curses code (backspace, ...)
+  bits 32..39   flags: a miss, the end of a word, ...
+  bits  0..31   ms since the key before in the session, NO_GAP for the first one
+
+Every BATCH keys, and at the end of the session, the array is appended to the log as
+one block: b"KEYS", the number of keys (uint32), the wall time of the first key (ns,
+int64), then the keys. The file starts with MAGIC. A block cut short (tippse was killed
+while writing it) is cut off before the next session appends.
+
+A report works with how often each number is in the log: typing time, words per
+minute, accuracy, and the latency of every key, by the ms before it. The counts are
+cached next to the log (tippse.keys.counts) with the end of the log they are for, so
+the next report only counts the blocks appended since, with a Counter, which runs in C.
+Counting a million keys the first time takes some tenths of a second, a report on the
+cached counts of millions of keys some hundredths.
+"""
+
+from __future__ import annotations
+
+import struct
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import cache
+from time import monotonic_ns, time_ns
+from typing import TYPE_CHECKING
+
+from .util import get_reporoot, write_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from blessed.keyboard import Keystroke
+
+    from .worditor import WorditorResult
+
+# None means local/tippse.keys in the repo
+LOGFILE: Path | None = None
+# keys kept in memory before they are appended to the log
+BATCH = 4096
+# named keys are after all code points
+NAMED = 0x110000
+# the gap before the first key of a session, or a gap too long to count
+NO_GAP = 0xFFFFFFFF
+# a longer gap between two keys is a break, it doesn't count for speed and latency
+PAUSE_MS = 5000
+
+# flags
+MISS = 1  # a character other than the one to type
+EDIT = 2  # not a character (backspace, ...)
+WORD = 4  # the key ended the word
+WRONG = 8  # ... and the word was wrong
+LEAVE = 16  # the key ended the session
+
+MAGIC = b"TIPPKEY1"
+BLOCK = struct.Struct("<4sIq")
+BLOCK_MAGIC = b"KEYS"
+
+# the counts of the numbers in a log, up to some end of it, cached next to it
+# (tippse.keys -> tippse.keys.counts): magic, end, first block; then the numbers and the counts
+COUNTS_HEADER = struct.Struct("<8sQ16s")
+COUNTS_MAGIC = b"TIPPCNT1"
+SUFFIX = ".counts"
+
+
+def logfile() -> Path:
+    """Return the file to append the keys to."""
+    if LOGFILE is None:
+        return get_reporoot() / "local" / "tippse.keys"
+    return LOGFILE
+
+
+def key_code(key: Keystroke | str) -> int:
+    """Return the number a key is logged as."""
+    if code := getattr(key, "code", None):
+        return NAMED + code
+    return ord(key) if len(key) == 1 else NAMED
+
+
+def key_name(code: int) -> str:
+    """Return the character or the name of the key logged as code."""
+    if code < NAMED:
+        return chr(code)
+    return _key_names().get(code - NAMED, "?")
+
+
+def key_flags(key: Keystroke | str, expected: str, result: WorditorResult | None) -> int:
+    """Return the flags of a key, expected is the character that was to be typed next."""
+    if result is not None and result.leave:
+        return LEAVE | EDIT
+    flags = EDIT if getattr(key, "is_sequence", False) else 0 if key == expected else MISS
+    if result is not None:
+        flags |= WORD if result.success else WORD | WRONG
+    return flags
+
+
+class KeyLog:
+    """The keys of a session, appended to a log file in blocks."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Start a session. Without a path the keys are only kept in memory."""
+        self.path = path
+        self.keys = array("Q")
+        self.start_ns = 0  # wall time of the first key in memory
+        self._last = 0  # monotonic time of the key before
+        self._repaired = False  # cut off a block cut short, before appending the first one
+
+    def record(self, key: int, flags: int = 0) -> None:
+        """Add a key, pressed now."""
+        now = monotonic_ns()
+        gap = (now - self._last) // 1_000_000 if self._last else NO_GAP
+        self._last = now
+        if not self.keys:
+            self.start_ns = time_ns()
+        self.keys.append(key << 40 | flags << 32 | min(gap, NO_GAP))
+        if len(self.keys) >= BATCH and self.path is not None:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append the keys in memory to the log, as one block. Failing to write is no problem."""
+        if self.path is None or not self.keys:
+            return
+        block = BLOCK.pack(BLOCK_MAGIC, len(self.keys), self.start_ns) + self.keys.tobytes()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as f:
+                end = f.tell()
+                if not self._repaired:
+                    end = _valid_end(self.path)
+                    f.truncate(end)
+                    self._repaired = True
+                f.write(block if end else MAGIC + block)
+        except OSError:
+            pass
+        del self.keys[:]
+
+
+def read_log(path: Path, start: int = 0) -> tuple[array, int]:
+    """Return the keys of the complete blocks in the log from byte start on, and where they end."""
+    keys = array("Q")
+    try:
+        with path.open("rb") as f:
+            f.seek(start)
+            data = memoryview(f.read())
+    except OSError:
+        return keys, start
+    pos = 0
+    if not start:
+        pos = len(MAGIC) if data[: len(MAGIC)] == MAGIC else len(data)
+    while (count := _block_count(data, pos)) is not None:
+        keys.frombytes(data[pos + BLOCK.size : pos + BLOCK.size + 8 * count])
+        pos += BLOCK.size + 8 * count
+    return keys, start + pos
+
+
+def counts_path(path: Path) -> Path:
+    """Return the cached counts of the log path."""
+    return path.with_name(path.name + SUFFIX)
+
+
+def count_keys(path: Path) -> Counter[int]:
+    """Return how often each number is in the log, from the cache plus the blocks appended since."""
+    counts, end = _cached_counts(path)
+    keys, new_end = read_log(path, end)
+    if keys or new_end != end:
+        counts.update(keys)
+        _save_counts(path, counts, new_end)
+    return counts
+
+
+@dataclass
+class KeyReport:
+    """Speed, accuracy and latency per key, over many sessions."""
+
+    keys: int = 0
+    chars: int = 0  # keys that were characters
+    misses: int = 0
+    words: int = 0
+    wrong_words: int = 0
+    seconds: float = 0.0  # typing, without breaks
+    latency: dict[str, tuple[int, float, float]] = field(default_factory=dict)  # count, median ms, mean ms
+
+    @property
+    def wpm(self) -> float:
+        """Return the words per minute, a word being 5 characters."""
+        return self.chars / 5 / (self.seconds / 60) if self.seconds else 0.0
+
+    @property
+    def accuracy(self) -> float:
+        """Return the share of characters typed right."""
+        return 1 - self.misses / self.chars if self.chars else 1.0
+
+    @classmethod
+    def from_log(cls, path: Path) -> KeyReport:
+        """Compute the report for all sessions in the log."""
+        return cls.from_counts(count_keys(path))
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[int]) -> KeyReport:
+        """Compute the report for the keys of a log."""
+        return cls.from_counts(Counter(keys))
+
+    @classmethod
+    def from_counts(cls, counts: Counter[int]) -> KeyReport:
+        """Compute the report from how often each number is in a log."""
+        report = cls()
+        flag_counts: Counter[int] = Counter()
+        gaps: dict[int, dict[int, int]] = {}  # key: gap: count
+        milliseconds = 0
+        for code, n in counts.items():
+            flag_counts[code >> 32 & 0xFF] += n
+            if (gap := code & 0xFFFFFFFF) <= PAUSE_MS:
+                milliseconds += gap * n
+                if (histogram := gaps.get(key := code >> 40)) is None:
+                    histogram = gaps[key] = {}
+                histogram[gap] = histogram.get(gap, 0) + n
+        report.seconds = milliseconds / 1000
+        for flags, n in flag_counts.items():
+            report.keys += n
+            report.chars += 0 if flags & EDIT else n
+            report.misses += n if flags & MISS else 0
+            report.words += n if flags & WORD else 0
+            report.wrong_words += n if flags & WRONG else 0
+        for key, histogram in gaps.items():
+            total = sum(histogram.values())
+            mean = sum(gap * n for gap, n in histogram.items()) / total
+            report.latency[key_name(key)] = (total, _median(sorted(histogram.items()), total), mean)
+        return report
+
+    def format(self) -> str:
+        """Return the report as text, the slowest keys first."""
+        minutes = self.seconds / 60
+        lines = [
+            f"{self.keys} Tasten, {self.words} Wörter ({self.wrong_words} falsch), {minutes:.1f} min getippt",
+            f"{self.wpm:.1f} WPM, {self.accuracy:.1%} der Zeichen richtig",
+            "",
+            "Taste            Anzahl   Median ms   Mittel ms",
+        ]
+        for key, (count, median, mean) in sorted(self.latency.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{key!r:<16}{count:7d}{median:12.0f}{mean:12.0f}")
+        return "\n".join(lines)
+
+
+@cache
+def _key_names() -> dict[int, str]:
+    """Return the names of the curses key codes."""
+    from blessed.keyboard import get_curses_keycodes  # noqa: PLC0415  # deferred, like the Terminal
+
+    return {code: name for name, code in get_curses_keycodes().items()}
+
+
+def _median(histogram: list[tuple[int, int]], total: int) -> float:
+    """Return the median of a histogram, sorted by value."""
+    seen = 0
+    for value, n in histogram:
+        seen += n
+        if 2 * seen >= total:
+            return float(value)
+    return 0.0
+
+
+def _first_block(path: Path) -> bytes:
+    """Return the header of the first block of the log, which tells logs apart."""
+    try:
+        with path.open("rb") as f:
+            return f.read(len(MAGIC) + BLOCK.size)[len(MAGIC) :]
+    except OSError:
+        return b""
+
+
+def _cached_counts(path: Path) -> tuple[Counter[int], int]:
+    """Return the cached counts and the end of the log they are for, if they are for this log."""
+    try:
+        data = counts_path(path).read_bytes()
+        magic, end, first = COUNTS_HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return Counter(), 0
+    pairs = (len(data) - COUNTS_HEADER.size) // 16
+    if magic != COUNTS_MAGIC or first != _first_block(path) or COUNTS_HEADER.size + 16 * pairs != len(data):
+        return Counter(), 0
+    codes, counts = array("Q"), array("Q")
+    codes.frombytes(data[COUNTS_HEADER.size : COUNTS_HEADER.size + 8 * pairs])
+    counts.frombytes(data[COUNTS_HEADER.size + 8 * pairs :])
+    return Counter(dict(zip(codes, counts, strict=True))), end
+
+
+def _save_counts(path: Path, counts: Counter[int], end: int) -> None:
+    """Cache the counts for the log up to end."""
+    header = COUNTS_HEADER.pack(COUNTS_MAGIC, end, _first_block(path))
+    write_cache(counts_path(path), header, array("Q", counts.keys()), array("Q", counts.values()))
+
+
+def _block_count(data: bytes | memoryview, pos: int) -> int | None:
+    """Return the keys of the complete block at pos, None if there is none."""
+    if pos + BLOCK.size > len(data):
+        return None
+    magic, count, _ = BLOCK.unpack_from(data, pos)
+    if magic != BLOCK_MAGIC or pos + BLOCK.size + 8 * count > len(data):
+        return None
+    return count
+
+
+def _valid_end(path: Path) -> int:
+    """Return the end of the last complete block in the log, 0 if it isn't a log."""
+    with path.open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return 0
+        pos = len(MAGIC)
+        size = f.seek(0, 2)
+        while pos + BLOCK.size <= size:
+            f.seek(pos)
+            magic, count, _ = BLOCK.unpack(f.read(BLOCK.size))
+            if magic != BLOCK_MAGIC or pos + BLOCK.size + 8 * count > size:
+                break
+            pos += BLOCK.size + 8 * count
+        return pos
@@ -0,0 +1,62 @@
+"""Where the words of a line to type go on the screen.
+
+A line is laid out once for the column it starts in and the width of the terminal: the
+words go left to right with a space between them, and a word that would reach the last
+column starts a new row, so nothing is wrapped by the terminal. The Trainer shows the
+target line with LineLayout.render(), in one write, and puts the input of each word in
+the same place a few rows below.
+
+Layouts are kept for the last MAX_LINES lines. The width is part of the key, so after a
+resize the next line is laid out anew, and a new terminal forgets all of them.
+"""
+
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+
+from termlib import esc, on_reset
+from termlib.width import width as text_width
+
+# layouts kept, a line is typed for a minute or so
+MAX_LINES = 256
+
+
+@dataclass(frozen=True)
+class LineLayout:
+    """The places of the words of a line, relative to the row it starts in."""
+
+    words: tuple[str, ...]
+    places: tuple[tuple[int, int], ...]  # row and column of each word
+    rows: tuple[str, ...]  # the text of each row, from x0 on
+    x0: int
+
+    def render(self, y0: int, color: str = "") -> str:
+        """Return what shows the whole line with its first row at y0, in color, the rest of the rows cleared."""
+        return "".join(
+            f"{esc.move_yx(y0 + r, self.x0)}{color}{row}{esc.normal}{esc.clear_eol}" for r, row in enumerate(self.rows)
+        )
+
+
+@functools.lru_cache(maxsize=MAX_LINES)
+def layout(words: tuple[str, ...], x0: int, width: int) -> LineLayout:
+    """Return the layout of the words, starting in column x0 of a terminal width columns wide."""
+    places: list[tuple[int, int]] = []
+    rows: list[list[str]] = [[]]
+    x = x0
+    for word in words:
+        w = text_width(word)
+        # the cursor behind the word must stay left of the last column
+        if rows[-1] and x + w >= width - 1:
+            rows.append([])
+            x = x0
+        places.append((len(rows) - 1, x))
+        rows[-1].append(word)
+        x += w + 1
+    return LineLayout(words=words, places=tuple(places), rows=tuple(" ".join(row) for row in rows), x0=x0)
+
+
+@on_reset
+def _forget_layouts() -> None:
+    """Lay out lines anew for a new terminal."""
+    layout.cache_clear()
@@ -0,0 +1,166 @@
+"""The non-empty lines of a big text file, memory-mapped and read one at a time.
+
+Lines are split and stripped like str.splitlines() and str.strip() would, so a line of
+only Unicode spaces is empty too. The byte offsets of the non-empty lines are indexed once
+and cached next to the file
+(werther.md -> werther.md.lines), with the size and mtime of the file. The index file
+is memory-mapped as well, so opening even a corpus of some 100 MB costs two mmap calls,
+and only the pages of the lines actually used are read. If the cache can't be written,
+the index is kept in memory.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+import struct
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate, compress
+from typing import TYPE_CHECKING, overload
+
+from .util import write_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+# bytes scanned at a time when building the index
+CHUNK = 8 * 1024 * 1024
+
+# magic, size, mtime_ns, lines; 32 bytes, so the offsets after it are aligned
+HEADER = struct.Struct("<8sQqQ")
+MAGIC = b"TIPPLIN2"
+SUFFIX = ".lines"
+
+# where str.splitlines() splits besides "\n" and "\r", in ASCII and beyond
+SEPARATORS = b"\x0b\x0c\x1c\x1d\x1e"
+WIDE_SEPARATORS = re.compile("[\x85\u2028\u2029]")
+# what str.strip() strips of ASCII, and beyond
+ASCII_SPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+WIDE_SPACES = re.compile("[\xa0\u1680\u2000-\u200a\u202f\u205f\u3000]")
+# bytes.strip() strips all ASCII whitespace but the unit separator
+UNIT_SEPARATOR = bytes.maketrans(b"\x1f", b" ")
+ASCII = bytes(range(128))
+
+
+def index_path(path: Path) -> Path:
+    """Return the cached index of path."""
+    return path.with_name(path.name + SUFFIX)
+
+
+def build_index(data: mmap.mmap | bytes) -> array:
+    """Return the offsets of the lines of data that aren't only whitespace."""
+    offsets = array("Q")
+    pos, n = 0, len(data)
+    while pos < n:
+        end = min(pos + CHUNK, n)
+        if end < n:
+            # up to the last newline in the chunk, or to the end of a very long line
+            end = data.rfind(b"\n", pos, end) + 1 or data.find(b"\n", end) + 1 or n
+        chunk = data[pos:end]
+        if b"\x1f" in chunk:
+            chunk = chunk.translate(UNIT_SEPARATOR)
+        lines = chunk.split(b"\n")
+        if lines[-1] == b"":
+            lines.pop()  # after the last newline
+        starts = accumulate(map((1).__add__, map(len, lines)), initial=pos)
+        # the non-ASCII characters, a few to search for most text
+        wide = chunk.translate(None, ASCII).decode("utf-8", "replace")
+        if has_separators(chunk, wide):
+            for start, line in zip(starts, lines, strict=False):
+                offsets.extend(text_starts(start, line))
+        elif WIDE_SPACES.search(wide):
+            offsets.extend(compress(starts, map(has_text, lines)))
+        else:
+            offsets.extend(compress(starts, map(bytes.strip, lines)))
+        pos = end
+    return offsets
+
+
+def has_separators(data: bytes, wide: str) -> bool:
+    """Return True if data has other line separators than newlines, carriage returns before them don't count.
+
+    wide are the non-ASCII characters of data, where the others are.
+    """
+    if any(sep in data for sep in SEPARATORS) or WIDE_SEPARATORS.search(wide):
+        return True
+    return b"\r" in data and data.rstrip(b"\r").count(b"\r") != data.count(b"\r\n")
+
+
+def has_text(line: bytes) -> bool:
+    """Return True if the line isn't only whitespace, decoding it only if it may start or end with Unicode spaces."""
+    text = line.strip(ASCII_SPACE)
+    if text[:1].isascii() and text[-1:].isascii():
+        return bool(text)
+    return bool(text.decode("utf-8", "replace").strip())
+
+
+def text_starts(start: int, line: bytes) -> Iterator[int]:
+    """Yield the offsets of the lines in a line with other separators than newlines that aren't only whitespace."""
+    for part in line.decode("utf-8", "surrogateescape").splitlines(keepends=True):
+        if part.strip():
+            yield start
+        start += len(part.encode("utf-8", "surrogateescape"))
+
+
+class MappedLines(Sequence[str]):
+    """The non-empty lines of a file, stripped, decoded when accessed."""
+
+    def __init__(self, path: Path) -> None:
+        """Map the file and its index, building and caching the index if needed. Raises OSError."""
+        self.path = path
+        self.data: mmap.mmap | bytes = b""
+        self.offsets: Sequence[int] = array("Q")
+        self.index_mapped = False  # the index was mapped from the cache
+        with path.open("rb") as f:
+            st = os.fstat(f.fileno())
+            if not st.st_size:
+                return  # can't map nothing
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        offsets = self._cached_index(st)
+        self.offsets = self._new_index(st) if offsets is None else offsets
+
+    def _cached_index(self, st: os.stat_result) -> Sequence[int] | None:
+        """Return the offsets from the cache, if it is there and up to date."""
+        try:
+            with index_path(self.path).open("rb") as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(index) >= HEADER.size:
+            magic, size, mtime_ns, lines = HEADER.unpack_from(index)
+            valid = (magic, size, mtime_ns) == (MAGIC, st.st_size, st.st_mtime_ns)
+            if valid and len(index) == HEADER.size + 8 * lines:
+                self.index_mapped = True
+                return memoryview(index)[HEADER.size :].cast("Q")
+        index.close()
+        return None
+
+    def _new_index(self, st: os.stat_result) -> Sequence[int]:
+        """Index the lines and write the index to the cache."""
+        offsets = build_index(self.data)
+        write_cache(index_path(self.path), HEADER.pack(MAGIC, st.st_size, st.st_mtime_ns, len(offsets)), offsets)
+        return offsets
+
+    def __len__(self) -> int:
+        """Return the number of non-empty lines."""
+        return len(self.offsets)
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[str]: ...
+
+    def __getitem__(self, i: int | slice) -> str | list[str]:
+        """Return non-empty line i, without surrounding whitespace."""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        start = self.offsets[i]
+        end = self.data.find(b"\n", start)
+        if end < 0:
+            end = len(self.data)
+        line = self.data[start:end].decode("utf-8", errors="replace")
+        return line.splitlines()[0].strip()
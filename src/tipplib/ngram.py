@@ -0,0 +1,285 @@
+"""Endless drill text from a Markov model of the n-grams of a text, words or characters.
+
+The next token (a word, or a character for pseudo-German words) is drawn by how often it
+follows the n tokens before it in the text. The model is a set of flat arrays, built
+once and cached next to the text file (werther.md -> werther.md.w2.ngram), where it is
+memory-mapped and used in place:
+
+  ends       the end of each token in the vocabulary, a blob of UTF-8
+  starts     the successors of context c are the edges starts[c]:starts[c + 1]
+  tokens     the token of each edge
+  counts     the count of each edge plus the counts before it in its context
+  targets    the context the edge leads to, NONE if the text ended there
+
+So a token costs a random number and a bisect over the successors of one context, and
+the next context is looked up in advance. That doesn't depend on the size of the text.
+"""
+
+from __future__ import annotations
+
+import heapq
+import mmap
+import random
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import accumulate, islice
+from typing import TYPE_CHECKING
+
+from .mapped import MappedLines
+from .util import write_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from pathlib import Path
+
+# the usual orders: two words, or five characters, of context
+WORD_ORDER = 2
+CHAR_ORDER = 5
+# the length of the generated lines
+WIDTH = 70
+# target of an edge at the end of the text
+NONE = 0xFFFFFFFF
+# tokens counted at a time when building
+CHUNK = 1 << 20
+
+# magic, size, mtime_ns, order, chars, tokens, contexts, edges; 48 bytes, the arrays follow
+HEADER = struct.Struct("<8sQqIIIIQ")
+MAGIC = b"TIPPGRM1"
+SUFFIX = ".ngram"
+
+
+def model_path(path: Path, order: int, *, chars: bool) -> Path:
+    """Return the cached model of the text file path."""
+    return path.with_name(f"{path.name}.{'c' if chars else 'w'}{order}{SUFFIX}")
+
+
+def tokenize(lines: Iterable[str], *, chars: bool) -> Iterator[str]:
+    """Return the words of the lines, or their characters with a space after each line."""
+    for line in lines:
+        if chars:
+            yield from line
+            yield " "
+        else:
+            yield from line.split()
+
+
+class NgramModel:
+    """A Markov model of the tokens of a text, in flat arrays."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        order: int,
+        *,
+        chars: bool,
+        blob: bytes | memoryview,
+        ends: Sequence[int],
+        starts: Sequence[int],
+        tokens: Sequence[int],
+        counts: Sequence[int],
+        targets: Sequence[int],
+    ) -> None:
+        """Initialize with the tables, see the module."""
+        self.order = order
+        self.chars = chars
+        self.blob = blob
+        self.ends = ends
+        self.starts = starts
+        self.tokens = tokens
+        self.counts = counts
+        self.targets = targets
+        self.mapped = False
+
+    @property
+    def contexts(self) -> int:
+        """Return the number of contexts."""
+        return len(self.starts) - 1
+
+    @classmethod
+    def build(cls, lines: Sequence[str], order: int = WORD_ORDER, *, chars: bool = False) -> NgramModel:
+        """Count the n-grams of the lines. Raises ValueError if there are too many tokens for the order."""
+        if order < 1:
+            msg = f"order must be at least 1, not {order}"
+            raise ValueError(msg)
+        vocabulary = {token: i for i, token in enumerate(dict.fromkeys(tokenize(lines, chars=chars)))}
+        n = len(vocabulary)
+        if n ** (order + 1) >= 1 << 64:
+            msg = f"{n} different tokens are too many for order {order}"
+            raise ValueError(msg)
+
+        ids = map(vocabulary.__getitem__, tokenize(lines, chars=chars))
+        keys, starts, tokens, counts = _tables(_count_runs(ids, n, order), n)
+        targets = _targets(keys, starts, tokens, n, order)
+
+        encoded = [token.encode() for token in vocabulary]
+        ends = array("I", accumulate(map(len, encoded)))
+        return cls(
+            order, chars=chars, blob=b"".join(encoded), ends=ends, starts=starts, tokens=tokens, counts=counts,
+            targets=targets,
+        )  # fmt: skip
+
+    @classmethod
+    def for_lines(cls, lines: Sequence[str], order: int = WORD_ORDER, *, chars: bool = False) -> NgramModel:
+        """Return the model of lines, from the cache next to their file if possible."""
+        if not isinstance(lines, MappedLines):
+            return cls.build(lines, order, chars=chars)
+        st = lines.path.stat()
+        path = model_path(lines.path, order, chars=chars)
+        model = cls.load(path, st.st_size, st.st_mtime_ns)
+        if model is None or (model.order, model.chars) != (order, chars):
+            model = cls.build(lines, order, chars=chars)
+            model.save(path, st.st_size, st.st_mtime_ns)
+        return model
+
+    @classmethod
+    def load(cls, path: Path, size: int, mtime_ns: int) -> NgramModel | None:
+        """Return the model cached in path, if it was built for a file of that size and mtime."""
+        try:
+            with path.open("rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, st_size, st_mtime_ns, order, chars, n, contexts, edges = HEADER.unpack_from(data)
+            table_end = HEADER.size + 4 * (n + contexts + 1 + 3 * edges)
+            # the end of the last token is the size of the blob
+            blob_size = struct.unpack_from("<I", data, HEADER.size + 4 * (n - 1))[0] if n else 0
+            valid = (magic, st_size, st_mtime_ns) == (MAGIC, size, mtime_ns) and len(data) == table_end + blob_size
+        except struct.error:
+            valid = False
+        if not valid:
+            data.close()
+            return None
+        tables = memoryview(data)[HEADER.size : table_end].cast("I")
+        ends, starts, tokens, counts, targets = _split(tables, (n, contexts + 1, edges, edges, edges))
+        model = cls(
+            order, chars=bool(chars), blob=memoryview(data)[table_end:], ends=ends, starts=starts, tokens=tokens,
+            counts=counts, targets=targets,
+        )  # fmt: skip
+        model.mapped = True
+        return model
+
+    def save(self, path: Path, size: int, mtime_ns: int) -> None:
+        """Write the model to path."""
+        header = HEADER.pack(
+            MAGIC, size, mtime_ns, self.order, self.chars, len(self.ends), self.contexts, len(self.tokens),
+        )  # fmt: skip
+        write_cache(path, header, self.ends, self.starts, self.tokens, self.counts, self.targets, self.blob)
+
+    def token(self, i: int) -> str:
+        """Return token i of the vocabulary."""
+        return bytes(self.blob[self.ends[i - 1] if i else 0 : self.ends[i]]).decode()
+
+    def generate(self, rnd: random.Random | None = None) -> Iterator[str]:
+        """Return an endless stream of tokens, starting at a random context. Nothing if the text is too short."""
+        r = rnd or random
+        if not self.contexts:
+            return
+        starts, counts, targets = self.starts, self.counts, self.targets
+        c = r.randrange(self.contexts)
+        while True:
+            lo, hi = starts[c], starts[c + 1]
+            e = bisect_right(counts, r.randrange(counts[hi - 1]), lo, hi)
+            yield self.token(self.tokens[e])
+            c = targets[e]
+            if c == NONE:
+                c = r.randrange(self.contexts)
+
+    def words(self, rnd: random.Random | None = None) -> Iterator[str]:
+        """Return an endless stream of words, nothing if the text is too short."""
+        if not self.chars:
+            yield from self.generate(rnd)
+            return
+        word: list[str] = []
+        for char in self.generate(rnd):
+            if not char.isspace():
+                word.append(char)
+            elif word:
+                yield "".join(word)
+                word = []
+
+    def line(self, width: int = WIDTH, rnd: random.Random | None = None) -> str:
+        """Return a new line of generated words, as many as fit in width.
+
+        There is at least one word, unless the text is too short to have a context of the
+        order at all; then the line is empty.
+        """
+        words: list[str] = []
+        length = -1
+        for word in self.words(rnd):
+            if words and length + 1 + len(word) > width:
+                break
+            words.append(word)
+            length += 1 + len(word)
+        return " ".join(words)
+
+
+def _count_runs(ids: Iterator[int], n: int, order: int) -> list[tuple[array, array]]:
+    """Return the counts of the n-grams of ids, a sorted run per chunk.
+
+    An n-gram is a number, its tokens in base n, so the context is the n-gram // n.
+    """
+    mod = n**order
+    runs = []
+    i = context = 0
+    while chunk := array("I", islice(ids, CHUNK)):
+        codes = []
+        for t in chunk:
+            if i >= order:
+                codes.append(context * n + t)
+            context = (context * n + t) % mod
+            i += 1
+        runs.append(_count(codes))
+    return runs
+
+
+def _count(codes: list[int]) -> tuple[array, array]:
+    """Return the different codes, sorted, and their counts."""
+    counter = Counter(codes)
+    keys = array("Q", sorted(counter))
+    return keys, array("Q", map(counter.__getitem__, keys))
+
+
+def _tables(runs: list[tuple[array, array]], n: int) -> tuple[array, array, array, array]:
+    """Merge the runs into the contexts (as numbers), their starts, and the tokens and counts of the edges."""
+    keys, starts, tokens, counts = array("Q"), array("I"), array("I"), array("I")
+    previous = previous_context = -1
+    total = 0
+    for code, count in heapq.merge(*(zip(*run, strict=True) for run in runs)):
+        if code != previous:
+            if (context := code // n) != previous_context:
+                keys.append(context)
+                starts.append(len(tokens))
+                previous_context = context
+                total = 0
+            tokens.append(code % n)
+            counts.append(total)
+            previous = code
+        total += count
+        counts[-1] = total
+    starts.append(len(tokens))
+    return keys, starts, tokens, counts
+
+
+def _targets(keys: array, starts: array, tokens: array, n: int, order: int) -> array:
+    """Return the context each edge leads to, found among the sorted contexts."""
+    mod = n**order
+    targets = array("I", [NONE]) * len(tokens)
+    for c in range(len(keys)):
+        shifted = keys[c] * n % mod
+        for e in range(starts[c], starts[c + 1]):
+            t = bisect_left(keys, shifted + tokens[e])
+            if t < len(keys) and keys[t] == shifted + tokens[e]:
+                targets[e] = t
+    return targets
+
+
+def _split(tables: memoryview, lengths: Iterable[int]) -> list[memoryview]:
+    """Return the tables of the given lengths, one after the other."""
+    parts = []
+    start = 0
+    for length in lengths:
+        parts.append(tables[start : start + length])
+        start += length
+    return parts
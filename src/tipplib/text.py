@@ -3,11 +3,31 @@
 from __future__ import annotations
 
 import random
+from typing import TYPE_CHECKING
 
+from .adaptive import AdaptiveWords
+from .charindex import CharIndex
+from .corpus import pick_shard
+from .mapped import MappedLines
+from .ngram import NgramModel
 from .util import get_reporoot
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from pathlib import Path
+
 # file should have max. 70 long lines, and be UTF-8 encoded. Empty lines will be ignored.
-DATAFILE = get_reporoot() / "local" / "werther.md"
+# None means local/werther.md in the repo, resolved on first use (finding the repo root costs some stat calls).
+DATAFILE: Path | None = None
+# a corpus directory built by bin/brush.py --corpus, if set a random shard is used instead of DATAFILE
+CORPUS: Path | None = None
+
+
+def datafile() -> Path:
+    """Return the file to load the text from."""
+    if DATAFILE is None:
+        return get_reporoot() / "local" / "werther.md"
+    return DATAFILE
 
 
 class TextSource:
@@ -30,18 +50,22 @@ class TextSource:
         if getattr(self, "_initialized", False):
             return
 
-        self._lines: list[str] = []
+        self._lines: Sequence[str] = []
         self._current_index: int = -1  # Indicates no line selected yet
+        self._char_index: CharIndex | None = None  # built or loaded on the first drill
+        self._adaptive_words: AdaptiveWords | None = None  # collected on first use
+        self._ngram_model: NgramModel | None = None  # built or loaded on the first generated line
         self._load_from_file()
         self._initialized = True
 
     def _load_from_file(self) -> None:
-        """Load lines from DATAFILE, filtering out empty ones."""
+        """Map DATAFILE or a shard of CORPUS, its non-empty lines are decoded when they are used."""
         try:
-            if DATAFILE.exists():
-                text = DATAFILE.read_text(encoding="utf-8")
-                # Filter out pure whitespace lines and strip them
-                self._lines = [line.strip() for line in text.splitlines() if line.strip()]
+            path = datafile()
+            if CORPUS is not None and (shard := pick_shard(CORPUS)) is not None:
+                path = shard
+            if path.exists():
+                self._lines = MappedLines(path)
 
             if not self._lines:
                 self._lines = ["Dies ist ein Platzhaltertext.", "Die Datei konnte nicht geladen werden."]
@@ -50,6 +74,19 @@ class TextSource:
             # Robust error handling as requested
             self._lines = [f"Error loading file: {e}", "Please check the configuration."]
 
+    def session(self) -> TextSource:
+        """Return a view of the text with a position of its own, for one of many sessions in a process.
+
+        The lines, and the index and model built from them, are shared and only read. A view
+        builds what isn't built yet for itself, so build it on the singleton before. The adaptive
+        words learn from one user, so every view starts its own.
+        """
+        view = object.__new__(TextSource)
+        view.__dict__.update(self.__dict__)
+        view._current_index = -1
+        view._adaptive_words = None
+        return view
+
     def get_line(self) -> str:
         """Get a random, non-empty line from the text."""
         if not self._lines:
@@ -58,6 +95,38 @@ class TextSource:
         self._current_index = random.randint(0, len(self._lines) - 1)
         return self._lines[self._current_index]
 
+    def get_line_with(self, keys: Iterable[str]) -> str:
+        """Get a random line containing any of the characters or bigrams (e.g. "äöü" or ["ß", ", "]).
+
+        If there is none, get any random line.
+        """
+        if self._char_index is None:
+            self._char_index = CharIndex.for_lines(self._lines)
+        y = self._char_index.random_line(self._lines, keys)
+        if y is None:
+            return self.get_line()
+        self._current_index = y
+        return self._lines[y]
+
+    def get_generated_line(self) -> str:
+        """Get a new line made up from the word n-grams of the text, or a random line if the text is too short."""
+        if self._ngram_model is None:
+            self._ngram_model = NgramModel.for_lines(self._lines)
+        return self._ngram_model.line() or self.get_line()
+
+    def adaptive_words(self) -> AdaptiveWords:
+        """Return the words of the text, to draw by the results of typing them."""
+        if self._adaptive_words is None:
+            self._adaptive_words = AdaptiveWords.from_lines(self._lines)
+        return self._adaptive_words
+
+    @property
+    def current_line(self) -> str:
+        """Return the line handed out last, or an empty string if there was none yet."""
+        if self._current_index == -1 or not self._lines:
+            return ""
+        return self._lines[self._current_index]
+
     def get_next_line(self) -> str:
         """Get the next (non-empty) line from the text, cycling back to the beginning if necessary."""
         if not self._lines:
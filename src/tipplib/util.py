@@ -1,5 +1,6 @@
 """Some utility functions for the project."""
 
+from collections.abc import Buffer
 from pathlib import Path
 import functools
 
@@ -14,3 +15,19 @@ def get_reporoot() -> Path:
             return here
         assert here != here.parent, f".git/ not found from starting point {original_here}"
         here = here.parent
+
+
+def write_cache(path: Path, *chunks: Buffer) -> None:
+    """Write a cache file in one go, through a temporary file next to it.
+
+    Readers see the old file or the complete new one. Failing to write is no problem, the
+    cache is built again the next time.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        tmp.replace(path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
@@ -4,21 +4,18 @@ from __future__ import annotations
 from time import time
 from typing import TYPE_CHECKING, NamedTuple
 
-from blessed import Terminal
+from termlib import echo, esc, on_reset, screen_size, term
+from termlib.trace import traced
+from termlib.width import width
+
+from .keylog import key_code, key_flags
 
 if TYPE_CHECKING:
     from collections.abc import Callable
     from typing import Self
     from blessed.keyboard import Keystroke
 
-
-term = Terminal()
-
-
-def echo(*args) -> None:  # noqa: ANN002
-    """Print all arguments with no separator and flush the result."""
-    output = "".join(str(arg) for arg in args)
-    print(output, end="", flush=True)
+    from .keylog import KeyLog
 
 
 def beep() -> None:
@@ -44,10 +41,16 @@ class Config:
         self._initialized = True
 
         # consider moving these to a separate theme or style class later
-        self.dim = term.color_hex("#888888")
-        self.bold = term.bright_cyan
-        self.alert = term.color_hex("#880000")
-        self.success = term.color_hex("#008800")
+        self.dim: str = esc.color_hex("#888888")
+        self.bold: str = esc.bright_cyan
+        self.alert: str = esc.color_hex("#880000")
+        self.success: str = esc.color_hex("#008800")
+
+
+@on_reset
+def _reset_config() -> None:
+    """Resolve the colors again for a new terminal."""
+    Config._instance = None  # noqa: SLF001
 
 
 ALERT_X = 20
@@ -70,8 +73,12 @@ class WorditorResult(NamedTuple):
 class Worditor:
     """Hold and manage the state of an editor for one word."""
 
-    def __init__(self, y0: int, x0: int, target: str, ty0: int, tx0: int) -> None:  # noqa: PLR0913
-        """Initialize the editor state."""
+    def __init__(self, y0: int, x0: int, target: str, ty0: int, tx0: int, *, shown: bool = False) -> None:  # noqa: PLR0913
+        """Initialize the editor state.
+
+        If shown, the target is already on the screen as part of its line (see tipplib.layout),
+        so it is only written again in place, without clearing the rest of its row.
+        """
         # initial position, where the word begins
         self.y0: int = y0
         self.x0: int = x0
@@ -84,6 +91,7 @@ class Worditor:
         # approach: edit each line individually and track edits in the line
         self.current: str = ""
         self.target: str = target
+        self.shown: bool = shown
 
         # callback for when space is pressed, to trigger the next word
 
@@ -92,16 +100,28 @@ class Worditor:
             self.alert_since: float = -1.0
             self.alert_length: int = 0
             self.alert_timeout: float = 2.0
+            # set by the trainer to log the keystrokes, kept across resets
+            self.keylog: KeyLog | None = None
 
-        # show the target word at the beginning
-        echo(f"{term.move_yx(ty0, tx0)}{target}" + term.clear_eol())
-        echo(f"{term.move_yx(y0, x0)}" + term.clear_eol())
-        self.set_cursor()
+        # resolved once per word, not on every keystroke
+        self.cfg: Config = Config()
 
-    def reset(self, y0: int, x0: int, target: str, ty0: int, tx0: int) -> None:  # noqa: PLR0913
+        # the color the current word is shown in, None before anything was typed
+        self.color: str | None = None
+        # the color the terminal writes in after our last output, "" for normal,
+        # so typing on in the same color only needs the characters
+        self.pen: str = ""
+
+        # show the target word at the beginning, the cursor ends up where the word begins
+        end = "" if shown else esc.clear_eol
+        echo(f"{esc.normal}{esc.move_yx(ty0, tx0)}{target}{end}{esc.move_yx(y0, x0)}{esc.clear_eol}")
+        self.revoke_alert()
+
+    def reset(self, y0: int, x0: int, target: str, ty0: int, tx0: int, *, shown: bool = False) -> None:  # noqa: PLR0913
         """Reset the editor to a new initial state."""
-        self.__init__(y0, x0, target, ty0, tx0)
+        self.__init__(y0, x0, target, ty0, tx0, shown=shown)
 
+    @traced()
     def run(self) -> WorditorResult:
         """Run the main loop for the word editor."""
         while True:
@@ -112,38 +132,53 @@ class Worditor:
                 # TODO manage resizing
                 continue  # No key pressed, continue the loop
 
-            if key.name:
-                if key.name in ("KEY_CTRL_C", "KEY_ESCAPE"):
-                    return WorditorResult(
-                        target=self.target,
-                        typed=self.current.strip(),
-                        success=self.current.strip() == self.target,
-                        leave=True,
-                    )
-
-                if key.name == "KEY_BACKSPACE":
-                    self.backspace()
-                    continue
-
-            if key.is_sequence:
-                self.alert(f"? {key.name}")  # Show the key name as a quick message
-                continue
-
-            if key == " ":
-                if self.current.strip() == "":
-                    beep()
-                    continue
-                self.char(key)
-                self.echo_word()
+            if (result := self.handle_key(key)) is not None:
+                return result
+
+    def handle_key(self, key: Keystroke) -> WorditorResult | None:
+        """Process one keystroke. Return the result when the word is done or left, None otherwise."""
+        if self.keylog is None:
+            return self._handle_key(key)
+        expected = (self.target + " ")[len(self.current) : len(self.current) + 1]
+        result = self._handle_key(key)
+        self.keylog.record(key_code(key), key_flags(key, expected, result))
+        return result
+
+    def _handle_key(self, key: Keystroke) -> WorditorResult | None:
+        """Process one keystroke, see handle_key."""
+        if key.name:
+            if key.name in ("KEY_CTRL_C", "KEY_ESCAPE"):
+                if self.pen:
+                    echo(esc.normal)  # don't leave the color to whatever comes next
                 return WorditorResult(
                     target=self.target,
                     typed=self.current.strip(),
                     success=self.current.strip() == self.target,
-                    leave=False,
+                    leave=True,
                 )
 
+            if key.name == "KEY_BACKSPACE":
+                self.backspace()
+                return None
+
+        if key.is_sequence:
+            self.alert(f"? {key.name}")  # Show the key name as a quick message
+            return None
+
+        if key == " ":
+            if self.current.strip() == "":
+                beep()
+                return None
             self.char(key)
-            continue
+            return WorditorResult(
+                target=self.target,
+                typed=self.current.strip(),
+                success=self.current.strip() == self.target,
+                leave=False,
+            )
+
+        self.char(key)
+        return None
 
     @staticmethod
     def beep() -> None:
@@ -153,50 +188,70 @@ class Worditor:
     @property
     def max_x(self) -> int:
         """Return the maximum x valid for cursor position."""
-        return term.width - 2
+        return screen_size()[1] - 2
 
     @property
     def in_last_col(self) -> bool:
         """Return True if the cursor is in the last column of the text area."""
         return self.x == self.max_x
 
-    def echo_word(self) -> None:
-        """Show the current word at the correct position."""
+    def word_color(self) -> str:
+        """Return the color for the current word: success while it is right so far, alert otherwise."""
         if self.current.endswith(" "):
             # done with that word
-            if self.current.strip() == self.target:  # noqa: SIM108
-                use_color = Config().success
-            else:
-                use_color = Config().alert
+            return self.cfg.success if self.current.strip() == self.target else self.cfg.alert
+        return self.cfg.success if self.target.startswith(self.current.strip()) else self.cfg.alert
+
+    @traced()
+    def echo_word(self) -> None:
+        """Show the current word at the correct position, the cursor ends up behind it."""
+        use_color = self.word_color()
+        if self.current.endswith(" "):
             # also echo the target word again, so the user can see what it was in case of an error
-            echo(f"{term.move_yx(self.ty0, self.tx0)}{use_color}{self.target}{term.normal}" + term.clear_eol())
-        elif self.target.startswith(self.current.strip()):
-            # not done: check if correct so far
-            use_color = Config().success
+            echo(
+                f"{esc.move_yx(self.ty0, self.tx0)}{use_color}{self.target}{esc.normal}"
+                f"{'' if self.shown else esc.clear_eol}"
+                f"{esc.move_yx(self.y0, self.x0)}{use_color}{self.current}{esc.normal}{esc.clear_eol}",
+            )
+            self.pen = ""
         else:
-            # not done, but already wrong
-            use_color = Config().alert
-        echo(f"{term.move_yx(self.y0, self.x0)}{use_color}{self.current}{term.normal}" + term.clear_eol())
+            echo(f"{esc.move_yx(self.y0, self.x0)}{use_color}{self.current}{esc.clear_eol}")
+            self.pen = use_color
+        self.color = use_color
 
     def char(self, key: Keystroke | str) -> None:
-        """Insert the character at the current position."""
+        """Insert the character at the current position.
+
+        Only the character is written, where the cursor already is. The whole word is
+        written again only when it changes color, or when it is done.
+        """
         char_value = str(key)
-        if term.length(char_value) > 1:  # avoid emojis and other weird stuff, but not Umlaute
+        if (columns := width(char_value)) > 1:  # avoid emojis and other weird stuff, but not Umlaute
             beep()
-            self.alert(f"ignoring {char_value!r} (len={term.length(char_value)})")
+            self.alert(f"ignoring {char_value!r} (len={columns})")
             return
+        self.revoke_alert()  # before moving on, it puts the cursor back where it is now
         self.current = self.current + char_value
-        self.x += 1
-        self.echo_word()
-        self.set_cursor()
+        self.x += columns
+        if self.current.endswith(" ") or (color := self.word_color()) != self.color:
+            self.echo_word()
+        elif self.pen == color:
+            echo(char_value)
+        else:
+            echo(color + char_value)
+            self.pen = color
 
     def backspace(self) -> None:
-        """Delete the character before the current position."""
-        if self.x > self.x0:
+        """Delete the character before the current position, the same way as char writes it."""
+        if self.current:
+            self.revoke_alert()
+            columns = width(self.current[-1])
             self.current = self.current[:-1]
-            self.x -= 1
-            self.echo_word()
-            self.set_cursor()
+            self.x -= columns
+            if self.word_color() != self.color or columns != 1:
+                self.echo_word()
+            else:
+                echo("\b \b")  # the space has no background, so the pen doesn't matter
         else:
             self.beep()  # Can't backspace, bell sound
 
@@ -207,23 +262,26 @@ class Worditor:
 
     def _set_cursor(self) -> None:
         """Move cursor w/o cleaning alert. ONLY for set_cursor & alert/revoke_alert."""
-        echo(term.move_yx(self.y0, self.x))
+        echo(esc.move_yx(self.y0, self.x))
 
-    def alert(self, message: str | None, color: str = Config().alert) -> None:
-        """Show a quick message at the bottom of the terminal, col 20."""
+    def alert(self, message: str | None, color: str | None = None) -> None:
+        """Show a quick message at the bottom of the terminal, col 20. Default color is Config().alert."""
         self.revoke_alert(force=True)
         if message is None:
             return
-        echo(term.move_yx(term.height - 1, ALERT_X))
-        echo(color + message + term.normal)
+        if color is None:
+            color = self.cfg.alert
+        echo(esc.move_yx(screen_size()[0] - 1, ALERT_X))
+        echo(color + message + esc.normal)
+        self.pen = ""
         self._set_cursor()  # move back to the current position
         self.alert_since = time()
-        self.alert_length = len(message)
+        self.alert_length = width(message)
 
     def revoke_alert(self, *, force: bool = False) -> None:
         """Clear the quick message if it has been more than 2 seconds since it was shown."""
         if self.alert_since > 0 and (force or (time() - self.alert_since > self.alert_timeout)):
-            echo(term.move_yx(term.height - 1, ALERT_X) + (" " * self.alert_length))
+            echo(esc.move_yx(screen_size()[0] - 1, ALERT_X) + (" " * self.alert_length))
             self._set_cursor()  # move back to the current position
             self.alert_since = -1.0
             self.alert_length = 0
@@ -0,0 +1,56 @@
+"""Unit tests for running mini-vi scripts over files."""  # noqa: INP001
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from pyvilib.batch import parse_script, run_batch
+
+
+class TestBatch(unittest.TestCase):
+    """Test the key notation and headless runs."""
+
+    def test_parse_script(self) -> None:
+        """Special keys are resolved, line breaks ignored, <lt> is a literal <."""
+        self.assertEqual(parse_script("a<Esc>/x<CR>\n<lt><C-z>"), ["a", "\x1b", "/", "x", "\r", "<", "\x1a"])
+        self.assertRaises(ValueError, parse_script, "<Humbug>")
+
+    def test_run_batch(self) -> None:
+        """The script runs on each file, changed files are written back. A failed search stops it."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, text in enumerate(["Humbug\nQuatsch mit Soße\n", "Kram\n", "Quatsch"]):
+                path = Path(tmp) / f"{i}.txt"
+                path.write_text(text, encoding="utf-8")
+                paths.append(str(path))
+            stats = run_batch("<Esc>/Quatsch<CR>i<Del><Del><Del>\nKokolores", paths, jobs=1)
+            self.assertEqual((stats.files, stats.changed, stats.failed), (3, 2, 0))
+            self.assertEqual(Path(paths[0]).read_text(encoding="utf-8"), "Humbug\nKokolorestsch mit Soße\n")
+            self.assertEqual(Path(paths[1]).read_text(encoding="utf-8"), "Kram\n")
+            self.assertEqual(Path(paths[2]).read_text(encoding="utf-8"), "Kokolorestsch")
+
+    def test_line_endings(self) -> None:
+        """Lines are split only at newlines, and written back with the endings they had."""
+        with tempfile.TemporaryDirectory() as tmp:
+            data = {
+                "crlf.txt": (
+                    b"a\r\nform\x0cfeed\r\nsep\xe2\x80\xa8x\r\n",
+                    b"Xa\r\nform\x0cfeed\r\nsep\xe2\x80\xa8x\r\n",
+                ),
+                "mixed.txt": (b"a\r\nb\nc", b"Xa\r\nb\nc"),
+            }
+            for name, (before, _) in data.items():
+                (Path(tmp) / name).write_bytes(before)
+            stats = run_batch("X", [str(Path(tmp) / name) for name in data], jobs=1)
+            self.assertEqual(stats.changed, 2)
+            for name, (_, after) in data.items():
+                self.assertEqual((Path(tmp) / name).read_bytes(), after)
+
+    def test_missing_file(self) -> None:
+        """Files that can't be read are counted as failed."""
+        stats = run_batch("x", ["/does/not/exist"], jobs=1)
+        self.assertEqual((stats.files, stats.failed), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Unit tests for the streaming Werther pre-processor."""  # noqa: INP001
+
+import io
+import random
+import textwrap
+import unittest
+
+from bin.brush import PARAGRAPH_RE, brush, fill, normalize, paragraphs
+
+PIECES = [
+    "Lotte", "Wilhelm!", "Herz-Schmerz", "Wald-und-Wiesen-Zeugs", "x--y", "-", "--", "ab-", "3-4",
+    " ", "  ", "\t", "\n", "\n\n", "\n \n", "\n\n\n", "\r", "\xa0", "»", "«", "\u2013", "\u2014",
+    "Donaudampfschifffahrtsgesellschaftskapitänsmützenabzeichenherstellerinnung",
+]  # fmt: skip
+
+
+def at_once(text: str) -> str:
+    """Return text processed as a whole, like brush.py did before it streamed."""
+    content = PARAGRAPH_RE.sub(r"\1\n\n", normalize(text))
+    return "\n\n".join(textwrap.fill(p, width=70) for p in content.split("\n\n"))
+
+
+class TestBrush(unittest.TestCase):
+    """Test that the streaming pipeline gives the same result as the old one."""
+
+    def setUp(self) -> None:
+        """Make random texts of all kinds of words, dashes and whitespace."""
+        rnd = random.Random(1774)
+        self.texts = ["", "\n", " \n\n", "Humbug\n"]
+        self.texts += ["".join(rnd.choices(PIECES, k=rnd.randint(1, 150))) for _ in range(300)]
+
+    def test_fill(self) -> None:
+        """fill() is textwrap.fill(), for several widths."""
+        for text in self.texts:
+            for width in (70, 12, 5, 1):
+                with self.subTest(text=text, width=width):
+                    self.assertEqual(fill(text, width), textwrap.fill(text, width))
+
+    def test_paragraphs(self) -> None:
+        """The paragraphs don't depend on where the blocks read are cut."""
+        for text in self.texts:
+            expected = PARAGRAPH_RE.sub(r"\1\n\n", normalize(text)).split("\n\n")
+            for chunk in (1, 2, 7, 1000):
+                with self.subTest(text=text, chunk=chunk):
+                    self.assertEqual(list(paragraphs(io.StringIO(text), chunk)), expected)
+
+    def test_brush(self) -> None:
+        """The output is the same as when processing the whole text at once."""
+        for text in self.texts:
+            out = io.StringIO()
+            brush(io.StringIO(text), out)
+            self.assertEqual(out.getvalue(), at_once(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
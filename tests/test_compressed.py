@@ -0,0 +1,131 @@
+"""Unit tests for loading compressed files into mini-vi."""  # noqa: INP001
+
+import bz2
+import gzip
+import lzma
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from termlib.replay import CountingSink, pressed, replay
+from pyvilib import compressed
+from pyvilib.compressed import StreamReader, opener_for
+from pyvilib.minivi import load, mini_vi
+from pyvilib.paged import PagedLines
+
+TEXT = "".join(f"Zeile {i} mit Humbug und Käse\n" for i in range(20_000)).encode()
+
+
+class TestCompressed(unittest.TestCase):
+    """Test detecting and streaming compressed files."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Write the text plain and compressed in three ways, with misleading names."""
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dir = Path(cls.tmp.name)
+        for name, compress in (("plain.gz", bytes), ("gz.txt", gzip.compress), ("xz.log", lzma.compress),
+                               ("bz2", bz2.compress)):  # fmt: skip
+            (cls.dir / name).write_bytes(compress(TEXT))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Remove the files."""
+        cls.tmp.cleanup()
+
+    def setUp(self) -> None:
+        """Use small chunks, so the test files take a few."""
+        old_chunk, compressed.CHUNK = compressed.CHUNK, 64 * 1024
+        self.addCleanup(setattr, compressed, "CHUNK", old_chunk)
+
+    def read_all(self, reader: StreamReader) -> list[str]:
+        """Poll the reader until it is done and return all lines."""
+        lines = []
+        polls = 0
+        while reader.due():
+            lines += reader.poll()
+            polls += 1
+        reader.close()
+        self.assertGreater(polls, 2)  # in chunks
+        return lines
+
+    def test_detect_by_magic(self) -> None:
+        """The content decides, not the name."""
+        self.assertIsNone(opener_for(self.dir / "plain.gz"))
+        for name in ("gz.txt", "xz.log", "bz2"):
+            self.assertIsNotNone(opener_for(self.dir / name), name)
+
+    def test_stream_all_formats(self) -> None:
+        """All formats give the same lines."""
+        expected = TEXT.decode().splitlines()
+        for name in ("gz.txt", "xz.log", "bz2"):
+            path = self.dir / name
+            opener = opener_for(path)
+            assert opener is not None
+            reader = StreamReader(path, opener)
+            self.assertEqual(self.read_all(reader), expected, name)
+            self.assertTrue(reader.event.startswith(f"loaded {len(TEXT) / 1e6:.1f} MB"))
+
+    def read_paged(self, name: str, max_pages: int = 2) -> tuple[StreamReader, PagedLines]:
+        """Read a file into PagedLines keeping few pages, like the editor does."""
+        path = self.dir / name
+        opener = opener_for(path)
+        assert opener is not None
+        reader = StreamReader(path, opener)
+        self.addCleanup(reader.close)
+        lines = PagedLines(max_pages=max_pages)
+        while reader.due():
+            lines.extend(reader.poll())
+        return reader, lines
+
+    def test_pages_read_again(self) -> None:
+        """Only a few pages stay, dropped ones are decompressed again when used."""
+        expected = TEXT.decode().splitlines()
+        for name in ("gz.txt", "xz.log", "bz2"):
+            _, lines = self.read_paged(name)
+            self.assertEqual(len(lines), len(expected))
+            self.assertLessEqual(len(lines.loaded), 2)
+            for y in (0, 17_000, 3, 4711, 19_999):
+                self.assertEqual(lines[y], expected[y], name)
+            self.assertEqual(list(lines), expected, name)
+            self.assertGreater(lines.fetches, 5)
+
+    def test_checkpoints(self) -> None:
+        """A gzip file gets checkpoints while it is read, a page deep in it is read from the one before."""
+        with mock.patch.object(compressed, "CHECKPOINT", 128 * 1024):
+            reader, lines = self.read_paged("gz.txt")
+        self.assertGreater(len(reader.checkpoints), 4)
+        self.assertIsNotNone(reader.checkpoints[-1].state)
+        with mock.patch.object(compressed, "Decompressing", wraps=compressed.Decompressing) as decompressing:
+            self.assertEqual(lines[0], "Zeile 0 mit Humbug und Käse")
+            self.assertEqual(lines[13_000], "Zeile 13000 mit Humbug und Käse")
+        starts = [call.args[2] for call in decompressing.call_args_list]
+        self.assertEqual(starts[0], reader.checkpoints[0])
+        self.assertIn(starts[1], reader.checkpoints[2:])
+
+    def test_concatenated_streams(self) -> None:
+        """A new stream is a checkpoint for any format, garbage after the last one is ignored."""
+        half = len(TEXT) // 2
+        path = self.dir / "two.bz2"
+        path.write_bytes(bz2.compress(TEXT[:half]) + bz2.compress(TEXT[half:]) + b"\0" * 10)
+        with mock.patch.object(compressed, "CHECKPOINT", 1):
+            reader, lines = self.read_paged("two.bz2")
+        self.assertEqual(list(lines), TEXT.decode().splitlines())
+        self.assertIn(half, [cp.out for cp in reader.checkpoints if cp.state is None])
+        self.assertTrue(reader.event.startswith("loaded"))
+
+    def test_mini_vi_loads_while_running(self) -> None:
+        """The editor gets a reader for the rest, and shows the first lines after one chunk."""
+        path = str(self.dir / "xz.log")
+        lr = load(["pyvian", path])
+        self.assertIsInstance(lr.source, StreamReader)
+        if lr.source:
+            lr.source.close()
+        sinks: list[CountingSink] = []
+        replay(lambda: mini_vi(["pyvian", path]), pressed("KEY_DOWN", 1), sink=sinks)
+        self.assertIn("Zeile 22 mit Humbug", sinks[0].getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
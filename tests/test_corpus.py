@@ -0,0 +1,90 @@
+"""Unit tests for building and using a corpus of many books."""  # noqa: INP001
+
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from bin.brush import build_corpus, normalize
+from tipplib import text
+from tipplib.corpus import load_manifest, pick_shard
+from tipplib.text import TextSource
+
+BOOKS = {
+    "goethe/werther.txt": "Am 4. Mai 1771.\nWie froh bin ich, dass ich weg bin!\n",
+    "goethe/faust.txt": "Habe nun, ach! Philosophie,\nJuristerei und Medizin,\n\nUnd leider auch Theologie!\n",
+    "humbug.txt": "Quatsch \u2013 Firlefanz »Kram«\n",
+}
+
+
+class TestCorpus(unittest.TestCase):
+    """Test full and incremental builds, and picking shards."""
+
+    def setUp(self) -> None:
+        """Write some books."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.source = Path(tmp.name) / "books"
+        self.target = Path(tmp.name) / "corpus"
+        for name, content in BOOKS.items():
+            path = self.source / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+
+    def test_build(self) -> None:
+        """All books are brushed into shards with their line counts."""
+        stats = build_corpus(self.source, self.target, jobs=1)
+        self.assertEqual((stats.books, stats.built, stats.skipped, stats.failed), (3, 3, 0, 0))
+        books = load_manifest(self.target)
+        self.assertEqual(sorted(books), sorted(BOOKS))
+        self.assertEqual(books["goethe/faust.txt"].lines, 3)
+        self.assertEqual(stats.lines, 6)
+        shard = self.target / books["humbug.txt"].shard
+        self.assertEqual(shard.read_text(encoding="utf-8"), 'Quatsch - Firlefanz "Kram"')
+
+    def test_incremental(self) -> None:
+        """Only new and changed books are built again, shards of removed books are removed."""
+        build_corpus(self.source, self.target, jobs=1)
+        stats = build_corpus(self.source, self.target, jobs=1)
+        self.assertEqual((stats.built, stats.skipped), (0, 3))
+
+        # touched, but the same content: the hash saves the build
+        st = (self.source / "humbug.txt").stat()
+        os.utime(self.source / "humbug.txt", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        (self.source / "zeugs.txt").write_text("Zeugs\n", encoding="utf-8")
+        old_shard = load_manifest(self.target)["goethe/werther.txt"].shard
+        (self.source / "goethe/werther.txt").write_text("Am 10. Mai.\n", encoding="utf-8")
+        (self.source / "goethe/faust.txt").unlink()
+        stats = build_corpus(self.source, self.target, jobs=1)
+        self.assertEqual((stats.books, stats.built, stats.skipped), (3, 2, 1))
+        books = load_manifest(self.target)
+        self.assertEqual(sorted(books), ["goethe/werther.txt", "humbug.txt", "zeugs.txt"])
+        self.assertEqual(sorted(p.name for p in self.target.glob("*.md")), sorted(b.shard for b in books.values()))
+        self.assertFalse((self.target / old_shard).exists())
+
+    def test_parallel(self) -> None:
+        """The process pool gives the same corpus."""
+        build_corpus(self.source, self.target / "one", jobs=1)
+        build_corpus(self.source, self.target / "two", jobs=2)
+        self.assertEqual(load_manifest(self.target / "one"), load_manifest(self.target / "two"))
+
+    def test_pick_shard(self) -> None:
+        """Shards are picked by their number of lines, TextSource loads one of them."""
+        self.assertIsNone(pick_shard(self.target))
+        build_corpus(self.source, self.target, jobs=1)
+        books = load_manifest(self.target)
+        rnd = random.Random(4711)
+        picks = [pick_shard(self.target, rnd).name for _ in range(600)]
+        self.assertAlmostEqual(picks.count(books["goethe/faust.txt"].shard) / 600, 0.5, delta=0.1)
+
+        TextSource._instance = None  # noqa: SLF001
+        self.addCleanup(setattr, TextSource, "_instance", None)
+        with mock.patch.object(text, "CORPUS", self.target):
+            line = TextSource().get_line()
+        self.assertIn(line, normalize("".join(BOOKS.values())))
+
+
+if __name__ == "__main__":
+    unittest.main()
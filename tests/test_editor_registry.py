@@ -20,6 +20,8 @@ class TestKeyHandlerRegistry(unittest.TestCase):
 
     def setUp(self) -> None:
         """Set up a fresh KeyHandlerRegistry and Editor for each test."""
+        # keep the real registry for the other tests
+        self.saved_registry = KeyHandlerRegistry._instance  # noqa: SLF001
         # Reset singleton to ensure clean state
         KeyHandlerRegistry._instance = None  # noqa: SLF001
         self.registry = KeyHandlerRegistry()
@@ -34,6 +36,10 @@ class TestKeyHandlerRegistry(unittest.TestCase):
         self.editor.echo = lambda *args: None  # noqa: ARG005
         self.editor.set_cursor = lambda: None
 
+    def tearDown(self) -> None:
+        """Restore the real registry."""
+        KeyHandlerRegistry._instance = self.saved_registry  # noqa: SLF001
+
     def test_basic_registration(self) -> None:
         """Test that a basic key handler can be registered and executed."""
 
@@ -0,0 +1,107 @@
+"""Unit tests for following growing files in mini-vi."""  # noqa: INP001
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from termlib import set_term
+from termlib.replay import ReplayTerminal
+from pyvilib.editor import Editor
+from pyvilib.follow import Follower
+
+
+class TestFollower(unittest.TestCase):
+    """Test reading appended lines, truncation and rotation."""
+
+    def setUp(self) -> None:
+        """Make a log file and follow it."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "humbug.log"
+        self.path.write_bytes(b"eins\nzwei\n")
+        self.follower = Follower(self.path, interval=0)
+        self.addCleanup(self.follower.close)
+
+    def append(self, data: bytes) -> None:
+        """Append data to the log file."""
+        with self.path.open("ab") as f:
+            f.write(data)
+
+    def test_appended_lines(self) -> None:
+        """Only new complete lines are returned, an unfinished one waits for its newline."""
+        self.assertEqual(self.follower.poll(), ["eins", "zwei"])
+        self.assertEqual(self.follower.poll(), [])
+        self.append(b"drei\nvi")
+        self.assertEqual(self.follower.poll(), ["drei"])
+        self.append("er Käse\n".encode())
+        self.assertEqual(self.follower.poll(), ["vier Käse"])
+
+    def test_truncation(self) -> None:
+        """A file getting shorter is read from the start again."""
+        self.follower.poll()
+        self.path.write_bytes(b"neu\n")
+        self.assertEqual(self.follower.poll(), ["neu"])
+        self.assertEqual(self.follower.event, "truncated")
+
+    def test_rotation(self) -> None:
+        """After a rotation the rest of the old file comes first, then the new file with the event."""
+        self.follower.poll()
+        self.append(b"letzte\n")
+        self.path.rename(self.path.with_suffix(".1"))
+        self.path.write_bytes(b"erste\n")
+        self.assertEqual((self.follower.poll(), self.follower.event), (["letzte"], ""))
+        self.assertEqual((self.follower.poll(), self.follower.event), (["erste"], "rotated"))
+
+    def test_rotation_read_in_parts(self) -> None:
+        """The rest of a rotated file is read MAX_READ bytes per poll, like a growing one."""
+        self.follower.poll()
+        self.append(b"Humbug\nKram\nTinnef\n")
+        self.path.rename(self.path.with_suffix(".1"))
+        self.path.write_bytes(b"erste\n")
+        with mock.patch("pyvilib.follow.MAX_READ", 8):
+            polls = [self.follower.poll() for _ in range(5)]
+        self.assertEqual(polls, [["Humbug"], ["Kram"], ["Tinnef"], ["erste"], []])
+
+
+class TestAppendLines(unittest.TestCase):
+    """Test appending lines to the editor buffer."""
+
+    def setUp(self) -> None:
+        """Make an editor on an 80x24 replay terminal."""
+        self.terminal = ReplayTerminal([], height=24, width=80)
+        set_term(self.terminal)
+        self.addCleanup(set_term, None)
+        self.e = Editor()
+
+    def written(self, lines: list[str]) -> int:
+        """Append the lines and return the number of bytes written."""
+        before = self.terminal.sink.bytes
+        self.e.append_lines(lines)
+        return self.terminal.sink.bytes - before
+
+    def test_follow_end(self) -> None:
+        """The first lines replace the empty buffer, and the cursor follows the end."""
+        self.written([f"Zeile {i}" for i in range(100)])
+        self.assertEqual((len(self.e.lines), self.e.y + self.e.y_offset), (100, 99))
+        self.written(["Quatsch"])
+        self.assertEqual(self.e.y + self.e.y_offset, 100)
+
+    def test_clear_lines(self) -> None:
+        """After clearing, the next lines replace the buffer and are numbered from 1."""
+        self.e.append_lines([f"Zeile {i}" for i in range(100)])
+        self.e.line_base = 4711
+        self.e.clear_lines()
+        self.e.append_lines(["neu"])
+        self.assertEqual((self.e.lines, self.e.line_base, self.e.y + self.e.y_offset), (["neu"], 0, 0))
+
+    def test_no_repaint_when_not_visible(self) -> None:
+        """Lines appended below the screen only update the status line."""
+        self.e.append_lines([f"Zeile {i}" for i in range(100)])
+        self.e.goto(0, 0)
+        self.assertLess(self.written(["Quatsch"] * 1000), 100)
+        self.assertEqual(len(self.e.lines), 1100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Unit tests for the cached line index of big files."""  # noqa: INP001
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from pyvilib import lineindex, minivi
+from pyvilib.lineindex import STRIDE, cache_path, evict, line_index
+from pyvilib.paged import PagedLines
+
+
+class TestLineIndex(unittest.TestCase):
+    """Test building, reusing and extending the index."""
+
+    def setUp(self) -> None:
+        """Use a temporary cache and write a log file."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        env = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": str(Path(tmp.name) / "cache")})
+        env.start()
+        self.addCleanup(env.stop)
+        self.path = Path(tmp.name) / "humbug.log"
+        self.text = "".join(f"{i} Quatsch{'!' * (i % 7)}\n" for i in range(10_000)).encode()
+        self.path.write_bytes(self.text)
+
+    def test_offsets(self) -> None:
+        """Offsets of any line are right, also across chunks."""
+        with mock.patch.object(lineindex, "CHUNK", 1000):
+            index = line_index(self.path)
+        starts = [0] + [i + 1 for i, c in enumerate(self.text) if c == ord("\n")]
+        self.assertEqual(index.lines, 10_000)
+        self.assertEqual(list(index.offsets), starts[::STRIDE])
+        with self.path.open("rb") as f:
+            for n in (0, 1, STRIDE - 1, STRIDE, 4711, 9_999, 10_000):
+                self.assertEqual(index.offset(n, f), starts[n], n)
+
+    def test_reuse_and_extend(self) -> None:
+        """An unchanged file is not read again, an appended one only from the old end."""
+        self.assertEqual(line_index(self.path).scanned, len(self.text))
+        self.assertTrue(cache_path(self.path).exists())
+        self.assertEqual(line_index(self.path).scanned, 0)
+        with self.path.open("ab") as f:
+            f.write(b"Kram\nZeugs\nKrims")
+        index = line_index(self.path)
+        self.assertEqual((index.scanned, index.lines), (16, 10_002))
+
+    def test_rewritten_file(self) -> None:
+        """A file of the same size but with other content gets a new index."""
+        line_index(self.path)
+        self.path.write_bytes(self.text.replace(b"\n", b" ", 5000))
+        os.utime(self.path, ns=(1, 1))
+        self.assertEqual(line_index(self.path).lines, 5_000)
+
+    def test_evict(self) -> None:
+        """The oldest index files go first."""
+        directory = cache_path(self.path).parent
+        directory.mkdir(parents=True)
+        for i in range(5):
+            p = directory / f"{i}.idx"
+            p.write_bytes(b"x" * 100)
+            os.utime(p, ns=(i, i))
+        evict(directory, max_bytes=250)
+        self.assertEqual(sorted(p.name for p in directory.iterdir()), ["3.idx", "4.idx"])
+
+    def test_open_big_file(self) -> None:
+        """A big file is opened through the index, its lines are read page by page."""
+        with self.path.open("ab") as f:
+            f.write(b"Krims")  # no newline
+        with mock.patch.object(minivi, "BIG_FILE", 1000):
+            lr = minivi.load(["pyvian", str(self.path)])
+        self.assertIsInstance(lr.content, PagedLines)
+        self.assertEqual(list(lr.content), [*self.text.decode().splitlines(), "Krims"])
+        self.assertEqual(lr.content.fetches, len(lr.content.parts))  # each page read once
+
+    def test_follow(self) -> None:
+        """Following shows the whole file, or the last lines with -n."""
+        lr = minivi.load(["pyvian", "-f", str(self.path)])
+        self.addCleanup(lr.source.close)
+        self.assertEqual((len(lr.content), lr.line_base, lr.content[0]), (10_000, 0, "0 Quatsch"))
+        lr = minivi.load(["pyvian", "-f", "-n", "10", str(self.path)])
+        self.addCleanup(lr.source.close)
+        self.assertEqual((len(lr.content), lr.line_base, lr.content[0]), (10, 9_990, "9990 Quatsch!"))
+        with self.path.open("ab") as f:
+            f.write(b"Kram\n")
+        self.assertEqual(lr.source.poll(), ["Kram"])
+
+
+if __name__ == "__main__":
+    unittest.main()
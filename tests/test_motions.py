@@ -0,0 +1,91 @@
+"""Unit tests for counts and motions in command mode of mini-vi."""  # noqa: INP001
+
+import unittest
+
+from termlib import set_term
+from termlib.replay import ReplayTerminal, pressed, typed
+from pyvilib.config import Mode
+from pyvilib.editor import Editor
+from pyvilib.minivi import dispatch
+
+
+class TestMotions(unittest.TestCase):
+    """Test count-prefixed commands on a big buffer."""
+
+    def setUp(self) -> None:
+        """Make an editor in command mode with a million lines."""
+        self.terminal = ReplayTerminal([], height=24, width=80)
+        set_term(self.terminal)
+        self.addCleanup(set_term, None)
+        self.e = Editor()
+        self.e.lines = [f"Zeile {i + 1} mit Humbug und Quatsch" for i in range(1_000_000)]
+        self.e.set_mode(Mode.command)
+
+    def press(self, keys: str) -> int:
+        """Dispatch the keys and return the number of bytes written."""
+        before = self.terminal.sink.bytes
+        for key in keys:
+            dispatch(self.e, ReplayTerminal([key]).inkey())
+        return self.terminal.sink.bytes - before
+
+    @property
+    def line(self) -> int:
+        """Return the line number (1 based) of the cursor."""
+        return self.e.y + self.e.y_offset + 1
+
+    def test_count_jump_repaints_once(self) -> None:
+        """10000j is one jump: the output is about one screen."""
+        written = self.press("10000j")
+        self.assertEqual(self.line, 10_001)
+        self.assertLess(written, 24 * 200)
+
+    def test_small_count_scrolls_to_edge(self) -> None:
+        """Moving just below the screen scrolls so the cursor is in the last line."""
+        self.press("25j")
+        self.assertEqual((self.line, self.e.y), (26, self.e.max_y))
+
+    def test_goto_lines(self) -> None:
+        """G, gg, 123G and :123456 go to the start of the line."""
+        self.press("G")
+        self.assertEqual(self.line, 1_000_000)
+        self.press("gg")
+        self.assertEqual(self.line, 1)
+        self.press("123G")
+        self.assertEqual(self.line, 123)
+        self.press(":123456")
+        dispatch(self.e, ReplayTerminal(pressed("KEY_ENTER")).inkey())
+        self.assertEqual((self.line, self.e.x, self.e.mode), (123_456, 0, Mode.command))
+
+    def test_zero_and_dollar(self) -> None:
+        """0 is a motion unless it continues a count."""
+        self.press("$")
+        self.assertEqual(self.e.x, len("Zeile 1 mit Humbug und Quatsch"))
+        self.press("0")
+        self.assertEqual(self.e.x, 0)
+        self.press("10l")
+        self.assertEqual(self.e.x, 10)
+
+    def test_delete_count_is_one_change(self) -> None:
+        """50x deletes up to the end of the line in one undo step."""
+        self.press("6l50x")
+        self.assertEqual(self.e.lines[0], "Zeile ")
+        self.assertEqual(len(self.e.journal.undo_stack), 1)
+        self.press("u")
+        self.assertEqual(self.e.lines[0], "Zeile 1 mit Humbug und Quatsch")
+
+    def test_escape_forgets_count(self) -> None:
+        """A count typed before Esc is not used."""
+        self.press("12")
+        dispatch(self.e, ReplayTerminal(pressed("KEY_ESCAPE")).inkey())
+        self.press("j")
+        self.assertEqual(self.line, 2)
+
+    def test_typed_in_insert_mode(self) -> None:
+        """Digits are still just typed in insert mode."""
+        self.press("i")
+        self.press("".join(typed("10j")))
+        self.assertEqual(self.e.lines[0][:3], "10j")
+
+
+if __name__ == "__main__":
+    unittest.main()
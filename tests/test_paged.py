@@ -0,0 +1,59 @@
+"""Unit tests for lines kept in pages that are read again when used."""  # noqa: INP001
+
+import unittest
+
+from pyvilib.paged import Page, PagedLines
+
+
+class TestPagedLines(unittest.TestCase):
+    """Test reading, dropping and editing pages."""
+
+    def setUp(self) -> None:
+        """Make five pages of ten lines, at most two loaded."""
+        self.reads: list[int] = []
+        self.lines = PagedLines(max_pages=2)
+        for p in range(5):
+            self.lines.add_page(10, lambda p=p: self.page(p))
+
+    def page(self, p: int) -> list[str]:
+        """Return the lines of page p, as the file would."""
+        self.reads.append(p)
+        return [f"{p}.{i}" for i in range(10)]
+
+    def test_read_when_used(self) -> None:
+        """Pages are read when a line is used, and dropped when too many are loaded."""
+        self.assertEqual(len(self.lines), 50)
+        self.assertEqual(self.reads, [])
+        self.assertEqual([self.lines[0], self.lines[-1], self.lines[25], self.lines[9]], ["0.0", "4.9", "2.5", "0.9"])
+        self.assertEqual(self.reads, [0, 4, 2, 0])
+        self.assertEqual(self.lines[10:12], ["1.0", "1.1"])
+        with self.assertRaises(IndexError):
+            self.lines[50]
+
+    def test_edits_are_kept(self) -> None:
+        """An edited page is never dropped, lines after an insert or delete move."""
+        self.lines[12] = "Humbug"
+        self.lines.insert(15, "Käse")
+        del self.lines[0]
+        self.assertEqual(len(self.lines), 50)
+        for y in range(0, 50, 3):  # load all the others
+            self.lines[y]
+        self.assertEqual([self.lines[11], self.lines[14], self.lines[20]], ["Humbug", "Käse", "2.0"])
+        self.assertEqual(self.reads.count(1), 1)
+
+    def test_replace_all(self) -> None:
+        """Replacing all lines drops the pages, a Page can be dropped and read again."""
+        self.lines[:] = Page(["a", "b"], lambda: ["a", "b"])
+        self.lines.extend(["c"])
+        self.lines.append("d")
+        self.assertEqual(list(self.lines), ["a", "b", "c", "d"])
+        self.assertEqual(len(self.lines.loaded), 1)
+        self.assertEqual(self.reads, [])
+        with self.assertRaises(TypeError):
+            self.lines[1:3] = ["x"]
+        with self.assertRaises(TypeError):
+            del self.lines[1:3]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Unit tests for the headless keystroke replay."""  # noqa: INP001
+
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from termlib.replay import CountingSink, pressed, replay, typed
+from pyvilib.minivi import mini_vi
+from tipplib import keylog, text
+from tipplib.keylog import KeyLog
+from tipplib.text import TextSource
+from tipplib.worditor import Worditor, WorditorResult
+from bin.maschinenschreiben import Trainer
+from bin.replay_bench import bot_typist
+
+
+class TestReplay(unittest.TestCase):
+    """Test replaying keystrokes into the apps."""
+
+    def test_typed(self) -> None:
+        """Newlines become Enter, everything else stays as it is."""
+        self.assertEqual(list(typed("ab\nc")), ["a", "b", "\r", "c"])
+        self.assertEqual(list(pressed("KEY_DOWN", 2)), ["\x1b[B", "\x1b[B"])
+
+    def test_counting_sink(self) -> None:
+        """Bytes are counted as UTF-8."""
+        sink = CountingSink()
+        sink.write("abc")
+        sink.write("ä")
+        sink.flush()
+        self.assertEqual((sink.bytes, sink.writes, sink.flushes), (5, 2, 1))
+
+    def test_mini_vi(self) -> None:
+        """The editor runs headless and stops when the script is used up."""
+        sinks: list[CountingSink] = []
+        stats = replay(lambda: mini_vi(["pyvian"]), typed("Humbug\nQuatsch"), sink=sinks)
+        self.assertEqual(stats.keys, 14)
+        self.assertIn("Quatsch", sinks[0].getvalue())
+        self.assertGreater(stats.bytes_per_key, 0)
+        self.assertEqual(stats.bytes, sinks[0].bytes)
+
+    def test_worditor(self) -> None:
+        """A typed word followed by space completes the word."""
+        results: list[WorditorResult] = []
+        replay(lambda: results.append(Worditor(12, 4, "Käse", 5, 4).run()), typed("Käse "))
+        self.assertEqual(results, [WorditorResult(target="Käse", typed="Käse", success=True, leave=False)])
+
+    def test_worditor_echoes_only_the_changes(self) -> None:
+        """A character costs one write of itself, the word is written again only when it changes color."""
+        sinks: list[CountingSink] = []
+        keys = [*typed("Käxx"), *pressed("KEY_BACKSPACE", 2), *typed("se ")]
+        stats = replay(lambda: Worditor(12, 4, "Käse", 5, 4).run(), keys, sink=sinks)
+        parts = sinks[0].parts[1:]  # after showing the target
+        self.assertEqual(stats.flushes, stats.keys + 1)
+        self.assertEqual(parts[1], "ä")
+        self.assertIn("Käx", parts[2])  # wrong, in the alert color
+        self.assertEqual(parts[3:5], ["x", "\b \b"])  # still wrong
+        self.assertIn("Kä", parts[5])  # right again, in the success color
+        self.assertNotEqual(parts[2].replace("Käx", "Kä"), parts[5])
+        self.assertEqual(parts[6:8], ["s", "e"])
+        self.assertIn("Käse ", parts[8])
+
+    def use_text(self, lines: list[str]) -> None:
+        """Let the trainer type these lines."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / "text.md"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        text.DATAFILE, TextSource._instance = path, None  # noqa: SLF001
+        self.addCleanup(setattr, TextSource, "_instance", None)
+        self.addCleanup(setattr, text, "DATAFILE", None)
+
+    def test_trainer_on_a_narrow_terminal(self) -> None:
+        """Long lines are laid out in rows that fit, and a bot typing them gets every word right."""
+        self.use_text(["Schnickschnack Krimskrams Firlefanz Kokolores", "Larifari Pipifax Tinnef Gedöns"])
+        kl = KeyLog()
+        sinks: list[CountingSink] = []
+        replay(lambda: Trainer(keylog=kl), bot_typist(20), width=30, sink=sinks)
+        flags = [code >> 32 & 0xFF for code in kl.keys]
+        self.assertEqual(sum(1 for f in flags if f & keylog.WORD), 20)
+        self.assertFalse(any(f & (keylog.WRONG | keylog.MISS) for f in flags))
+        columns = [int(x) for x in re.findall(r"\x1b\[\d+;(\d+)H", sinks[0].getvalue())]
+        self.assertLess(max(columns), 30)
+
+    def test_trainer_after_a_long_word(self) -> None:
+        """The next word is typed behind a word typed longer than its target, not over it."""
+        self.use_text(["Humbug Käse Kram"])
+        trainers: list[Trainer] = []
+        sinks: list[CountingSink] = []
+        replay(lambda: trainers.append(Trainer()), typed("Humbugxxxxxxxx Käse K"), sink=sinks)
+        e = trainers[0].e
+        self.assertEqual((e.target, e.x0, e.current), ("Kram", 4 + len("Humbugxxxxxxxx Käse "), "K"))
+        self.assertIn(f"\x1b[13;{4 + len('Humbugxxxxxxxx ') + 1}H", sinks[0].getvalue())  # Käse behind it
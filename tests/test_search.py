@@ -0,0 +1,85 @@
+"""Unit tests for the incremental search of mini-vi."""  # noqa: INP001
+
+import unittest
+from itertools import chain
+
+from termlib import set_term
+from termlib.replay import ReplayTerminal, pressed, typed
+from pyvilib.command import scan
+from pyvilib.config import Mode
+from pyvilib.editor import Editor
+from pyvilib.minivi import dispatch
+from pyvilib.search import Search
+from pyvilib.undo import Op
+
+LINES = ["Humbug", "Quatsch", "Kram", "Quatsch mit Soße", "Zeugs", "Quatsch"]
+
+
+class TestSearch(unittest.TestCase):
+    """Test scanning and keeping the index up to date."""
+
+    def test_scan_in_chunks_with_wrap(self) -> None:
+        """Scanning starts at start, wraps around and ends there."""
+        search = Search("Quatsch", LINES, start=2)
+        self.assertEqual(search.step(budget=2), 3)
+        self.assertFalse(search.done)
+        self.assertEqual(search.step(budget=2), 5)
+        self.assertTrue(search.wrapped)
+        while not search.done:
+            search.step(budget=2)
+        self.assertEqual(search.matches, [1, 3, 5])
+        self.assertEqual(search.scanned, len(LINES))
+
+    def test_edits_update_index(self) -> None:
+        """Splits and joins shift the index, edited lines are checked again."""
+        set_term(ReplayTerminal([]))
+        self.addCleanup(set_term, None)
+        e = Editor()
+        lines = e.lines = list(LINES)
+        search = e.search = Search("Quatsch", lines)
+        while not search.done:
+            search.step()
+        apply = e.apply
+
+        apply(Op("split", 0, 3))  # Hum|bug
+        self.assertEqual(search.matches, [2, 4, 6])
+        apply(Op("delete", 2, 0, "Q"))
+        self.assertEqual(search.matches, [4, 6])
+        apply(Op("join", 3, 4))  # Kram + Quatsch mit Soße
+        self.assertEqual(search.matches, [3, 5])
+        self.assertEqual(lines[3], "KramQuatsch mit Soße")
+
+    def test_highlight(self) -> None:
+        """Matches are wrapped, empty matches ignored."""
+        search = Search("a*", ["x"])
+        self.assertEqual(search.highlight("Kraam", "[", "]"), "Kr[aa]m")
+        self.assertEqual(search.highlight("Zeugs", "[", "]"), "Zeugs")
+
+
+class TestEditorSearch(unittest.TestCase):
+    """Test /pattern, n and N on the editor."""
+
+    def test_search_keys(self) -> None:
+        """Enter jumps to the first match below the cursor, n and N move on."""
+        terminal = ReplayTerminal([])
+        set_term(terminal)
+        self.addCleanup(set_term, None)
+        e = Editor()
+        e.lines = list(LINES)
+        e.set_mode(Mode.command)
+        for key in chain(typed("/Qu.tsch"), pressed("KEY_ENTER")):
+            dispatch(e, ReplayTerminal([key]).inkey())
+        self.assertEqual(e.mode, Mode.command)
+        self.assertEqual(e.y + e.y_offset, 1)
+        while e.search and not e.search.done:
+            scan(e)
+        self.assertEqual(e.search.matches if e.search else None, [1, 3, 5])
+        dispatch(e, ReplayTerminal(["n"]).inkey())
+        self.assertEqual(e.y + e.y_offset, 3)
+        dispatch(e, ReplayTerminal(["N"]).inkey())
+        dispatch(e, ReplayTerminal(["N"]).inkey())
+        self.assertEqual(e.y + e.y_offset, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
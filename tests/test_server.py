@@ -0,0 +1,109 @@
+"""Unit tests for serving tippse to many sessions from one process."""  # noqa: INP001
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from termlib.sessions import SessionKeys, SessionOutput, SessionTerminal
+from termlib.terminal import echo, set_term
+from tipplib import text
+from tipplib.text import TextSource
+from bin.server_bench import TARGET
+from bin.tippse_server import TELNET_NOISE, TelnetInput, TippseServer
+
+LINES = ["Humbug Käse", "Quatsch Kram", "Zeugs Tinnef"]
+
+
+class TestSessionTerminal(unittest.TestCase):
+    """Test the terminal shared by all sessions."""
+
+    def tearDown(self) -> None:
+        """Create the shared terminal lazily again."""
+        set_term(None)
+
+    def test_output_goes_to_the_session(self) -> None:
+        """Echo writes to the output of the session in the with block, flushing doesn't send it."""
+        terminal = SessionTerminal()
+        set_term(terminal)
+        a, b = SessionOutput(), SessionOutput()
+        with terminal.session(a):
+            echo("Humbug")
+            with terminal.session(b):
+                echo("Käse")
+            echo("!")
+        echo("nowhere")
+        self.assertEqual((a.take(), b.take(), a.take()), (b"Humbug!", "Käse".encode(), b""))
+        self.assertEqual(terminal.current.take(), b"")  # not kept either
+        self.assertEqual(a.flushes, 2)
+
+    def test_keys_across_reads(self) -> None:
+        """Keys are split from what is read, a character cut in two is put together."""
+        keys = SessionKeys(SessionTerminal())
+        umlaut = "ä".encode()
+        first = keys.feed(b"K\x1b[D\x7f" + umlaut[:1])
+        self.assertEqual([str(key) for key in first], ["K", "\x1b[D", "\x7f"])
+        self.assertEqual([first[1].name, first[2].name], ["KEY_LEFT", "KEY_BACKSPACE"])
+        self.assertEqual([str(key) for key in keys.feed(umlaut[1:] + b"se")], ["ä", "s", "e"])
+
+    def test_telnet_noise(self) -> None:
+        """Telnet commands and what telnet makes of Enter are dropped."""
+        self.assertEqual(TELNET_NOISE.sub(b"", b"\xff\xfd\x01K\xff\xfa\x1f\x00\x50\xff\xf0\xe4\r\x00"), b"K\xe4\r")
+
+    def test_telnet_across_reads(self) -> None:
+        """A telnet command cut off at the end of a read is dropped as a whole with the next one."""
+        data = b"\xff\xfd\x01K\xff\xfa\x1f\x00\x50\xff\xf0\xe4\r\x00Q\xff\xff"
+        for cut in range(1, len(data)):
+            with self.subTest(cut=cut):
+                telnet = TelnetInput()
+                self.assertEqual(telnet.feed(data[:cut]) + telnet.feed(data[cut:]), b"K\xe4\rQ")
+
+
+class TestTippseServer(unittest.TestCase):
+    """Test sessions of the server over a Unix socket."""
+
+    def setUp(self) -> None:
+        """Serve a text of a few lines."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        path = self.dir / "server.md"
+        path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+        text.DATAFILE, TextSource._instance = path, None  # noqa: SLF001
+        self.addCleanup(setattr, TextSource, "_instance", None)
+        self.addCleanup(setattr, text, "DATAFILE", None)
+        self.addCleanup(set_term, None)
+
+    def test_sessions(self) -> None:
+        """Two users type their own words at once, each sees only their own session."""
+        server = TippseServer()
+        sock = self.dir / "tippse.sock"
+
+        async def user(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> tuple[list[str], bytes]:
+            seen = await reader.read(65536)
+            targets = []
+            while len(targets) < 3:  # noqa: PLR2004
+                while not TARGET.search(seen):
+                    seen += await reader.read(65536)
+                targets.append(TARGET.findall(seen)[-1].decode())
+                for char in targets[-1] + " ":
+                    writer.write(char.encode())
+                    seen = await reader.read(65536)
+            writer.write(b"\x03")
+            await writer.drain()
+            return targets, await reader.read()
+
+        async def run() -> list[tuple[list[str], bytes]]:
+            listener = await asyncio.start_unix_server(server.serve, sock)
+            async with listener:
+                connections = [await asyncio.open_unix_connection(sock) for _ in range(2)]
+                return await asyncio.gather(*(user(*connection) for connection in connections))
+
+        results = asyncio.run(run())
+        for targets, last in results:
+            # a line, then the next one
+            y = LINES.index(" ".join(targets[:2]))
+            self.assertEqual(targets[2], LINES[(y + 1) % len(LINES)].split()[0])
+            self.assertIn(b"\x1b[?1049l", last)  # left the fullscreen
+        self.assertEqual(server.sessions, 2)
+        self.assertEqual(server.keys, sum(len(" ".join(targets)) + 2 for targets, _ in results))
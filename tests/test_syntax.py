@@ -0,0 +1,77 @@
+"""Unit tests for the syntax highlighting of mini-vi."""  # noqa: INP001
+
+import unittest
+
+from pyvilib.syntax import Highlighter, PythonLexer, lexer_for
+from pyvilib.undo import Op
+
+
+class TestPythonLexer(unittest.TestCase):
+    """Test tokens and states of the Python lexer."""
+
+    def test_tokens(self) -> None:
+        """Keywords, strings, numbers and comments are found, other names are not."""
+        tokens, state = PythonLexer().tokens("if x == 'a#': return 42  # done", "")
+        self.assertEqual(
+            tokens,
+            ((0, 2, "keyword"), (8, 12, "string"), (14, 20, "keyword"), (21, 23, "number"), (25, 31, "comment")),
+        )
+        self.assertEqual(state, "")
+
+    def test_triple_quotes(self) -> None:
+        """An open triple quoted string carries over to the next lines."""
+        lexer = PythonLexer()
+        self.assertEqual(lexer.tokens('x = """Humbug', ""), (((4, 13, "string"),), '"""'))
+        self.assertEqual(lexer.end_state("Quatsch", '"""'), '"""')
+        self.assertEqual(lexer.tokens('Kram""" if', '"""'), (((0, 7, "string"), (8, 10, "keyword")), ""))
+
+    def test_lexer_for(self) -> None:
+        """Lexers are picked by file suffix."""
+        self.assertIsInstance(lexer_for("minivi.py"), PythonLexer)
+        self.assertIsNone(lexer_for("werther.md"))
+
+
+class TestHighlighter(unittest.TestCase):
+    """Test the cached states and tokens."""
+
+    def setUp(self) -> None:
+        """Make a highlighter for a long file."""
+        self.lines = [f"x = {i}  # Zeile {i}" for i in range(10_000)]
+        self.hl = Highlighter(PythonLexer(), self.lines)
+
+    def test_only_needed_lines(self) -> None:
+        """Tokens are computed for the requested lines only, states up to them."""
+        self.hl.render(20, {"number": "<", "comment": "["}, ">")
+        self.assertEqual(len(self.hl.states), 21)
+        self.assertEqual(self.hl.tokens.cache_info().currsize, 1)
+
+    def test_edit_relexes_little(self) -> None:
+        """An edit not changing the state lexes just one line again."""
+        self.hl.state_of(9_999)
+        self.lines[5] = "y" + self.lines[5]
+        self.hl.edited(Op("insert", 5, 0, "y"))
+        self.assertEqual(self.hl.relexed, 1)
+
+    def test_edit_changing_state(self) -> None:
+        """Opening a triple quote changes the following states, up to a limit."""
+        self.hl.state_of(9_999)
+        self.lines[5] = '"""' + self.lines[5]
+        self.hl.edited(Op("insert", 5, 0, '"""'))
+        self.assertEqual(self.hl.states[6], '"""')
+        self.assertLess(len(self.hl.states), 1_000)
+        self.assertEqual(self.hl.state_of(9_999), '"""')
+
+    def test_split_and_join(self) -> None:
+        """States follow lines being split and joined."""
+        self.lines[:3] = ["a = '''", "Humbug", "''' + b"]
+        self.hl.state_of(5)
+        self.lines[1:2] = ["Hum", "bug"]
+        self.hl.edited(Op("split", 1, 3))
+        self.assertEqual(self.hl.states[:5], ["", "'''", "'''", "'''", ""])
+        self.lines[0:2] = ["a = '''Hum"]
+        self.hl.edited(Op("join", 0, 7))
+        self.assertEqual(self.hl.states[:4], ["", "'''", "'''", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
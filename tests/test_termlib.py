@@ -0,0 +1,181 @@
+"""Unit tests for termlib."""  # noqa: INP001
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import termlib
+from termlib.width import MAX_LINES, _columns, column, fit, index_at, width
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+class TestLazyTerminal(unittest.TestCase):
+    """Test the lazily created, shared terminal."""
+
+    def tearDown(self) -> None:
+        """Drop any terminal set by a test."""
+        termlib.set_term(None)
+
+    def test_imports_do_not_create_terminal(self) -> None:
+        """Importing the packages and entry points must neither create a Terminal nor import blessed."""
+        code = (
+            "import sys, termlib, fun, pyvilib, tipplib, bin.maschinenschreiben, bin.like_vi_but; "
+            "assert not termlib.is_created(); assert 'blessed' not in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=SRC, check=True)  # noqa: S603
+
+    def test_term_is_shared(self) -> None:
+        """All packages forward to the same terminal."""
+        from fun import tput  # noqa: PLC0415
+        from pyvilib import editor  # noqa: PLC0415
+        import tipplib  # noqa: PLC0415
+
+        self.assertIs(tput.term, termlib.term)
+        self.assertIs(editor.term, termlib.term)
+        self.assertIs(tipplib.term, termlib.term)
+        self.assertIs(termlib.get_term(), termlib.get_term())
+
+    def test_set_term_runs_reset_hooks(self) -> None:
+        """Replacing the terminal notifies registered hooks and forwards to the new one."""
+        calls = []
+        termlib.on_reset(lambda: calls.append(1))
+        sentinel = type("FakeTerminal", (), {"height": 42})()
+        termlib.set_term(sentinel)  # type: ignore[arg-type]
+        self.assertEqual(calls, [1])
+        self.assertEqual(termlib.term.height, 42)
+
+
+class TestEscapeTable(unittest.TestCase):
+    """Test the memoized escape sequences."""
+
+    def setUp(self) -> None:
+        """Use a styling terminal, independent of the test runner's stdout."""
+        from blessed import Terminal  # noqa: PLC0415
+
+        self.terminal = Terminal(kind="xterm-256color", stream=io.StringIO(), force_styling=True)
+        termlib.set_term(self.terminal)
+
+    def tearDown(self) -> None:
+        """Drop the terminal set by the test."""
+        termlib.set_term(None)
+
+    def test_same_sequences_as_blessed(self) -> None:
+        """The table hands out exactly what blessed would."""
+        esc = termlib.esc
+        self.assertEqual(esc.move_yx(3, 7), self.terminal.move_yx(3, 7))
+        self.assertEqual(esc.color(88), self.terminal.color(88))
+        self.assertEqual(esc.color_hex("#880000"), self.terminal.color_hex("#880000"))
+        self.assertEqual(esc.normal, self.terminal.normal)
+        self.assertEqual(esc.clear_eol, self.terminal.clear_eol)
+        self.assertIs(type(esc.normal), str)
+
+    def test_moves_are_bounded(self) -> None:
+        """The memo for cursor moves never grows beyond MAX_MOVES."""
+        esc = termlib.esc
+        with patch("termlib.escapes.MAX_MOVES", 10):
+            for x in range(25):
+                esc.move_yx(0, x)
+            self.assertLessEqual(len(esc._moves), 10)  # noqa: SLF001
+
+    def test_reset_on_new_terminal(self) -> None:
+        """Replacing the terminal drops all cached sequences."""
+        esc = termlib.esc
+        self.assertNotEqual(esc.normal, "")
+        termlib.set_term(type("Dumb", (), {"normal": ""})())  # type: ignore[arg-type]
+        self.assertEqual(esc.normal, "")
+
+
+class TestWidth(unittest.TestCase):
+    """Test the display width of text."""
+
+    def test_width(self) -> None:
+        """ASCII and Umlaute take a column per character, CJK and emoji two, combining marks none."""
+        self.assertEqual([width(s) for s in ("Käse", "日本語", "a😀b", "e\u0301", "")], [4, 6, 4, 1, 0])
+
+    def test_columns_of_a_line(self) -> None:
+        """Column, fit and index_at agree for a line with wide characters."""
+        line = "ab日本c"
+        self.assertEqual([column(line, x) for x in range(7)], [0, 1, 2, 4, 6, 7, 7])
+        self.assertEqual([fit(line, 2, n) for n in range(6)], [2, 2, 3, 3, 4, 5])
+        self.assertEqual([index_at(line, col) for col in range(8)], [0, 1, 2, 3, 3, 4, 4, 5])
+        self.assertEqual((column("Humbug", 3), fit("Humbug", 2, 10), index_at("Humbug", 9)), (3, 6, 6))
+
+    def test_caches_are_bounded(self) -> None:
+        """Only the last MAX_LINES lines keep their columns."""
+        for i in range(MAX_LINES + 10):
+            column(f"Käse {i}", 2)
+        self.assertEqual(_columns.cache_info().currsize, MAX_LINES)
+
+
+class TestTrace(unittest.TestCase):
+    """Test the opt-in tracing."""
+
+    def test_disabled_is_free(self) -> None:
+        """Without FPS_TRACE, nothing gets wrapped."""
+        from termlib import trace  # noqa: PLC0415
+
+        def func() -> None:
+            pass
+
+        if trace.enabled:
+            self.skipTest("tests run with FPS_TRACE set")
+        self.assertIs(trace.traced()(func), func)
+        self.assertIs(trace.wrap(func, "func", key="x"), func)
+        self.assertIs(trace.span("a"), trace.span("b"))
+
+    def test_chrome_trace_of_replayed_keys(self) -> None:
+        """A traced, replayed editor session writes spans with key, mode and handler."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "trace.json"
+            code = (
+                "from itertools import chain\n"
+                "from termlib.replay import pressed, replay, typed\n"
+                "from pyvilib.minivi import mini_vi\n"
+                "replay(lambda: mini_vi(['pyvian']), chain(typed('ab\\ncd'), pressed('KEY_LEFT')))\n"
+            )
+            env = dict(os.environ, FPS_TRACE=str(path))
+            subprocess.run([sys.executable, "-c", code], cwd=SRC, env=env, check=True, capture_output=True)  # noqa: S603
+            events = json.loads(path.read_text())["traceEvents"]
+            handled = [e for e in events if e["name"] == "execute_handler"]
+            self.assertIn(
+                {"key": "KEY_ENTER", "mode": "INSERT", "handler": "key_enter__insert"},
+                [e["args"] for e in handled],
+            )
+            # a handler for all modes gets the mode the editor is in
+            self.assertIn({"key": "KEY_LEFT", "mode": "INSERT", "handler": "key_left"}, [e["args"] for e in handled])
+            self.assertTrue(any(e["name"] == "Editor.echo_lines_from" for e in events))
+            self.assertIn("key_enter__insert", path.with_suffix(".txt").read_text())
+
+
+class TestProfiling(unittest.TestCase):
+    """Test the --profile support."""
+
+    def test_split_profile_flag(self) -> None:
+        """The flag is removed from argv, other arguments stay in order."""
+        from termlib.profiling import split_profile_flag  # noqa: PLC0415
+
+        self.assertEqual(split_profile_flag(["pyvian", "a.txt"]), (["pyvian", "a.txt"], None))
+        self.assertEqual(split_profile_flag(["pyvian", "--profile", "a.txt"]), (["pyvian", "a.txt"], "cpu"))
+        self.assertEqual(split_profile_flag(["tippse", "--profile=mem"]), (["tippse"], "mem"))
+        with self.assertRaises(SystemExit):
+            split_profile_flag(["tippse", "--profile=gpu"])
+
+    def test_run_profiled(self) -> None:
+        """A profiled run returns the result and leaves collapsed stacks and an allocation report."""
+        from termlib.profiling import run_profiled  # noqa: PLC0415
+
+        def busy() -> int:
+            return sum(len(str(i)) for i in range(30_000))
+
+        with tempfile.TemporaryDirectory() as tmp, patch("sys.stderr", io.StringIO()):
+            self.assertEqual(run_profiled(busy, "test", "mem", Path(tmp)), busy())
+            folded = next(Path(tmp).glob("test-*.folded")).read_text()
+            self.assertIn("busy (test_termlib.py:", folded)
+            self.assertTrue(next(Path(tmp).glob("test-*.alloc.txt")).read_text().startswith("peak:"))
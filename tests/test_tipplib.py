@@ -1,8 +1,23 @@
 """Unit tests for tipplib."""
 
+import random
+import tempfile
 import unittest
+from array import array
+from itertools import pairwise
+from pathlib import Path
 from unittest.mock import MagicMock, patch
+from termlib.replay import KEYS, replay, typed
+from tipplib import charindex, keylog, mapped, ngram
+from tipplib.adaptive import AdaptiveWords
+from tipplib.alias import AliasTable
+from tipplib.charindex import CharIndex
+from tipplib.keylog import KeyLog, KeyReport, read_log
+from tipplib.layout import layout
+from tipplib.mapped import MappedLines, index_path
+from tipplib.ngram import NgramModel, model_path
 from tipplib.text import TextSource
+from tipplib.worditor import Worditor, WorditorResult
 
 
 class TestTextSource(unittest.TestCase):
@@ -16,31 +31,35 @@ class TestTextSource(unittest.TestCase):
         """Reset the singleton after each test."""
         TextSource._instance = None
 
+    def datafile(self, text: str) -> Path:
+        """Return a temporary file with the text."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / "text.md"
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    @patch("tipplib.text.MappedLines")
     @patch("tipplib.text.DATAFILE")
-    def test_singleton_behavior(self, mock_datafile: MagicMock) -> None:
+    def test_singleton_behavior(self, mock_datafile: MagicMock, mock_mapped: MagicMock) -> None:
         """Test that TextSource is a singleton."""
         mock_datafile.exists.return_value = True
-        mock_datafile.read_text.return_value = "Line 1"
+        mock_mapped.return_value = ["Line 1"]
 
         ts1 = TextSource()
         ts2 = TextSource()
 
         self.assertIs(ts1, ts2)
         self.assertTrue(ts1._initialized)
-        # Ensure __init__ logic ran only once (loading file)
-        # _load_from_file calls read_text. Check call count?
-        # But mocking DATAFILE for both instances means we can check calls against the mock.
-        # Since _initialized prevents re-running __init__, we expect 1 call to read_text if both are initialized sequentially.
-        mock_datafile.read_text.assert_called_once()
+        # Ensure __init__ logic ran only once (mapping the file)
+        # Since _initialized prevents re-running __init__, we expect 1 call if both are initialized sequentially.
+        mock_mapped.assert_called_once_with(mock_datafile)
 
-    @patch("tipplib.text.DATAFILE")
-    def test_load_success(self, mock_datafile: MagicMock) -> None:
+    def test_load_success(self) -> None:
         """Test loading lines from a file successfully."""
-        mock_datafile.exists.return_value = True
-        mock_datafile.read_text.return_value = "  Line 1  \n\nLine 2\n"
-
-        ts = TextSource()
-        self.assertEqual(ts._lines, ["Line 1", "Line 2"])
+        with patch("tipplib.text.DATAFILE", self.datafile("  Line 1  \n\nLine 2\n")):
+            ts = TextSource()
+        self.assertEqual(list(ts._lines), ["Line 1", "Line 2"])
 
     @patch("tipplib.text.DATAFILE")
     def test_load_file_missing(self, mock_datafile: MagicMock) -> None:
@@ -50,34 +69,29 @@ class TestTextSource(unittest.TestCase):
         ts = TextSource()
         self.assertEqual(ts._lines, ["Dies ist ein Platzhaltertext.", "Die Datei konnte nicht geladen werden."])
 
+    @patch("tipplib.text.MappedLines")
     @patch("tipplib.text.DATAFILE")
-    def test_load_error(self, mock_datafile: MagicMock) -> None:
+    def test_load_error(self, mock_datafile: MagicMock, mock_mapped: MagicMock) -> None:
         """Test error handling during file load."""
         mock_datafile.exists.return_value = True
-        mock_datafile.read_text.side_effect = Exception("Disk error")
+        mock_mapped.side_effect = Exception("Disk error")
 
         ts = TextSource()
         self.assertTrue(ts._lines[0].startswith("Error loading file"))
 
-    @patch("tipplib.text.DATAFILE")
-    def test_get_line(self, mock_datafile: MagicMock) -> None:
+    def test_get_line(self) -> None:
         """Test getting a random line."""
-        mock_datafile.exists.return_value = True
-        mock_datafile.read_text.return_value = "Line 1\nLine 2"
-
-        ts = TextSource()
+        with patch("tipplib.text.DATAFILE", self.datafile("Line 1\nLine 2")):
+            ts = TextSource()
         line = ts.get_line()
         self.assertIn(line, ["Line 1", "Line 2"])
         # Check that index was updated
         self.assertNotEqual(ts._current_index, -1)
 
-    @patch("tipplib.text.DATAFILE")
-    def test_get_next_line_cycling(self, mock_datafile: MagicMock) -> None:
+    def test_get_next_line_cycling(self) -> None:
         """Test cycling through lines with get_next_line."""
-        mock_datafile.exists.return_value = True
-        mock_datafile.read_text.return_value = "Line 1\nLine 2"
-
-        ts = TextSource()
+        with patch("tipplib.text.DATAFILE", self.datafile("Line 1\nLine 2")):
+            ts = TextSource()
 
         # Manually set index to verify sequence from a known state
         # Or just rely on get_line initializing it
@@ -94,3 +108,371 @@ class TestTextSource(unittest.TestCase):
         self.assertEqual(ts.get_next_line(), "B")
         self.assertEqual(ts.get_next_line(), "C")
         self.assertEqual(ts.get_next_line(), "A")  # Wraps around
+
+
+class TestMappedLines(unittest.TestCase):
+    """Test the memory-mapped lines and their cached index."""
+
+    def setUp(self) -> None:
+        """Write a text with empty, blank and indented lines."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "werther.md"
+        self.lines = [f"{i} Humbug" if i % 3 else "   " for i in range(1000)]
+        self.path.write_text("\n".join(self.lines) + "\r\n\n  Quatsch mit Soße  ", encoding="utf-8")
+        self.expected = [line.strip() for line in self.lines if line.strip()] + ["Quatsch mit Soße"]
+
+    def test_lines(self) -> None:
+        """The non-empty lines, stripped, also across chunks."""
+        with patch.object(mapped, "CHUNK", 100):
+            lines = MappedLines(self.path)
+        self.assertEqual(list(lines), self.expected)
+        self.assertEqual(lines[-1], "Quatsch mit Soße")
+        self.assertEqual(lines[3:5], self.expected[3:5])
+
+    def test_cached_index(self) -> None:
+        """The index is written next to the file, used next time and built again if the file changes."""
+        self.assertFalse(MappedLines(self.path).index_mapped)
+        self.assertTrue(index_path(self.path).exists())
+        lines = MappedLines(self.path)
+        self.assertTrue(lines.index_mapped)
+        self.assertEqual(list(lines), self.expected)
+
+        self.path.write_text("Kram\n\nZeugs\n", encoding="utf-8")
+        lines = MappedLines(self.path)
+        self.assertFalse(lines.index_mapped)
+        self.assertEqual(list(lines), ["Kram", "Zeugs"])
+
+    def test_no_cache(self) -> None:
+        """Without a writable cache the index is kept in memory."""
+        with patch.object(Path, "replace", side_effect=PermissionError):
+            lines = MappedLines(self.path)
+        self.assertEqual(list(lines), self.expected)
+        self.assertEqual(list(self.path.parent.iterdir()), [self.path])  # no index, no temporary file left
+
+    def test_empty(self) -> None:
+        """An empty file has no lines."""
+        self.path.write_bytes(b"")
+        self.assertEqual(len(MappedLines(self.path)), 0)
+
+    def test_like_splitlines(self) -> None:
+        """Lines are split and stripped like str.splitlines() and str.strip() do it."""
+        texts = [
+            "eins\n \u3000\nzwei\r\n\u00a0Käse\u00a0\fdrei\u2028\x1c\rvier\rfünf\x85sechs\r\n\x1f",
+            "eins\n\u00a0\u3000\n\x1f\nzwei\u2009\n",  # no other separators than newlines
+        ]
+        for text in texts:
+            with self.subTest(text=text):
+                self.path.write_text(text, encoding="utf-8", newline="")
+                expected = [line.strip() for line in text.splitlines() if line.strip()]
+                self.assertEqual(list(MappedLines(self.path)), expected)
+        self.assertEqual(expected, ["eins", "zwei"])
+
+
+class TestCharIndex(unittest.TestCase):
+    """Test picking lines by the characters and bigrams they contain."""
+
+    def setUp(self) -> None:
+        """Write a text with some Umlaute and punctuation."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "werther.md"
+        self.path.write_text(
+            "Wie froh bin ich, dass ich weg bin!\nBester Freund\n\nwas ist das Herz des Menschen?\n"
+            "Ich will mich bessern, will nicht mehr\nein bisschen Übel wiederkäuen.\nSo fühlt die Mutter.\n",
+            encoding="utf-8",
+        )
+        self.lines = MappedLines(self.path)
+
+    def test_keys(self) -> None:
+        """Only characters other than ASCII letters, digits and space, and their bigrams are indexed."""
+        self.assertEqual(charindex.drill_keys("Übel, käuen"), {"Ü", "Üb", ",", "l,", ", ", "ä", "kä", "äu"})
+        index = CharIndex.build(self.lines)
+        self.assertEqual(index.count(","), 2)
+        self.assertEqual(index.count("e"), 0)
+
+    def test_random_line(self) -> None:
+        """Every line with any of the keys is picked, equally often, and no other."""
+        index = CharIndex.build(self.lines)
+        rnd = random.Random(1774)
+        picks = [index.random_line(self.lines, ["ä", "ü", ","], rnd) for _ in range(3000)]
+        self.assertEqual(sorted(set(picks)), [0, 3, 4, 5])
+        for y in (0, 3, 4, 5):
+            self.assertAlmostEqual(picks.count(y) / 3000, 0.25, delta=0.04)
+        self.assertEqual(index.random_line(self.lines, ["n!"], rnd), 0)
+        self.assertIsNone(index.random_line(self.lines, ["ß"], rnd))
+        # not indexed, found by trying
+        self.assertEqual(index.random_line(self.lines, ["Freund"], rnd), 1)
+        self.assertIsNone(index.random_line(self.lines, ["Lotte"], rnd))
+
+    def test_cache(self) -> None:
+        """The index is cached next to the file and mapped from there, until the file changes."""
+        index = CharIndex.for_lines(self.lines)
+        self.assertFalse(index.mapped)
+        self.assertTrue(charindex.index_path(self.path).exists())
+        cached = CharIndex.for_lines(self.lines)
+        self.assertTrue(cached.mapped)
+        self.assertEqual(
+            {k: list(v) for k, v in cached.postings.items()},
+            {k: list(v) for k, v in index.postings.items()},
+        )
+
+        self.path.write_text("Süße Qual\n", encoding="utf-8")
+        index = CharIndex.for_lines(MappedLines(self.path))
+        self.assertFalse(index.mapped)
+        self.assertEqual(list(index.postings["ß"]), [0])
+
+    def test_text_source(self) -> None:
+        """TextSource picks drill lines, and any line if there is no match."""
+        with patch("tipplib.text.DATAFILE", self.path), patch.object(TextSource, "_instance", None):
+            ts = TextSource()
+            line = ts.get_line_with("äöü")
+            self.assertIn(line, ["ein bisschen Übel wiederkäuen.", "So fühlt die Mutter."])
+            self.assertEqual(ts.current_line, line)
+            self.assertIn(ts.get_line_with("ß"), list(self.lines))
+
+
+class TestAliasTable(unittest.TestCase):
+    """Test weighted picks, and changing the weights."""
+
+    def assert_picks(self, table: AliasTable, weights: list[float]) -> None:
+        """Items are picked in proportion to their weights."""
+        rnd = random.Random(1774)
+        picks = [table.pick(rnd) for _ in range(20000)]
+        for i, w in enumerate(weights):
+            self.assertAlmostEqual(picks.count(i) / 20000, w / sum(weights), delta=0.015)
+
+    def test_pick(self) -> None:
+        """Items with weight 0 are never picked, the others by weight, in any number of blocks."""
+        weights = [1.0, 0.0, 3.0, 6.0, 0.0, 10.0]
+        for block in (1, 2, 4, None):
+            with self.subTest(block=block):
+                self.assert_picks(AliasTable(weights, block=block), weights)
+        with self.assertRaises(ValueError):
+            AliasTable([0.0, 0.0]).pick()
+        with self.assertRaises(ValueError):
+            AliasTable([1.0, -1.0])
+
+    def test_update(self) -> None:
+        """Changed and appended weights are picked by their new weight."""
+        weights = [1.0, 0.0, 3.0, 6.0, 0.0, 10.0]
+        table = AliasTable(weights, block=2)
+        table[1] = weights[1] = 20.0
+        table.update({0: 0.0, 5: 5.0})
+        weights[0], weights[5] = 0.0, 5.0
+        self.assertEqual(table.append(20.0), 6)
+        weights.append(20.0)
+        self.assertEqual((len(table), table[1], table.total), (7, 20.0, sum(weights)))
+        self.assert_picks(table, weights)
+
+
+class TestAdaptiveWords(unittest.TestCase):
+    """Test that mistyped and slow words come up more often."""
+
+    WIDTH = 30
+
+    def test_weights(self) -> None:
+        """Errors and slowness raise the weight of a word, good results bring it down again."""
+        words = AdaptiveWords.from_lines(["Humbug Quatsch Kram", "Kram Zeugs"])
+        self.assertEqual(words.words, ["Humbug", "Quatsch", "Kram", "Zeugs"])
+        for _ in range(5):
+            words.record(WorditorResult("Kram", "Kram", success=True, leave=False), 1.0)
+        words.record(WorditorResult("Humbug", "Humbgu", success=False, leave=False), 1.4)
+        words.record(WorditorResult("Zeugs", "Zeugs", success=True, leave=False), 6.0)
+        words.record(WorditorResult("Quatsch", "", success=False, leave=True), 60.0)
+        self.assertEqual(words.weight("Kram"), 1.0)
+        self.assertEqual(words.weight("Quatsch"), 1.0)
+        self.assertGreater(words.weight("Humbug"), 3.0)
+        self.assertGreater(words.weight("Zeugs"), 2.0)
+        self.assertEqual([words.table[i] for i in range(4)], [words.weight(w) for w in words.words])
+
+        humbug = words.weight("Humbug")
+        words.record(WorditorResult("Humbug", "Humbug", success=True, leave=False), 1.4)
+        self.assertLess(words.weight("Humbug"), humbug)
+        words.record(WorditorResult("Firlefanz", "Firlefanz", success=False, leave=False), 2.0)
+        self.assertEqual(words.words[-1], "Firlefanz")
+        self.assertEqual(words.table[4], words.weight("Firlefanz"))
+
+    def test_line(self) -> None:
+        """Lines are made of words drawn by weight and fit the width."""
+        words = AdaptiveWords(["Humbug", "Quatsch", "Kram"])
+        for _ in range(3):
+            words.record(WorditorResult("Kram", "Karm", success=False, leave=False), 1.0)
+        rnd = random.Random(4711)
+        lines = [words.line(self.WIDTH, rnd) for _ in range(300)]
+        self.assertTrue(all(1 <= len(" ".join(line)) <= self.WIDTH for line in lines))
+        picked = [word for line in lines for word in line]
+        self.assertGreater(picked.count("Kram"), 2 * picked.count("Humbug"))
+        self.assertEqual(AdaptiveWords([]).line(), [])
+
+
+class TestNgramModel(unittest.TestCase):
+    """Test the n-gram model, its cache and the text made up from it."""
+
+    TEXT = "Wie froh bin ich, dass ich weg bin!\nBester Freund, was ist das Herz des Menschen!\n"
+
+    def setUp(self) -> None:
+        """Write a short text."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "werther.md"
+        self.path.write_text(self.TEXT, encoding="utf-8")
+
+    def test_build(self) -> None:
+        """Every context has its successors with their counts, and knows the context they lead to."""
+        model = NgramModel.build(["ich weg ich", "bin ich weg"], order=1)
+        self.assertEqual([model.token(i) for i in range(len(model.ends))], ["ich", "weg", "bin"])
+        # ich: weg twice, bin once; weg: ich; bin: ich
+        self.assertEqual(list(model.starts), [0, 2, 3, 4])
+        self.assertEqual(list(model.tokens), [1, 2, 0, 0])
+        self.assertEqual(list(model.counts), [2, 3, 1, 1])
+        self.assertEqual(list(model.targets), [1, 2, 0, 0])
+        # nothing follows "bin", the text ends there
+        self.assertEqual(list(NgramModel.build(["ich weg bin"], order=1).targets), [1, ngram.NONE])
+        with self.assertRaises(ValueError):
+            NgramModel.build(["a"], order=0)
+
+    def test_generate(self) -> None:
+        """Generated words only follow words they follow in the text, lines fit the width."""
+        words = self.TEXT.split()
+        bigrams = set(pairwise(words))
+        model = NgramModel.build(self.TEXT.splitlines(), order=1)
+        rnd = random.Random(1774)
+        for _ in range(50):
+            line = model.line(30, rnd).split()
+            self.assertLessEqual(len(" ".join(line)), 30)
+            for first, second in pairwise(line):
+                if first != words[-1]:  # after the end of the text, anything may come
+                    self.assertIn((first, second), bigrams)
+        chars = NgramModel.build(self.TEXT.splitlines(), order=3, chars=True)
+        self.assertTrue(chars.line(70, rnd))
+        self.assertEqual(NgramModel.build(["Humbug"], order=2).line(), "")
+
+    def test_cache(self) -> None:
+        """The model is cached next to the file and mapped from there, until the file changes."""
+        model = NgramModel.for_lines(MappedLines(self.path))
+        self.assertFalse(model.mapped)
+        cached = NgramModel.for_lines(MappedLines(self.path))
+        self.assertTrue(cached.mapped)
+        for table in ("ends", "starts", "tokens", "counts", "targets"):
+            self.assertEqual(list(getattr(cached, table)), list(getattr(model, table)))
+        self.assertEqual(bytes(cached.blob), model.blob)
+        self.assertFalse(NgramModel.for_lines(MappedLines(self.path), 1).mapped)
+
+        cache = model_path(self.path, 2, chars=False)
+        cache.write_bytes(cache.read_bytes()[:-1])
+        st = self.path.stat()
+        self.assertIsNone(NgramModel.load(cache, st.st_size, st.st_mtime_ns))
+        self.path.write_text("Süße Qual, süße Not.\n", encoding="utf-8")
+        self.assertFalse(NgramModel.for_lines(MappedLines(self.path)).mapped)
+
+    def test_text_source(self) -> None:
+        """TextSource makes up lines from the text, or hands out a line of it if it is too short."""
+        with patch("tipplib.text.DATAFILE", self.path), patch.object(TextSource, "_instance", None):
+            self.assertTrue(set(TextSource().get_generated_line().split()) <= set(self.TEXT.split()))
+        self.path.write_text("Humbug\n", encoding="utf-8")
+        with patch("tipplib.text.DATAFILE", self.path), patch.object(TextSource, "_instance", None):
+            self.assertEqual(TextSource().get_generated_line(), "Humbug")
+
+
+class TestKeyLog(unittest.TestCase):
+    """Test logging keystrokes and the reports on them."""
+
+    def setUp(self) -> None:
+        """Use a log in a temporary directory."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "tippse.keys"
+
+    def test_log(self) -> None:
+        """Sessions are appended in blocks, a block cut short is dropped."""
+        kl = KeyLog(self.path)
+        for key in "Käse":
+            kl.record(ord(key))
+        kl.flush()
+        self.assertEqual(len(kl.keys), 0)
+        keys, end = read_log(self.path)
+        self.assertEqual([code >> 40 for code in keys], [ord(c) for c in "Käse"])
+        self.assertEqual(keys[0] & 0xFFFFFFFF, keylog.NO_GAP)
+        self.assertLess(keys[1] & 0xFFFFFFFF, 1000)
+        self.assertEqual(end, self.path.stat().st_size)
+
+        with self.path.open("ab") as f:
+            f.write(keylog.BLOCK.pack(keylog.BLOCK_MAGIC, 10, 0) + bytes(8))  # killed while writing
+        self.assertEqual(len(read_log(self.path)[0]), 4)
+        kl = KeyLog(self.path)
+        kl.record(ord(" "), keylog.WORD)
+        kl.flush()
+        keys, end = read_log(self.path)
+        self.assertEqual([code >> 32 for code in keys][-2:], [ord("e") << 8, ord(" ") << 8 | keylog.WORD])
+        self.assertEqual(read_log(self.path, end), (array("Q"), end))
+
+    def test_report(self) -> None:
+        """Speed, accuracy and latency come from the gaps and flags, breaks don't count."""
+        gaps = [keylog.NO_GAP, 200, 300, 9000, 100, 200]
+        flags = [0, keylog.MISS, 0, 0, keylog.EDIT, keylog.WORD | keylog.WRONG]
+        keys = [ord(c) for c in "Kxs"] + [keylog.NAMED + 263, ord("e"), ord(" ")]
+        report = KeyReport.from_keys(k << 40 | f << 32 | g for k, f, g in zip(keys, flags, gaps, strict=True))
+        self.assertEqual((report.keys, report.chars, report.misses, report.words, report.wrong_words), (6, 5, 1, 1, 1))
+        self.assertEqual(report.seconds, 0.8)
+        self.assertEqual(report.accuracy, 0.8)
+        self.assertEqual(report.wpm, 5 / 5 / (0.8 / 60))
+        self.assertEqual(report.latency["x"], (1, 200.0, 200.0))
+        self.assertEqual(report.latency["e"], (1, 100.0, 100.0))
+        self.assertNotIn("K", report.latency)  # first key
+        self.assertNotIn("KEY_BACKSPACE", report.latency)  # after a break
+        self.assertIn("WPM", report.format())
+
+    def test_counts_cache(self) -> None:
+        """The counts are cached, only new blocks are counted, a new log starts over."""
+        kl = KeyLog(self.path)
+        for key in "Humbug":
+            kl.record(ord(key))
+        kl.flush()
+        self.assertEqual(KeyReport.from_log(self.path).keys, 6)
+        self.assertTrue(keylog.counts_path(self.path).exists())
+        counted = self.path.stat().st_size
+        for key in "Kram":
+            kl.record(ord(key))
+        kl.flush()
+        with patch.object(keylog, "read_log", wraps=keylog.read_log) as read:
+            self.assertEqual(KeyReport.from_log(self.path).keys, 10)
+        read.assert_called_once_with(self.path, counted)
+
+        self.path.unlink()
+        kl = KeyLog(self.path)
+        kl.record(ord("Q"))
+        kl.flush()
+        self.assertEqual(KeyReport.from_log(self.path).keys, 1)
+
+    def test_worditor(self) -> None:
+        """The Worditor logs every key with its flags."""
+        kl = KeyLog()
+
+        def run() -> None:
+            editor = Worditor(12, 4, "Käse", 5, 4)
+            editor.keylog = kl
+            editor.run()
+
+        replay(run, [*typed("Kx"), KEYS["KEY_BACKSPACE"], *typed("äse ")])
+        self.assertEqual(
+            [(keylog.key_name(code >> 40), code >> 32 & 0xFF) for code in kl.keys],
+            [("K", 0), ("x", keylog.MISS), ("KEY_BACKSPACE", keylog.EDIT), ("ä", 0), ("s", 0), ("e", 0),
+             (" ", keylog.WORD)],
+        )  # fmt: skip
+
+
+class TestLayout(unittest.TestCase):
+    """Test laying out the lines to type."""
+
+    def test_rows(self) -> None:
+        """Words that would reach the last column start a new row at x0."""
+        line = layout(("Humbug", "Käse", "Schnickschnack", "日本"), 4, 25)
+        self.assertEqual(line.rows, ("Humbug Käse", "Schnickschnack 日本"))
+        self.assertEqual(line.places, ((0, 4), (0, 11), (1, 4), (1, 19)))
+        self.assertIs(layout(line.words, 4, 25), line)
+        self.assertEqual(layout(line.words, 4, 80).rows, ("Humbug Käse Schnickschnack 日本",))
+
+    def test_word_wider_than_the_screen(self) -> None:
+        """A word too long for any row gets a row of its own."""
+        self.assertEqual(layout(("Kram", "Schnickschnack", "Kram"), 4, 12).rows, ("Kram", "Schnickschnack", "Kram"))
@@ -0,0 +1,101 @@
+"""Unit tests for the undo journal of mini-vi."""  # noqa: INP001
+
+import unittest
+from itertools import chain
+
+from termlib import set_term
+from termlib.replay import ReplayTerminal, pressed, typed
+from pyvilib.editor import Editor
+from pyvilib.minivi import dispatch
+from pyvilib.undo import Op, UndoJournal
+
+
+class TestUndoJournal(unittest.TestCase):
+    """Test recording and coalescing operations."""
+
+    def test_typing_is_coalesced(self) -> None:
+        """Characters typed one after the other become one operation."""
+        journal = UndoJournal()
+        for x, char in enumerate("Käse"):
+            journal.record(Op("insert", 0, x, char))
+        self.assertEqual(list(journal.undo_stack), [Op("insert", 0, 0, "Käse")])
+        self.assertEqual(journal.pop_undo(), Op("delete", 0, 0, "Käse"))
+
+    def test_backspace_is_coalesced(self) -> None:
+        """Deleting backwards merges in front of the deleted text."""
+        journal = UndoJournal()
+        journal.record(Op("delete", 0, 3, "e"))
+        journal.record(Op("delete", 0, 2, "s"))
+        self.assertEqual(list(journal.undo_stack), [Op("delete", 0, 2, "se")])
+
+    def test_break_run(self) -> None:
+        """After break_run, the next operation starts a new entry."""
+        journal = UndoJournal()
+        journal.record(Op("insert", 0, 0, "a"))
+        journal.break_run()
+        journal.record(Op("insert", 0, 1, "b"))
+        self.assertEqual(len(journal.undo_stack), 2)
+
+    def test_memory_cap(self) -> None:
+        """The oldest entries are evicted when the journal grows over its cap."""
+        journal = UndoJournal(max_bytes=10 * Op("split", 0, 0).size())
+        for y in range(100):
+            journal.record(Op("split", y, 0))
+        self.assertEqual(len(journal.undo_stack), 10)
+        self.assertEqual(journal.undo_stack[0].y, 90)
+        self.assertLessEqual(journal.bytes, journal.max_bytes)
+
+    def test_record_clears_redo(self) -> None:
+        """A new change makes the undone ones unreachable."""
+        journal = UndoJournal()
+        journal.record(Op("split", 0, 0))
+        journal.pop_undo()
+        journal.record(Op("split", 1, 0))
+        self.assertIsNone(journal.pop_redo())
+        self.assertEqual(journal.bytes, Op("split", 1, 0).size())
+
+
+class TestEditorUndo(unittest.TestCase):
+    """Test undo and redo on the editor, with keys from a replay script."""
+
+    def run_keys(self, *keys: str) -> Editor:
+        """Dispatch the keys to a fresh editor and return it."""
+        script = list(chain.from_iterable(keys))
+        terminal = ReplayTerminal(script)
+        set_term(terminal)
+        self.addCleanup(set_term, None)
+        e = Editor()
+        for _ in script:
+            dispatch(e, terminal.inkey())
+        return e
+
+    def test_undo_redo_round_trip(self) -> None:
+        """Undoing everything gives the empty buffer, redoing everything the typed text."""
+        text = "Humbug\nQuatsch mit Soße"
+        e = self.run_keys(typed(text), pressed("KEY_BACKSPACE", 3), pressed("KEY_CTRL_Z", 10))
+        self.assertEqual(e.lines, [""])
+        redo = ReplayTerminal(pressed("KEY_CTRL_R", 10))
+        for _ in range(10):
+            dispatch(e, redo.inkey())
+        self.assertEqual(e.lines, ["Humbug", "Quatsch mit S"])
+
+    def test_undo_in_command_mode(self) -> None:
+        """U in command mode undoes, i goes back to insert mode."""
+        e = self.run_keys(typed("Kram"), pressed("KEY_ESCAPE"), typed("uiZeugs"))
+        self.assertEqual(e.lines, ["Zeugs"])
+        self.assertEqual(len(e.journal.undo_stack), 1)
+
+    def test_one_step_per_command(self) -> None:
+        """X and a backspace in the insert mode after it are undone one by one."""
+        e = self.run_keys(typed("Humbug"), pressed("KEY_ESCAPE"), typed("0lxi"), pressed("KEY_BACKSPACE"))
+        self.assertEqual(e.lines, ["mbug"])
+        undo = ReplayTerminal([*pressed("KEY_ESCAPE"), "u", "u"])
+        dispatch(e, undo.inkey())
+        dispatch(e, undo.inkey())
+        self.assertEqual(e.lines, ["Hmbug"])
+        dispatch(e, undo.inkey())
+        self.assertEqual(e.lines, ["Humbug"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Unit tests for rendering very long lines in mini-vi."""  # noqa: INP001
+
+import unittest
+
+from termlib import esc, set_term
+from termlib.replay import ReplayTerminal, pressed, typed
+from termlib.width import column
+from pyvilib.editor import Editor
+from pyvilib.minivi import dispatch
+
+LONG = "0123456789" * 100_000  # 1 MB in one line
+
+
+class TestViewport(unittest.TestCase):
+    """Test horizontal scrolling and clipping."""
+
+    def setUp(self) -> None:
+        """Make an editor on an 80x24 replay terminal with a long line."""
+        self.terminal = ReplayTerminal([], height=24, width=80, keep=True)
+        set_term(self.terminal)
+        self.addCleanup(set_term, None)
+        self.e = Editor()
+        self.e.lines = [LONG, "kurz"]
+
+    def press(self, *keys: str) -> int:
+        """Dispatch the keys and return the number of bytes written."""
+        before = self.terminal.sink.bytes
+        for key in keys:
+            dispatch(self.e, ReplayTerminal([key]).inkey())
+        return self.terminal.sink.bytes - before
+
+    def test_paint_is_clipped(self) -> None:
+        """Painting a long line writes about a screen width."""
+        before = self.terminal.sink.bytes
+        self.e.echo_line(0)
+        self.assertLess(self.terminal.sink.bytes - before, 200)
+
+    def test_scroll_right_and_back(self) -> None:
+        """Moving right beyond the screen scrolls by half a width, moving back to 0 scrolls back."""
+        self.press(*pressed("KEY_RIGHT", 73))
+        self.assertEqual(self.e.x_offset, 0)
+        self.press(*pressed("KEY_RIGHT", 1))
+        self.assertEqual(self.e.x_offset, 37)
+        self.press(*pressed("KEY_DOWN"))  # "kurz": back to column 4
+        self.assertEqual((self.e.x, self.e.x_offset), (4, 0))
+
+    def test_typing_far_right(self) -> None:
+        """Typing at the end of a 1 MB line writes little per key."""
+        self.e.goto(0, len(LONG))
+        self.e.set_cursor()
+        self.assertGreater(self.e.x_offset, len(LONG) - self.e.text_width)
+        written = self.press(*typed("Quatsch"))
+        self.assertLess(written / 7, 400)
+        self.assertTrue(self.e.lines[0].endswith("Quatsch"))
+
+    def test_wide_characters(self) -> None:
+        """The cursor stands in the column after the wide characters, and scrolling counts columns."""
+        self.e.lines = ["日本語" * 20, "kurz"]
+        self.e.goto(0, 3)
+        self.e.set_cursor()
+        self.assertTrue(self.terminal.sink.getvalue().endswith(esc.move_yx(0, 6 + self.e.line_start)))
+        self.e.goto(0, 40)  # column 80, beyond the screen
+        self.e.set_cursor()
+        self.assertGreater(self.e.x_offset, 0)
+        self.assertLess(column(self.e.lines[0], 40) - column(self.e.lines[0], self.e.x_offset), self.e.text_width)
+
+
+if __name__ == "__main__":
+    unittest.main()